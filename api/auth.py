@@ -0,0 +1,25 @@
+import secrets
+
+from fastapi import HTTPException, Request
+
+from src.config import config
+
+
+async def require_admin(request: Request):
+    """
+    Dependency for the /admin/* routes: expects ``Authorization: Bearer <ADMIN_TOKEN>``.
+
+    Without ADMIN_TOKEN configured the routes answer 404, as if they
+    didn't exist; SIGHUP still reloads the index locally.
+    """
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    valid = secrets.compare_digest(token.strip().encode(), config.ADMIN_TOKEN.encode())
+    if scheme.lower() != "bearer" or not valid:
+        raise HTTPException(
+            status_code=401,
+            detail="Admin token required",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
@@ -0,0 +1,178 @@
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable
+
+from fastapi import Request
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineBusyError(Exception):
+    """Raised when no pipeline slot frees up within the queue timeout"""
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the HTTP client went away before the response was ready"""
+
+
+class PipelineExecutor:
+    """
+    Runs blocking pipeline work (SBERT encoding, FAISS search) on a sized
+    thread pool so the asyncio event loop stays free for cheap endpoints
+    such as /health.  LLM calls are awaited on the loop itself, so a slot
+    is held for the whole query but a thread only for retrieval.
+
+    A semaphore caps how many queries run at once; callers beyond that
+    wait up to ``queue_timeout`` seconds for a slot, then get
+    PipelineBusyError (mapped to 503 by the API).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        max_concurrent: int = None,
+        queue_timeout: float = None
+    ):
+        self.max_workers = max_workers or config.API_WORKER_THREADS
+        self.max_concurrent = max_concurrent or config.API_MAX_CONCURRENT_QUERIES
+        self.queue_timeout = queue_timeout if queue_timeout is not None else config.API_QUEUE_TIMEOUT
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="rag-worker"
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def _acquire(self):
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise PipelineBusyError(
+                f"All {self.max_concurrent} pipeline slots busy for {self.queue_timeout:.0f}s"
+            )
+        finally:
+            self.waiting -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one query slot for the duration of the block"""
+        await self._acquire()
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def run_in_pool(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the pool without taking a slot (caller holds one)"""
+        loop = asyncio.get_running_loop()
+        # Carry contextvars (request id, active trace span) into the worker thread
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, functools.partial(context.run, fn, *args, **kwargs))
+
+    def stats(self) -> Dict:
+        return {
+            "worker_threads": self.max_workers,
+            "max_concurrent_queries": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self):
+        logger.info("Shutting down pipeline executor...")
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def _wait_for_disconnect(request: Request):
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def run_until_disconnect(request: Request, awaitable: Awaitable[Any]) -> Any:
+    """
+    Await `awaitable`, cancelling it if the HTTP client disconnects first.
+
+    Starlette doesn't cancel a plain (non-streaming) handler when the client
+    goes away, so without this an abandoned /query keeps its slot and its
+    LLM call until generation finishes.
+    """
+    work = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if work in done:
+            return work.result()
+        raise ClientDisconnectedError("Client disconnected before the response was ready")
+    finally:
+        watcher.cancel()
+        if not work.done():
+            work.cancel()
+            try:
+                await work
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key starts
+    the computation and everyone arriving while it runs awaits the same
+    result instead of starting their own.
+
+    The computation runs as its own task, so one caller going away doesn't
+    fail the others; it is only cancelled once every waiter has gone.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t, key=key: self._finish(key, t))
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0:
+                    task.cancel()
+            raise
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+        # Mark the exception as retrieved even if every waiter is gone
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight_keys": len(self._calls),
+            "coalesced_requests": self.coalesced
+        }
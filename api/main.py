@@ -1,16 +1,36 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response, PlainTextResponse
+import asyncio
+import copy
+import json
 import logging
 from pathlib import Path
+import signal
 import sys
 import time
+import uuid
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from api.schemas import QueryRequest, QueryResponse, HealthResponse, Source
+from api.concurrency import (
+    PipelineExecutor, PipelineBusyError, SingleFlight, ClientDisconnectedError, run_until_disconnect
+)
+from api.auth import require_admin
+from api.startup import StartupProgress
+from api.schemas import (
+    QueryRequest, QueryResponse, HealthResponse, Source, ReloadRequest, ReloadResponse,
+    BatchQueryRequest, BatchQueryResponse, BatchQueryResult, MAX_QUESTION_LENGTH, ProfilerStartRequest
+)
+from src.models.embedder import SBERTEmbedder
 from src.rag.pipeline import RAGPipeline
+from src.retrieval.retriever import DocumentRetriever
+from src.retrieval.index_registry import IndexRegistry
+from src.retrieval.recall_monitor import recall_monitor
+from src.rag.cache import ResponseCache, normalize_question
+from src.utils import metrics, tracing
+from src.utils.profiling import profiler, ProfilerStateError
 from src.config import config
 
 # Configure logging
@@ -38,32 +58,174 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global pipeline instance
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    """
+    Request id (client's X-Request-ID, or a new one) for logs and traces, plus
+    per-route latency and status counts (streaming: until the response starts)
+    """
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    tracing.request_id_var.set(request_id)
+    start_time = time.time()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        # Route template, not the raw path, to keep label cardinality bounded
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        metrics.REQUEST_LATENCY.labels(endpoint).observe(time.time() - start_time)
+        metrics.REQUESTS.labels(endpoint, str(status)).inc()
+
+# Global pipeline instance.  Handlers take a local reference once per request,
+# so a hot-swap only affects requests that arrive after it.
 pipeline = None
+executor = None
+startup = StartupProgress()
+startup_task = None
+index_registry = IndexRegistry()
+response_cache = ResponseCache() if config.RESPONSE_CACHE_ENABLED else None
+query_flight = SingleFlight()
+reload_lock = asyncio.Lock()
+# /admin/* routes: bearer ADMIN_TOKEN, or 404 when no token is configured
+admin_only = [Depends(require_admin)]
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize RAG pipeline on startup"""
+def warm_pipeline(rag_pipeline: RAGPipeline, rounds: int = 1):
+    """Run dummy retrievals so the first real query doesn't pay for cold caches"""
+    retriever = rag_pipeline.retriever
+    for _ in range(rounds):
+        retriever.retrieve(config.WARMUP_QUERY, top_k=config.TOP_K)
+    # Batched encoding and search (/query/batch) take different code paths than single queries
+    embeddings = retriever.embedder.encode([config.WARMUP_QUERY] * 4)
+    retriever.retrieve_batch_by_embedding(embeddings, top_k=config.TOP_K)
+
+def build_pipeline_for_version(base: RAGPipeline, version: str = None) -> RAGPipeline:
+    """Load an index version next to the serving pipeline, sharing its model and LLM client"""
+    vector_store = index_registry.load(version)
+    retriever = DocumentRetriever(
+        embedder=base.retriever.embedder,
+        vector_store=vector_store,
+        context_builder=base.retriever.context_builder
+    )
+    new_pipeline = RAGPipeline(
+        retriever=retriever,
+        llm_client=base.llm_client,
+        answer_cache=base.answer_cache,
+        compressor=base.compressor
+    )
+    if new_pipeline.answer_cache is not None:
+        new_pipeline.answer_cache.invalidate(keep_version=vector_store.version)
+    warm_pipeline(new_pipeline)
+    return new_pipeline
+
+async def reload_index(version: str = None) -> ReloadResponse:
+    """Load, warm and atomically swap in a new index version"""
     global pipeline
-    try:
-        logger.info("="*60)
-        logger.info("Starting Legal RAG API Server")
-        logger.info("="*60)
-        logger.info("Loading RAG pipeline...")
-        
+
+    async with reload_lock:
+        old_pipeline = pipeline
+        previous_version = old_pipeline.retriever.vector_store.version
+        logger.info(f"Reloading index (requested version: {version or 'CURRENT'})...")
+
         start_time = time.time()
-        pipeline = RAGPipeline()
+        new_pipeline = await asyncio.to_thread(build_pipeline_for_version, old_pipeline, version)
         load_time = time.time() - start_time
+
+        # Single reference assignment: requests already holding the old
+        # pipeline finish on it, and it is freed once the last one returns.
+        pipeline = new_pipeline
+        del old_pipeline
+
+        vector_store = new_pipeline.retriever.vector_store
+        logger.info(f"✅ Swapped index {previous_version} -> {vector_store.version} in {load_time:.2f}s")
+
+        return ReloadResponse(
+            previous_version=previous_version,
+            index_version=vector_store.version,
+            index_size=len(vector_store.documents),
+            load_time=load_time
+        )
+
+async def _reload_on_signal():
+    try:
+        await reload_index()
+    except Exception as e:
+        logger.error(f"❌ Index reload failed, keeping current version: {e}")
+
+async def load_pipeline():
+    """
+    Background startup: load the model and index in parallel, build and warm
+    the pipeline, then flip /ready.  Runs after the server is already bound.
+    """
+    global pipeline
+    try:
+        def load_model():
+            with startup.step("model"):
+                return SBERTEmbedder()
+
+        def load_index():
+            with startup.step("index"):
+                return index_registry.load()
+
+        def build_pipeline(embedder, vector_store):
+            # Tokenizer, LLM client, caches and compressor
+            with startup.step("pipeline"):
+                return RAGPipeline(retriever=DocumentRetriever(embedder=embedder, vector_store=vector_store))
+
+        embedder, vector_store = await asyncio.gather(asyncio.to_thread(load_model), asyncio.to_thread(load_index))
+        new_pipeline = await asyncio.to_thread(build_pipeline, embedder, vector_store)
+        with startup.step("warmup"):
+            await asyncio.to_thread(warm_pipeline, new_pipeline, config.WARMUP_ROUNDS)
         
-        logger.info(f"✅ Pipeline loaded successfully in {load_time:.2f}s")
-        logger.info(f"✅ Index size: {len(pipeline.retriever.vector_store.documents)} documents")
-        logger.info("="*60)
+        pipeline = new_pipeline
+        startup.mark_ready()
+        if config.RECALL_MONITOR_ENABLED:
+            recall_monitor.start()
         
+        logger.info("="*60)
+        logger.info(f"✅ Ready in {startup.ready_at - startup.started_at:.2f}s")
+        logger.info(f"✅ Index size: {len(vector_store.documents)} documents")
+        logger.info(f"✅ Index version: {vector_store.version}")
+        logger.info("="*60)
     except Exception as e:
+        startup.mark_failed(e)
         logger.error(f"❌ Failed to load pipeline: {e}")
         import traceback
         traceback.print_exc()
-        raise
+
+@app.on_event("startup")
+async def startup_event():
+    """Start the worker pool and kick off pipeline loading without blocking the server"""
+    global executor, startup_task
+    logger.info("="*60)
+    logger.info("Starting Legal RAG API Server")
+    logger.info("="*60)
+    
+    executor = PipelineExecutor()
+    logger.info(f"✅ Worker threads: {executor.max_workers}, max concurrent queries: {executor.max_concurrent}")
+    
+    # Queries get 503 until the pipeline is ready; /live and /ready report progress meanwhile
+    metrics.READY.set(0)
+    startup_task = asyncio.create_task(load_pipeline())
+    
+    # `kill -HUP <pid>` reloads the CURRENT index version without a restart
+    try:
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.create_task(_reload_on_signal()))
+    except (NotImplementedError, AttributeError, RuntimeError):
+        logger.info("SIGHUP reload not available on this platform; use POST /admin/reload")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop a still-running startup and drain the pipeline worker pool"""
+    if startup_task is not None and not startup_task.done():
+        startup_task.cancel()
+    if executor is not None:
+        executor.shutdown()
+    recall_monitor.stop()
 
 @app.get("/", response_model=dict, tags=["General"])
 async def root():
@@ -74,12 +236,39 @@ async def root():
         "status": "running",
         "endpoints": {
             "health": "/health",
+            "live": "/live",
+            "ready": "/ready",
             "query": "/query",
+            "query_stream": "/query/stream",
+            "query_batch": "/query/batch",
+            "metrics": "/metrics",
+            "reload": "/admin/reload",
+            "profiler": "/admin/profiler",
             "docs": "/docs",
             "redoc": "/redoc"
         }
     }
 
+@app.get("/live", tags=["Health"])
+async def liveness():
+    """
+    Liveness probe: the process is up and serving HTTP, even while the
+    pipeline is still loading.  Fails only if startup failed, so the
+    orchestrator restarts the pod.
+    """
+    status_code = 503 if startup.failed else 200
+    return JSONResponse(status_code=status_code, content={"status": "failed" if startup.failed else "alive",
+                                                          **startup.snapshot()})
+
+@app.get("/ready", tags=["Health"])
+async def readiness():
+    """Readiness probe: 200 once the model and index are loaded and warmed, 503 (with progress) before"""
+    current = pipeline
+    if current is None or not startup.ready:
+        return JSONResponse(status_code=503, content={"status": startup.phase, **startup.snapshot()},
+                            headers={"Retry-After": "1"})
+    return {"status": "ready", "index_version": current.index_version, **startup.snapshot()}
+
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """
@@ -87,18 +276,39 @@ async def health_check():
     
     Returns service status and basic metrics
     """
-    is_healthy = pipeline is not None
-    index_size = len(pipeline.retriever.vector_store.documents) if pipeline else 0
+    current = pipeline
+    is_healthy = current is not None
+    vector_store = current.retriever.vector_store if current else None
+    
+    if is_healthy:
+        status = "healthy"
+    else:
+        status = "unhealthy" if startup.failed else "starting"
     
     return HealthResponse(
-        status="healthy" if is_healthy else "unhealthy",
+        status=status,
         model_loaded=is_healthy,
-        index_size=index_size,
+        index_size=len(vector_store.documents) if vector_store else 0,
+        index_version=vector_store.version if vector_store else None,
         version="1.0.0"
     )
 
+async def _run_query(current: RAGPipeline, request: QueryRequest, cache_key: tuple) -> dict:
+    """Run the RAG pipeline (retrieval on the pool, LLM on the loop) and cache non-fallback answers"""
+    async with executor.slot():
+        result = await current.aquery(
+            question=request.question,
+            top_k=request.top_k,
+            return_sources=request.return_sources,
+            return_metadata=True,
+            run_blocking=executor.run_in_pool
+        )
+    if response_cache is not None and not result.get('metadata', {}).get('llm_fallback'):
+        response_cache.put(cache_key, result)
+    return result
+
 @app.post("/query", response_model=QueryResponse, tags=["Query"])
-async def query_endpoint(request: QueryRequest):
+async def query_endpoint(request: QueryRequest, http_request: Request):
     """
     Query the RAG system
     
@@ -108,7 +318,8 @@ async def query_endpoint(request: QueryRequest):
     
     Returns generated answer with optional source citations
     """
-    if pipeline is None:
+    current = pipeline
+    if current is None:
         raise HTTPException(
             status_code=503,
             detail="Pipeline not initialized. Service unavailable."
@@ -118,14 +329,32 @@ async def query_endpoint(request: QueryRequest):
         logger.info(f"Received query: '{request.question}'")
         logger.info(f"Parameters: top_k={request.top_k}, return_sources={request.return_sources}")
         
-        # Run RAG pipeline
         start_time = time.time()
-        result = pipeline.query(
-            question=request.question,
-            top_k=request.top_k,
-            return_sources=request.return_sources,
-            return_metadata=True
+        cache_key = (
+            normalize_question(request.question),
+            request.top_k,
+            request.return_sources,
+            current.index_version
         )
+        
+        with tracing.span("api.query", top_k=request.top_k) as span:
+            result = response_cache.get(cache_key) if response_cache else None
+            if response_cache is not None:
+                metrics.record_cache_lookup("response", result is not None)
+            span.set_attribute("response_cache_hit", result is not None)
+            if result is None:
+                profiler.sample_request()
+                # Identical concurrent queries share one pipeline run; it is
+                # cancelled (LLM call included) once every caller has disconnected
+                result = await run_until_disconnect(
+                    http_request,
+                    query_flight.do(cache_key, lambda: _run_query(current, request, cache_key))
+                )
+            else:
+                logger.info("Response cache hit")
+        
+        # Callers share the cached dict; never mutate it in place
+        result = copy.deepcopy(result)
         query_time = time.time() - start_time
         
         logger.info(f"Query completed in {query_time:.2f}s")
@@ -136,12 +365,281 @@ async def query_endpoint(request: QueryRequest):
         
         return QueryResponse(**result)
         
+    except PipelineBusyError as e:
+        logger.warning(f"⚠️  Rejecting query: {e}")
+        metrics.ERRORS.labels("/query", "busy").inc()
+        raise HTTPException(status_code=503, detail=f"Server busy: {str(e)}")
+    except ClientDisconnectedError as e:
+        logger.info(f"Query abandoned: {e}")
+        metrics.ERRORS.labels("/query", "disconnected").inc()
+        # Nobody is listening; 499 only shows up in access logs
+        raise HTTPException(status_code=499, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing query: {e}")
+        metrics.ERRORS.labels("/query", "internal").inc()
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/query/stream", tags=["Query"])
+async def query_stream_endpoint(request: QueryRequest):
+    """
+    Query the RAG system and stream the answer as server-sent events
+    
+    Events, in order:
+    - **sources**: retrieved source documents, sent as soon as retrieval finishes
+    - **token**: one per generated piece of the answer (`{"text": ...}`)
+    - **metadata**: timings, sent once generation completes
+    - **error**: sent instead of the remaining events if the query fails
+    """
+    current = pipeline
+    if current is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Pipeline not initialized. Service unavailable."
+        )
+    
+    logger.info(f"Received streaming query: '{request.question}'")
+    
+    # Starlette cancels this generator when the client disconnects, which
+    # closes the LLM stream and releases the slot
+    async def event_stream():
+        try:
+            async with executor.slot():
+                async for event in current.astream_query(
+                    question=request.question,
+                    top_k=request.top_k,
+                    return_sources=request.return_sources,
+                    run_blocking=executor.run_in_pool
+                ):
+                    yield _sse(event['event'], event['data'])
+        except PipelineBusyError as e:
+            logger.warning(f"⚠️  Rejecting streaming query: {e}")
+            metrics.ERRORS.labels("/query/stream", "busy").inc()
+            yield _sse("error", {"detail": f"Server busy: {str(e)}"})
+        except Exception as e:
+            logger.error(f"Error processing streaming query: {e}")
+            metrics.ERRORS.labels("/query/stream", "internal").inc()
+            yield _sse("error", {"detail": f"Internal server error: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _run_batch(current: RAGPipeline, request: BatchQueryRequest, questions: list) -> list:
+    """
+    Retrieve for every question at once (one encode, one FAISS search) on the
+    pool, then generate concurrently on the loop.  Returns one response dict
+    or exception per question.
+    """
+    async with executor.slot():
+        prepared_batch = await executor.run_in_pool(current.prepare_batch, questions, request.top_k)
+        limit = asyncio.Semaphore(config.API_BATCH_CONCURRENCY)
+        
+        async def answer(prepared):
+            async with limit:
+                gen_start = time.time()
+                generation = await current.aanswer(prepared)
+            generation_time = time.time() - gen_start
+            return current.build_response(
+                prepared, generation, generation_time,
+                sum(prepared.timings.values()) + generation_time,
+                return_sources=request.return_sources,
+                return_metadata=True
+            )
+        
+        return await asyncio.gather(*(answer(p) for p in prepared_batch), return_exceptions=True)
+
+@app.post("/query/batch", response_model=BatchQueryResponse, tags=["Query"])
+async def query_batch_endpoint(request: BatchQueryRequest, http_request: Request):
+    """
+    Query the RAG system with several questions in one call
+    
+    - **questions**: up to `API_BATCH_MAX_QUESTIONS` questions
+    - **top_k** / **return_sources**: as for `/query`, applied to every question
+    
+    Questions are embedded together and searched with one FAISS call;
+    answers are generated concurrently.  Results come back in request
+    order, each with its own timings or `error`.
+    """
+    current = pipeline
+    if current is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Pipeline not initialized. Service unavailable."
+        )
+    
+    start_time = time.time()
+    logger.info(f"Received batch of {len(request.questions)} queries (top_k={request.top_k})")
+    
+    results = [None] * len(request.questions)
+    errors = [None] * len(request.questions)
+    cache_keys = [None] * len(request.questions)
+    cache_hits = 0
+    pending = []
+    for i, question in enumerate(request.questions):
+        question = question.strip()
+        if not question or len(question) > MAX_QUESTION_LENGTH:
+            errors[i] = f"Question must be 1-{MAX_QUESTION_LENGTH} characters"
+            continue
+        cache_keys[i] = (
+            normalize_question(question), request.top_k, request.return_sources, current.index_version
+        )
+        cached = response_cache.get(cache_keys[i]) if response_cache else None
+        if response_cache is not None:
+            metrics.record_cache_lookup("response", cached is not None)
+        if cached is not None:
+            results[i] = copy.deepcopy(cached)
+            cache_hits += 1
+        else:
+            pending.append(i)
+    
+    try:
+        if pending:
+            profiler.sample_request()
+            with tracing.span("api.query_batch", questions=len(pending), top_k=request.top_k):
+                outcomes = await run_until_disconnect(
+                    http_request,
+                    _run_batch(current, request, [request.questions[i].strip() for i in pending])
+                )
+            for i, outcome in zip(pending, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Batch query {i} failed: {outcome}")
+                    metrics.ERRORS.labels("/query/batch", "item").inc()
+                    errors[i] = f"Internal server error: {str(outcome)}"
+                    continue
+                results[i] = outcome
+                if response_cache is not None and not outcome['metadata'].get('llm_fallback'):
+                    response_cache.put(cache_keys[i], copy.deepcopy(outcome))
+    except PipelineBusyError as e:
+        logger.warning(f"⚠️  Rejecting batch query: {e}")
+        metrics.ERRORS.labels("/query/batch", "busy").inc()
+        raise HTTPException(status_code=503, detail=f"Server busy: {str(e)}")
+    except ClientDisconnectedError as e:
+        logger.info(f"Batch query abandoned: {e}")
+        metrics.ERRORS.labels("/query/batch", "disconnected").inc()
+        raise HTTPException(status_code=499, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error processing batch query: {e}")
+        metrics.ERRORS.labels("/query/batch", "internal").inc()
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    
+    items = []
+    for i, question in enumerate(request.questions):
+        result = results[i]
+        if result is None:
+            items.append(BatchQueryResult(index=i, question=question, error=errors[i]))
+            continue
+        items.append(BatchQueryResult(
+            index=i,
+            question=result['question'],
+            answer=result['answer'],
+            sources=[Source(**src) for src in result.get('sources') or []] if request.return_sources else None,
+            metadata=result.get('metadata')
+        ))
+    
+    total_time = time.time() - start_time
+    logger.info(f"Batch of {len(items)} queries completed in {total_time:.2f}s")
+    return BatchQueryResponse(
+        results=items,
+        metadata={
+            'num_questions': len(items),
+            'num_errors': sum(1 for item in items if item.error),
+            'response_cache_hits': cache_hits,
+            'total_time': total_time
+        }
+    )
+
+@app.post("/admin/reload", response_model=ReloadResponse, tags=["Admin"], dependencies=admin_only)
+async def reload_endpoint(request: ReloadRequest = None):
+    """
+    Hot-swap the FAISS index without restarting the server
+    
+    - **version**: Index version under `data/embeddings/versions/` (defaults to CURRENT)
+    
+    The new index is loaded and warmed in the background while the old one
+    keeps serving; in-flight requests finish on the old version.
+    """
+    if pipeline is None:
+        raise HTTPException(status_code=503, detail="Pipeline not initialized")
+    
+    version = request.version if request else None
+    try:
+        return await reload_index(version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ Index reload failed, keeping current version: {e}")
+        raise HTTPException(status_code=500, detail=f"Index reload failed: {str(e)}")
+
+@app.post("/admin/profiler/start", tags=["Admin"], dependencies=admin_only)
+async def profiler_start_endpoint(request: ProfilerStartRequest = None):
+    """
+    Start profiling a sample of live queries (replaces any previous session's results)
+    
+    - **mode**: `stack` (sampling, collapsed stacks) or `cprofile` (deterministic, pstats)
+    - **sample_rate**: fraction of queries profiled
+    - **duration**: seconds until the session stops itself
+    """
+    request = request or ProfilerStartRequest()
+    return profiler.start(
+        mode=request.mode,
+        sample_rate=request.sample_rate,
+        duration=request.duration,
+        interval_ms=request.interval_ms
+    )
+
+@app.post("/admin/profiler/stop", tags=["Admin"], dependencies=admin_only)
+async def profiler_stop_endpoint():
+    """Stop the profiling session; results stay available until the next start"""
+    return profiler.stop()
+
+@app.get("/admin/profiler", tags=["Admin"], dependencies=admin_only)
+async def profiler_status_endpoint():
+    """Profiling session state and per-stage call counts / times"""
+    return profiler.status()
+
+@app.get("/admin/profiler/collapsed", response_class=PlainTextResponse, tags=["Admin"], dependencies=admin_only)
+async def profiler_collapsed_endpoint(stage: str = None):
+    """
+    Collapsed stacks from a `stack` session, for flamegraph.pl or speedscope
+    
+    - **stage**: only stacks from this stage (embedding, search, sentence_rank, context, generation)
+    """
+    try:
+        return PlainTextResponse(profiler.collapsed_stacks(stage))
+    except ProfilerStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/admin/profiler/pstats", tags=["Admin"], dependencies=admin_only)
+async def profiler_pstats_endpoint(stage: str = None):
+    """
+    Merged cProfile stats from a `cprofile` session, as a pstats file
+    (`python -m pstats rag.pstats`, snakeviz)
+    
+    - **stage**: only this stage's profiles
+    """
+    try:
+        payload = profiler.pstats_dump(stage)
+    except ProfilerStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    filename = f"rag-{stage or 'all'}.pstats"
+    return Response(
+        content=payload,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
@@ -157,18 +655,44 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.get("/stats", tags=["Statistics"])
 async def get_stats():
     """Get system statistics"""
-    if pipeline is None:
+    current = pipeline
+    if current is None:
         raise HTTPException(status_code=503, detail="Pipeline not initialized")
     
     return {
-        "total_documents": len(pipeline.retriever.vector_store.documents),
-        "embedding_dimension": pipeline.retriever.embedder.get_embedding_dim(),
-        "model_device": pipeline.retriever.embedder.device,
+        "total_documents": len(current.retriever.vector_store.documents),
+        "embedding_dimension": current.retriever.embedder.get_embedding_dim(),
+        "model_device": current.retriever.embedder.device,
         "index_type": "FAISS",
+        "index_version": current.retriever.vector_store.version,
+        "available_index_versions": index_registry.list_versions(),
+        "concurrency": executor.stats() if executor else None,
+        "answer_cache": current.answer_cache.stats() if current.answer_cache else None,
+        "compression": current.compressor.stats() if current.compressor else None,
+        "response_cache": response_cache.stats() if response_cache else None,
+        "coalescing": query_flight.stats(),
+        "startup": startup.snapshot(),
+        "tracing": tracing.tracer.stats(),
+        "recall_monitor": recall_monitor.stats(),
+        "llm": current.llm_client.stats(),
         "top_k_default": config.TOP_K,
         "similarity_threshold": config.SIMILARITY_THRESHOLD
     }
 
+@app.get("/metrics", tags=["Statistics"])
+async def metrics_endpoint():
+    """Prometheus metrics: per-stage latency histograms, cache / fallback / error counters, saturation gauges"""
+    current = pipeline
+    if executor is not None:
+        metrics.IN_FLIGHT.set(executor.in_flight)
+        metrics.QUEUED.set(executor.waiting)
+    if current is not None:
+        vector_store = current.retriever.vector_store
+        metrics.set_index(len(vector_store.documents), vector_store.version)
+    
+    payload, content_type = metrics.render()
+    return Response(content=payload, media_type=content_type)
+
 if __name__ == "__main__":
     import uvicorn
     
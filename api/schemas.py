@@ -1,9 +1,14 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import List, Literal, Optional, Dict
+
+from src.config import config
+from src.retrieval.index_registry import VERSION_PATTERN
+
+MAX_QUESTION_LENGTH = 500
 
 class QueryRequest(BaseModel):
     """Request schema for RAG query"""
-    question: str = Field(..., min_length=1, max_length=500, description="User question")
+    question: str = Field(..., min_length=1, max_length=MAX_QUESTION_LENGTH, description="User question")
     top_k: Optional[int] = Field(5, ge=1, le=20, description="Number of documents to retrieve")
     return_sources: Optional[bool] = Field(True, description="Include source documents in response")
     
@@ -16,12 +21,20 @@ class QueryRequest(BaseModel):
             }
         }
 
+class Highlight(BaseModel):
+    """Sentence of a source chunk that best matches the question"""
+    text: str = Field(..., description="Sentence text")
+    start: int = Field(..., description="Start offset in the source's `text` excerpt")
+    end: int = Field(..., description="End offset in the source's `text` excerpt (clipped to it)")
+    score: float = Field(..., description="Cosine similarity to the question")
+
 class Source(BaseModel):
     """Source document metadata"""
     text: str = Field(..., description="Document text excerpt")
     source_file: str = Field(..., description="Source filename")
     chunk_id: int = Field(..., description="Chunk identifier")
     similarity_score: float = Field(..., ge=0, le=1, description="Similarity score")
+    highlight: Optional[Highlight] = Field(None, description="Best-matching sentence, if the index has a sentence table")
 
 class QueryResponse(BaseModel):
     """Response schema from RAG system"""
@@ -30,9 +43,64 @@ class QueryResponse(BaseModel):
     sources: Optional[List[Source]] = Field(None, description="Retrieved source documents")
     metadata: Optional[Dict] = Field(None, description="Performance metadata")
 
+class BatchQueryRequest(BaseModel):
+    """Request schema for several RAG queries in one call"""
+    questions: List[str] = Field(
+        ..., min_length=1, max_length=config.API_BATCH_MAX_QUESTIONS, description="User questions"
+    )
+    top_k: Optional[int] = Field(5, ge=1, le=20, description="Number of documents to retrieve per question")
+    return_sources: Optional[bool] = Field(True, description="Include source documents in each result")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "questions": [
+                    "What are the termination clauses in the contract?",
+                    "What are the payment terms?"
+                ],
+                "top_k": 5,
+                "return_sources": True
+            }
+        }
+
+class BatchQueryResult(BaseModel):
+    """One question's result within a batch; `error` is set instead of `answer` on failure"""
+    index: int = Field(..., description="Position of the question in the request")
+    question: str = Field(..., description="Original question")
+    answer: Optional[str] = Field(None, description="Generated answer")
+    sources: Optional[List[Source]] = Field(None, description="Retrieved source documents")
+    metadata: Optional[Dict] = Field(None, description="Per-question timings")
+    error: Optional[str] = Field(None, description="Why this question failed")
+
+class BatchQueryResponse(BaseModel):
+    """Response schema for a batch of RAG queries, in request order"""
+    results: List[BatchQueryResult] = Field(..., description="One result per question")
+    metadata: Dict = Field(..., description="Batch-level counts and timings")
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str = Field(..., description="Service status")
     model_loaded: bool = Field(..., description="Whether model is loaded")
     index_size: int = Field(..., description="Number of indexed documents")
-    version: str = Field(default="1.0.0", description="API version")
\ No newline at end of file
+    index_version: Optional[str] = Field(None, description="Active index version")
+    version: str = Field(default="1.0.0", description="API version")
+
+class ReloadRequest(BaseModel):
+    """Request schema for index hot-swap"""
+    version: Optional[str] = Field(
+        None, pattern=VERSION_PATTERN, description="Published index version to load (defaults to CURRENT)"
+    )
+
+class ReloadResponse(BaseModel):
+    """Index hot-swap result"""
+    previous_version: Optional[str] = Field(None, description="Index version that was serving before the swap")
+    index_version: str = Field(..., description="Index version now serving")
+    index_size: int = Field(..., description="Number of indexed documents")
+    load_time: float = Field(..., description="Seconds spent loading and warming the new index")
+
+class ProfilerStartRequest(BaseModel):
+    """Request schema for starting an on-demand profiling session"""
+    mode: Literal["stack", "cprofile"] = Field("stack", description="Stack sampler (collapsed stacks) or cProfile (pstats)")
+    sample_rate: Optional[float] = Field(None, gt=0, le=1, description="Fraction of queries to profile (default PROFILER_SAMPLE_RATE)")
+    duration: Optional[float] = Field(None, gt=0, description="Seconds until the session stops itself (capped at PROFILER_MAX_DURATION)")
+    interval_ms: Optional[float] = Field(None, ge=1, le=1000, description="Stack sampling period (stack mode)")
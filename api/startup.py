@@ -0,0 +1,78 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+STEPS = ("model", "index", "pipeline", "warmup")
+
+
+class StartupProgress:
+    """
+    Tracks the background pipeline load so /live, /ready and /health can
+    report it while the server is already accepting connections.
+
+    Phases: "starting" -> one of STEPS while they run -> "ready" (or "failed").
+    The model and index load in parallel, so several steps can be running
+    at once.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+        self.running: List[str] = []
+        self.completed: Dict[str, float] = {}
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    @property
+    def phase(self) -> str:
+        if self.failed:
+            return "failed"
+        if self.ready:
+            return "ready"
+        return "+".join(self.running) or "starting"
+
+    @contextmanager
+    def step(self, name: str):
+        logger.info(f"Startup: {name}...")
+        self.running.append(name)
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.running.remove(name)
+        elapsed = time.time() - start
+        self.completed[name] = elapsed
+        metrics.STARTUP_SECONDS.labels(name).set(elapsed)
+        logger.info(f"✅ Startup: {name} done in {elapsed:.2f}s ({len(self.completed)}/{len(STEPS)})")
+
+    def mark_ready(self):
+        self.ready_at = time.time()
+        metrics.STARTUP_SECONDS.labels("total").set(self.ready_at - self.started_at)
+        metrics.READY.set(1)
+
+    def mark_failed(self, error: Exception):
+        self.error = f"{type(error).__name__}: {error}"
+
+    def snapshot(self) -> Dict:
+        now = self.ready_at or time.time()
+        return {
+            "phase": self.phase,
+            "ready": self.ready,
+            "elapsed": round(now - self.started_at, 3),
+            "steps_done": len(self.completed),
+            "steps_total": len(STEPS),
+            "step_seconds": {name: round(seconds, 3) for name, seconds in self.completed.items()},
+            "error": self.error
+        }
@@ -3,6 +3,8 @@ import requests
 import sys
 from pathlib import Path
 import json
+import itertools
+import html
 
 sys.path.append(str(Path(__file__).parent.parent))
 
@@ -337,6 +339,11 @@ div[data-testid="stExpander"] > div[role="group"] {
     font-family: var(--font-mono); font-size: 0.8rem;
     color: var(--text-secondary); line-height: 1.65; white-space: pre-wrap;
 }
+.source-highlight {
+    background: rgba(201,168,76,0.10); border-left: 3px solid var(--accent-gold);
+    border-radius: var(--radius-sm); padding: 12px 14px; margin-bottom: 12px;
+    font-size: 0.85rem; color: var(--text-primary); line-height: 1.6;
+}
 .similarity-bar-wrap { margin-top: 10px; }
 .similarity-bar-label { display: flex; justify-content: space-between; font-size: 0.72rem; color: var(--text-muted); margin-bottom: 5px; }
 .similarity-bar { height: 4px; border-radius: 2px; background: var(--bg-void); overflow: hidden; }
@@ -411,6 +418,15 @@ def check_api_health():
     except Exception:
         return None
 
+def supporting_sentence_html(highlight) -> str:
+    """Block showing the source sentence that best matches the question"""
+    if not highlight:
+        return ""
+    return f"""
+    <div class="source-meta-label" style="margin-top:4px">Supporting Sentence · {highlight['score']:.3f}</div>
+    <div class="source-highlight">{html.escape(highlight['text'])}</div>
+    """
+
 def query_api(question: str, top_k: int, return_sources: bool):
     try:
         r = requests.post(
@@ -424,6 +440,33 @@ def query_api(question: str, top_k: int, return_sources: bool):
         st.error(f"API Error: {e}")
         return None
 
+def stream_query_api(question: str, top_k: int, return_sources: bool):
+    """Yield (event, data) pairs from the /query/stream server-sent events"""
+    with requests.post(
+        f"{API_URL}/query/stream",
+        json={"question": question, "top_k": top_k, "return_sources": return_sources},
+        stream=True,
+        timeout=(3, 120),
+    ) as r:
+        r.raise_for_status()
+        event = "message"
+        for line in r.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                yield event, json.loads(line[len("data:"):].strip())
+
+def answer_card_html(answer: str) -> str:
+    return f"""
+    <div class="answer-card">
+        <div class="answer-card-header">
+            <div class="answer-card-icon">✦</div>
+            <span class="answer-card-title">Generated Answer</span>
+        </div>
+        <p class="answer-text">{answer}</p>
+    </div>
+    """
+
 def get_api_stats():
     try:
         r = requests.get(f"{API_URL}/stats", timeout=3)
@@ -556,22 +599,49 @@ with col_btn:
 #  MAIN — RESULTS
 # ─────────────────────────────────────────────
 if run and question:
-    with st.spinner("Retrieving and synthesising…"):
-        result = query_api(question, top_k, return_sources)
+    answer_slot = st.empty()
+    result = {"question": question, "answer": "", "sources": [], "metadata": None}
+
+    # Stream tokens into the answer card as they arrive
+    try:
+        with st.spinner("Retrieving…"):
+            events = stream_query_api(question, top_k, return_sources)
+            first_event = next(events, None)
+        # Spinner covers retrieval only; `sources` arrives as the first event
+        for event, data in itertools.chain([first_event] if first_event else [], events):
+            if event == "sources":
+                result["sources"] = data.get("sources", [])
+            elif event == "token":
+                result["answer"] += data["text"]
+                answer_slot.markdown(answer_card_html(result["answer"] + "▌"), unsafe_allow_html=True)
+            elif event == "metadata":
+                result["metadata"] = data
+            elif event == "error":
+                st.error(f"API Error: {data.get('detail')}")
+                result = None
+                break
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code in (404, 405):
+            # Older API without /query/stream — fall back to the blocking endpoint
+            with st.spinner("Retrieving and synthesising…"):
+                result = query_api(question, top_k, return_sources)
+        else:
+            st.error(f"API Error: {e}")
+            result = None
+    except requests.exceptions.RequestException as e:
+        # Timeout or dropped connection: keep whatever already streamed
+        # rather than re-running retrieval and generation on /query
+        if result["answer"]:
+            st.error(f"Stream interrupted, answer may be incomplete: {e}")
+        else:
+            st.error(f"API Error: {e}")
+            result = None
 
     if result:
         st.session_state.last_result = result
 
         # Answer card
-        st.markdown(f"""
-        <div class="answer-card">
-            <div class="answer-card-header">
-                <div class="answer-card-icon">✦</div>
-                <span class="answer-card-title">Generated Answer</span>
-            </div>
-            <p class="answer-text">{result['answer']}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        answer_slot.markdown(answer_card_html(result["answer"]), unsafe_allow_html=True)
 
         # Performance metrics
         if result.get("metadata"):
@@ -625,6 +695,7 @@ if run and question:
                         </div>
                     </div>
                     <br>
+                    {supporting_sentence_html(src.get("highlight"))}
                     <div class="source-meta-label" style="margin-top:4px">Content Excerpt</div>
                     <div class="source-text-block">{src['text']}</div>
                     """, unsafe_allow_html=True)
@@ -7,6 +7,8 @@ from src.data.loader import DocumentLoader
 from src.data.preprocessor import TextPreprocessor
 from src.models.embedder import SBERTEmbedder
 from src.retrieval.vector_store import FAISSVectorStore
+from src.retrieval.index_registry import IndexRegistry
+from src.retrieval.sentence_index import SentenceIndex
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -141,6 +143,10 @@ def main():
     logger.info(f"✅ Added {len(embeddings)} embeddings to index")
     logger.info(f"✅ Index now contains {vector_store.index.ntotal} vectors")
 
+    # Sentence table for extractive answers and citation highlights
+    logger.info("Embedding chunk sentences...")
+    vector_store.sentence_index = SentenceIndex.build(chunks, embedder)
+
     # --------------------------------------------------
     # Step 6: Save
     # --------------------------------------------------
@@ -148,10 +154,10 @@ def main():
     logger.info("Step 5: Saving index...")
     logger.info("-" * 60)
 
-    index_path = config.EMBEDDINGS_DIR / "faiss_index.bin"
-    metadata_path = config.EMBEDDINGS_DIR / "metadata.pkl"
-
-    vector_store.save(index_path, metadata_path)
+    # Publish as a new version; a running API picks it up via POST /admin/reload
+    registry = IndexRegistry()
+    version = registry.publish(vector_store)
+    index_path, metadata_path, _ = registry.resolve(version)
 
     # Verify saved files
     logger.info(f"\nVerifying saved files:")
@@ -192,8 +198,11 @@ def main():
     logger.info("✅ INDEX BUILDING COMPLETE!")
     logger.info("=" * 60)
     logger.info(f"Total vectors indexed: {vector_store.index.ntotal}")
+    logger.info(f"Index version: {version}")
     logger.info(f"Index saved to: {index_path}")
     logger.info(f"Metadata saved to: {metadata_path}")
+    logger.info("Running API? Swap it in with: "
+                "curl -X POST -H \"Authorization: Bearer $ADMIN_TOKEN\" http://localhost:8000/admin/reload")
 
 if __name__ == "__main__":
     main()
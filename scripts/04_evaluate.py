@@ -0,0 +1,179 @@
+"""
+Evaluate retrieval quality (recall@k, MRR, nDCG, hit rate) next to latency.
+
+By default the serving index is scored against data/processed/eval_qa.jsonl.
+Each --variant rebuilds an index from the raw contracts with a different
+embedding model, chunking or FAISS index, so trade-offs can be compared in
+one table:
+
+    python scripts/04_evaluate.py
+    python scripts/04_evaluate.py --variant "index=ivf:nprobe=4" --variant "index=hnsw:m=16;ef_search=32" \
+        --variant "chunk_size=256,chunk_overlap=32" --variant "model=sentence-transformers/all-MiniLM-L6-v2"
+
+Variant keys: model, chunk_size, chunk_overlap, index (type[:param=value;...]).
+Unset keys fall back to the serving configuration.  Embeddings are shared
+between variants that differ only in the index.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import subprocess
+import time
+from typing import Dict
+
+from src.config import config
+from src.data.loader import DocumentLoader
+from src.data.preprocessor import TextPreprocessor
+from src.evaluation.retrieval import RetrievalEvaluator, load_eval_set, parse_index_spec
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_variant(spec: str) -> Dict:
+    variant = {
+        "name": spec,
+        "model": None,
+        "chunk_size": config.CHUNK_SIZE,
+        "chunk_overlap": config.CHUNK_OVERLAP,
+        "index": config.INDEX_TYPE
+    }
+    for item in filter(None, spec.split(",")):
+        key, _, value = item.partition("=")
+        if key not in variant or key == "name":
+            raise ValueError(f"Unknown variant key '{key}' in '{spec}'")
+        variant[key] = int(value) if key in ("chunk_size", "chunk_overlap") else value
+    return variant
+
+
+class VariantBuilder:
+    """Builds evaluation indexes from raw contracts, reusing embedders and embeddings"""
+
+    def __init__(self, contracts_dir: Path):
+        self.documents = [d for d in DocumentLoader().load_all_documents(contracts_dir) if d.get("content")]
+        logger.info(f"Loaded {len(self.documents)} documents from {contracts_dir}")
+        self._embedders = {}
+        self._embedded = {}
+
+    def embedder(self, model: str = None):
+        from src.models.embedder import SBERTEmbedder
+
+        if model not in self._embedders:
+            self._embedders[model] = SBERTEmbedder(model) if model else SBERTEmbedder()
+        return self._embedders[model]
+
+    def build(self, variant: Dict):
+        from src.retrieval.vector_store import FAISSVectorStore
+
+        embedder = self.embedder(variant["model"])
+        key = (variant["model"], variant["chunk_size"], variant["chunk_overlap"])
+        if key not in self._embedded:
+            preprocessor = TextPreprocessor(chunk_size=variant["chunk_size"], chunk_overlap=variant["chunk_overlap"])
+            chunks = preprocessor.process_documents(self.documents)
+            start = time.perf_counter()
+            embeddings = embedder.encode([c["text"] for c in chunks], batch_size=config.BATCH_SIZE)
+            self._embedded[key] = (chunks, embeddings, time.perf_counter() - start)
+        chunks, embeddings, embed_time = self._embedded[key]
+
+        index_type, params = parse_index_spec(variant["index"])
+        start = time.perf_counter()
+        store = FAISSVectorStore(embedder.get_embedding_dim(), index_type=index_type, **params)
+        store.add_embeddings(embeddings, chunks)
+        info = {
+            "model": str(embedder.model_path),
+            "chunk_size": variant["chunk_size"],
+            "chunk_overlap": variant["chunk_overlap"],
+            "index_params": params,
+            "embed_time_s": embed_time,
+            "build_time_s": time.perf_counter() - start
+        }
+        return embedder, store, info
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=config.PROJECT_ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_table(results, ks):
+    k_mid = 5 if 5 in ks else ks[len(ks) // 2]
+    k_max = max(ks)
+    columns = [("hit@1", "hit_rate@1"), (f"recall@{k_mid}", f"recall@{k_mid}"), (f"recall@{k_max}", f"recall@{k_max}"),
+               ("MRR", "mrr"), (f"nDCG@{k_max}", f"ndcg@{k_max}")]
+    columns = [(label, key) for label, key in columns if key == "mrr" or int(key.split("@")[1]) in ks]
+    name_width = max(24, *(len(r.name) for r in results))
+    header = (f"{'variant':<{name_width}} {'chunks':>8} " + " ".join(f"{label:>10}" for label, _ in columns) +
+              f" {'enc ms/q':>9} {'search p50':>11} {'search p95':>11}")
+    logger.info(header)
+    logger.info("-" * len(header))
+    for r in results:
+        logger.info(
+            f"{r.name:<{name_width}} {r.index['chunks']:>8} " +
+            " ".join(f"{r.metrics[key]:>10.3f}" for _, key in columns) +
+            f" {r.latency['encode_ms_per_query']:>9.2f} {r.latency['search_p50_ms']:>10.3f}ms"
+            f" {r.latency['search_p95_ms']:>9.3f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality and latency")
+    parser.add_argument("--eval-set", type=Path, default=config.PROCESSED_DATA_DIR / "eval_qa.jsonl")
+    parser.add_argument("--k", default="1,3,5,10", help="Cut-offs for recall / nDCG / hit rate")
+    parser.add_argument("--variant", action="append", default=[], help="Index to rebuild and compare (repeatable)")
+    parser.add_argument("--no-serving", action="store_true", help="Skip the serving index")
+    parser.add_argument("--contracts-dir", type=Path, default=config.RAW_DATA_DIR / "contracts")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    ks = sorted(int(k) for k in args.k.split(","))
+    evaluator = RetrievalEvaluator(load_eval_set(args.eval_set), ks, args.batch_size)
+    results = []
+
+    if not args.no_serving:
+        from src.models.embedder import SBERTEmbedder
+        from src.retrieval.index_registry import IndexRegistry
+
+        try:
+            store = IndexRegistry().load()
+            results.append(evaluator.evaluate(SBERTEmbedder(), store, "serving", {"version": store.version}))
+        except Exception as e:
+            logger.error(f"❌ Could not evaluate the serving index: {e}")
+
+    if args.variant:
+        builder = VariantBuilder(args.contracts_dir)
+        for spec in args.variant:
+            variant = parse_variant(spec)
+            logger.info(f"Building variant {variant['name']}...")
+            embedder, store, info = builder.build(variant)
+            results.append(evaluator.evaluate(embedder, store, variant["name"], info))
+
+    if not results:
+        logger.error("❌ Nothing evaluated")
+        return
+
+    logger.info("")
+    print_table(results, ks)
+
+    output = args.output or (
+        config.DATA_DIR / "benchmarks" / f"eval-{git_commit()}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "meta": {"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "eval_set": str(args.eval_set), "ks": ks},
+        "results": [r.to_dict() for r in results]
+    }, indent=2))
+    logger.info(f"✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Answer a JSONL file of questions offline.
+
+Input: one {"id": ..., "question": ...} object per line (`id` is
+optional and defaults to the line number).  Output: one JSON record per
+question with answer, sources, fallback/cache flags, per-stage timings and
+any error.  Re-running with the same output file resumes where the last run
+stopped.
+
+    python scripts/batch_answer.py questions.jsonl answers.jsonl --batch-size 32 --concurrency 4
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.rag.pipeline import RAGPipeline
+from src.rag.batch import BatchJob
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logging.getLogger("src.rag.batch").setLevel(logging.INFO)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch question answering over the contract index")
+    parser.add_argument("input", type=Path, help="JSONL file of questions")
+    parser.add_argument("output", type=Path, help="JSONL file to append answers to")
+    parser.add_argument("--batch-size", type=int, default=None, help="Questions per embedding/search call")
+    parser.add_argument("--concurrency", type=int, default=None, help="Generation calls in flight")
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of resuming")
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        logger.error(f"❌ Input file not found: {args.input}")
+        sys.exit(1)
+
+    job = BatchJob(RAGPipeline(), batch_size=args.batch_size, concurrency=args.concurrency, top_k=args.top_k)
+    summary = job.run(args.input, args.output, resume=not args.no_resume)
+
+    logger.info(json.dumps(summary, indent=2))
+    if summary["fallbacks"]:
+        logger.info(f"⚠️  {summary['fallbacks']} answers came from the extractive fallback (LLM unavailable)")
+
+
+if __name__ == "__main__":
+    main()
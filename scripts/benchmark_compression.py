@@ -0,0 +1,116 @@
+"""
+Measure what extractive context compression saves.
+
+Runs each question through retrieval, then generates once from the full
+token-budgeted context and once from the compressed context, and reports
+prompt tokens and generation latency for both.  Point HF_INFERENCE_URL at
+a real endpoint, or at the stub with a per-token prompt cost:
+
+    python scripts/llm_stub_server.py --port 8081 --ms-per-input-token 2
+    HF_INFERENCE_URL=http://localhost:8081/models python scripts/benchmark_compression.py
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.retrieval.retriever import DocumentRetriever
+from src.rag.llm_client import LLMClient
+from src.rag.compression import ExtractiveCompressor
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_QUESTIONS = [
+    "What are the termination clauses?",
+    "What are the payment terms?",
+    "Who are the parties to the contract?",
+    "How long do confidentiality obligations last?",
+    "Which law governs the agreement?",
+    "What happens if a party breaches the contract?",
+    "Can the agreement be assigned to a third party?",
+    "What are the limitations of liability?"
+]
+
+
+def timed_generate(llm_client: LLMClient, question: str, context: str):
+    start = time.time()
+    generation = llm_client.generate(question, context)
+    return time.time() - start, generation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extractive context compression")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--max-tokens", type=int, default=None, help="Compression budget (tokens)")
+    parser.add_argument("--questions", type=str, default=None, help="File with one question per line")
+    args = parser.parse_args()
+
+    questions = DEFAULT_QUESTIONS
+    if args.questions:
+        questions = [q.strip() for q in Path(args.questions).read_text().splitlines() if q.strip()]
+
+    retriever = DocumentRetriever()
+    llm_client = LLMClient()
+    compressor = ExtractiveCompressor(
+        retriever.embedder, token_counter=retriever.context_builder.token_counter, max_tokens=args.max_tokens
+    )
+    counter = retriever.context_builder.token_counter
+    if not counter.exact:
+        logger.info("⚠️  tiktoken unavailable: token counts are estimates")
+
+    rows = []
+    for question in questions:
+        query_embedding = retriever.embedder.encode(question)
+        results = retriever.retrieve_by_embedding(query_embedding, top_k=args.top_k)
+        if not results:
+            continue
+
+        full_context = retriever.get_context(question, results=results)
+        compressed = compressor.compress(query_embedding, results)
+
+        full_time, full_gen = timed_generate(llm_client, question, full_context)
+        compressed_time, compressed_gen = timed_generate(llm_client, question, compressed.text)
+        rows.append({
+            "question": question,
+            "full_tokens": counter.count(full_context),
+            "compressed_tokens": compressed.tokens,
+            "compression_time": compressed.compression_time,
+            "full_time": full_time,
+            "compressed_time": compressed_time,
+            "fallback": full_gen.fallback or compressed_gen.fallback
+        })
+
+    if not rows:
+        logger.info("❌ No question retrieved any documents")
+        return
+
+    logger.info("=" * 78)
+    logger.info(f"{'Question':<42}{'tokens':>14}{'generation (s)':>20}")
+    logger.info("-" * 78)
+    for row in rows:
+        logger.info(
+            f"{row['question'][:40]:<42}"
+            f"{row['full_tokens']:>6} -> {row['compressed_tokens']:<5}"
+            f"{row['full_time']:>9.2f} -> {row['compressed_time']:.2f}"
+        )
+    logger.info("-" * 78)
+
+    full_tokens = sum(r["full_tokens"] for r in rows)
+    compressed_tokens = sum(r["compressed_tokens"] for r in rows)
+    saved = statistics.mean(r["full_time"] - r["compressed_time"] - r["compression_time"] for r in rows)
+    logger.info(f"Prompt context tokens: {full_tokens} -> {compressed_tokens} "
+                f"({(1 - compressed_tokens / full_tokens) * 100:.0f}% fewer)")
+    logger.info(f"Compression overhead:  {statistics.mean(r['compression_time'] for r in rows) * 1000:.1f}ms/query")
+    logger.info(f"Net latency saved:     {saved * 1000:.0f}ms/query")
+    if any(r["fallback"] for r in rows):
+        logger.info("⚠️  Some answers came from the mock fallback; latency numbers don't reflect a real LLM")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Retrieval benchmark: encode throughput, index build, memory and search
+latency / QPS for each FAISSVectorStore configuration across corpus sizes.
+
+Corpora are synthetic and seeded, so runs are reproducible and comparable
+across commits:
+- encode throughput is measured by running SBERTEmbedder over generated
+  contract-style chunk texts;
+- indexes are built from clustered unit vectors with the embedder's
+  dimension (encoding 1M real chunks on a CPU would take hours), and queries
+  are noisy copies of corpus vectors, so every query has true neighbours;
+- recall@k of the approximate indexes is measured against exact (flat) search.
+
+    python scripts/benchmark_retrieval.py                                   # 10k, 100k, 1M
+    python scripts/benchmark_retrieval.py --sizes 10000 --configs flat,ivf:nprobe=32,hnsw:ef_search=128
+    python scripts/benchmark_retrieval.py --sizes 10000 --compare data/benchmarks/retrieval-abc123-....json
+
+Results are written as JSON (default: data/benchmarks/retrieval-<commit>-<time>.json).
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+sys.path.append(str(Path(__file__).parent.parent))
+
+import faiss
+import numpy as np
+
+from src.evaluation.retrieval import parse_index_spec
+from src.retrieval.vector_store import FAISSVectorStore
+from src.config import config
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_SIZES = "10000,100000,1000000"
+DEFAULT_CONFIGS = "flat,ivf,hnsw"
+
+CLAUSES = [
+    "The {party} shall pay all invoices within {days} days of receipt.",
+    "Either party may terminate this Agreement upon {days} days written notice.",
+    "The {party} shall keep all Confidential Information strictly confidential for {years} years.",
+    "This Agreement shall be governed by the laws of the State of {state}.",
+    "The {party} shall indemnify the other party against all third-party claims.",
+    "Neither party shall be liable for indirect or consequential damages.",
+    "The {party} may not assign this Agreement without prior written consent.",
+    "Any dispute shall be resolved by binding arbitration in {state}.",
+]
+PARTIES = ["Company", "Contractor", "Employee", "Landlord", "Tenant", "Licensee", "Supplier"]
+STATES = ["New York", "Delaware", "California", "Texas", "Illinois"]
+
+
+def synthetic_texts(n: int, rng: np.random.Generator, sentences: int = 6) -> List[str]:
+    """Contract-like chunk texts of roughly the production chunk length"""
+    texts = []
+    for _ in range(n):
+        parts = [
+            CLAUSES[rng.integers(len(CLAUSES))].format(
+                party=PARTIES[rng.integers(len(PARTIES))],
+                days=int(rng.choice([10, 15, 30, 60, 90])),
+                years=int(rng.integers(1, 6)),
+                state=STATES[rng.integers(len(STATES))]
+            )
+            for _ in range(sentences)
+        ]
+        texts.append(" ".join(parts))
+    return texts
+
+
+def clustered_vectors(n: int, dim: int, rng: np.random.Generator, clusters: int, spread: float = 0.35) -> np.ndarray:
+    """Unit vectors around `clusters` random centres, like chunks grouped by topic"""
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    vectors = np.empty((n, dim), dtype=np.float32)
+    step = 100_000
+    for start in range(0, n, step):
+        end = min(start + step, n)
+        block = centers[rng.integers(clusters, size=end - start)]
+        block += spread * rng.standard_normal((end - start, dim)).astype(np.float32) / np.sqrt(dim)
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        vectors[start:end] = block
+    return vectors
+
+
+def noisy_queries(corpus: np.ndarray, n: int, rng: np.random.Generator, noise: float = 0.5) -> np.ndarray:
+    rows = corpus[rng.integers(len(corpus), size=n)]
+    queries = rows + noise * rng.standard_normal(rows.shape).astype(np.float32) / np.sqrt(corpus.shape[1])
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def percentiles(latencies: List[float]) -> Dict:
+    ms = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean())
+    }
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    hits = sum(len(np.intersect1d(f, t, assume_unique=True)) for f, t in zip(found, truth))
+    return hits / (len(truth) * k)
+
+
+def benchmark_encode(sample: int, batch_sizes: List[int], seed: int) -> Dict:
+    from src.models.embedder import SBERTEmbedder
+
+    embedder = SBERTEmbedder()
+    texts = synthetic_texts(sample, np.random.default_rng(seed))
+    embedder.encode(texts[:8])  # warm-up
+    results = {"model": str(embedder.model_path), "device": embedder.device,
+               "texts": sample, "avg_chars": statistics.mean(len(t) for t in texts), "batch_sizes": {}}
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        embedder.encode(texts, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        results["batch_sizes"][str(batch_size)] = {"texts_per_sec": sample / elapsed, "seconds": elapsed}
+        logger.info(f"Encode batch_size={batch_size}: {sample / elapsed:.0f} texts/s")
+    return results, embedder.get_embedding_dim()
+
+
+def benchmark_config(
+    spec: str,
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    top_k: int,
+    batch_size: int
+) -> Dict:
+    index_type, params = parse_index_spec(spec)
+    documents = [{"text": "", "source_file": "synthetic", "chunk_id": 0}] * len(corpus)
+
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    store = FAISSVectorStore(corpus.shape[1], index_type=index_type, **params)
+    store.add_embeddings(corpus, documents)
+    build_time = time.perf_counter() - start
+    rss_delta = rss_bytes() - rss_before
+
+    for q in queries[:10]:  # warm-up
+        store.search_ids(q, top_k)
+
+    single = []
+    found = np.empty((len(queries), top_k), dtype=np.int64)
+    for i, q in enumerate(queries):
+        t = time.perf_counter()
+        _, ids = store.search_ids(q, top_k)
+        single.append(time.perf_counter() - t)
+        found[i] = ids[0]
+
+    batched = []
+    for b in range(0, len(queries), batch_size):
+        t = time.perf_counter()
+        store.search_ids(queries[b:b + batch_size], top_k)
+        batched.append(time.perf_counter() - t)
+
+    result = {
+        "config": spec,
+        "index_type": index_type,
+        "params": {**params, "nprobe": store.nprobe if index_type == "ivf" else None,
+                   "ef_search": store.ef_search if index_type == "hnsw" else None},
+        "corpus_size": len(corpus),
+        "build_time_s": build_time,
+        "index_bytes": store.index_bytes(),
+        "rss_delta_bytes": rss_delta,
+        "single": {**percentiles(single), "qps": len(single) / sum(single)},
+        "batched": {**percentiles(batched), "batch_size": batch_size, "qps": len(queries) / sum(batched)},
+        f"recall_at_{top_k}": recall_at_k(found, truth)
+    }
+    logger.info(
+        f"  {spec:<28} build {build_time:7.2f}s  {result['index_bytes'] / 1e6:8.1f} MB  "
+        f"single p50 {result['single']['p50_ms']:.3f}ms p99 {result['single']['p99_ms']:.3f}ms "
+        f"({result['single']['qps']:.0f} qps)  batched {result['batched']['qps']:.0f} qps  "
+        f"recall@{top_k} {result[f'recall_at_{top_k}']:.3f}"
+    )
+    del store
+    gc.collect()
+    return result
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=config.PROJECT_ROOT, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, cwd=config.PROJECT_ROOT).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: Dict, baseline_path: Path):
+    baseline = json.loads(baseline_path.read_text())
+    previous = {(r["corpus_size"], r["config"]): r for r in baseline["search"]}
+    logger.info("=" * 96)
+    logger.info(f"Compared with {baseline['meta']['commit']} ({baseline_path.name})")
+    logger.info(f"{'size':>9} {'config':<28}{'single qps':>18}{'single p99 ms':>20}{'batched qps':>20}")
+    for r in results["search"]:
+        old = previous.get((r["corpus_size"], r["config"]))
+        if old is None:
+            continue
+
+        def delta(new, before):
+            return f"{new:8.4g} ({(new / before - 1) * 100:+5.1f}%)" if before else f"{new:8.4g}"
+
+        logger.info(
+            f"{r['corpus_size']:>9} {r['config']:<28}"
+            f"{delta(r['single']['qps'], old['single']['qps']):>18}"
+            f"{delta(r['single']['p99_ms'], old['single']['p99_ms']):>20}"
+            f"{delta(r['batched']['qps'], old['batched']['qps']):>20}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark retrieval across corpus sizes and index types")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated corpus sizes (chunks)")
+    parser.add_argument("--configs", default=DEFAULT_CONFIGS,
+                        help="Comma-separated index configs, e.g. flat,ivf:nlist=1024;nprobe=32,hnsw:m=32 "
+                             "(use ';' between params of one config)")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32, help="Queries per batched search call")
+    parser.add_argument("--clusters", type=int, default=0, help="Topic clusters in the corpus (0 = size/100)")
+    parser.add_argument("--dim", type=int, default=None, help="Vector dimension (default: embedder's)")
+    parser.add_argument("--encode-sample", type=int, default=2000, help="Texts for the encode benchmark")
+    parser.add_argument("--encode-batch-sizes", default="1,32,128")
+    parser.add_argument("--skip-encode", action="store_true", help="Don't load SBERT (needs --dim)")
+    parser.add_argument("--threads", type=int, default=None, help="FAISS OpenMP threads")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    if args.threads:
+        faiss.omp_set_num_threads(args.threads)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    configs = args.configs.split(",")
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "faiss": faiss.__version__,
+            "numpy": np.__version__,
+            "cpu_count": os.cpu_count(),
+            "faiss_threads": faiss.omp_get_max_threads(),
+            "args": {k: str(v) for k, v in vars(args).items()}
+        },
+        "encode": None,
+        "search": []
+    }
+
+    dim = args.dim
+    if not args.skip_encode:
+        results["encode"], embedder_dim = benchmark_encode(
+            args.encode_sample, [int(b) for b in args.encode_batch_sizes.split(",")], args.seed
+        )
+        dim = dim or embedder_dim
+    if dim is None:
+        parser.error("--skip-encode needs --dim")
+    results["meta"]["dim"] = dim
+
+    for size in sizes:
+        rng = np.random.default_rng(args.seed + size)
+        start = time.perf_counter()
+        corpus = clustered_vectors(size, dim, rng, args.clusters or max(1, size // 100))
+        queries = noisy_queries(corpus, args.queries, rng)
+        exact = faiss.IndexFlatIP(dim)
+        exact.add(corpus)
+        _, truth = exact.search(queries, args.top_k)
+        del exact
+        logger.info(f"Corpus of {size} vectors (dim {dim}) ready in {time.perf_counter() - start:.1f}s")
+
+        for spec in configs:
+            results["search"].append(benchmark_config(spec, corpus, queries, truth, args.top_k, args.batch_size))
+        del corpus
+        gc.collect()
+
+    output = args.output or (
+        config.DATA_DIR / "benchmarks" / f"retrieval-{results['meta']['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    logger.info(f"✅ Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
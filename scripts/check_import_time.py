@@ -0,0 +1,200 @@
+"""
+Import-time budget for the package's entry points.
+
+Each entry point is imported in a fresh interpreter under
+``python -X importtime``, best of --repeat runs.  A run fails when:
+- the import takes longer than its budget, or
+- it loads a heavy dependency that should only load when the component
+  that needs it is first used.
+
+Heavy dependencies are torch, sentence_transformers, transformers,
+huggingface_hub, langchain and faiss.  Scripts are loaded with runpy under
+a non-``__main__`` name, so their ``main()`` never runs.
+
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --only api,pipeline --repeat 5 --top 10
+    python scripts/check_import_time.py --scale 2      # slower machine / CI runner
+
+Exits 1 if any entry point is over budget.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import os
+import subprocess
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).parent.parent
+
+# Loaded on first use (model / index load, index build, local LLM); never at import
+HEAVY = (
+    "torch", "sentence_transformers", "transformers", "huggingface_hub",
+    "langchain_text_splitters", "langchain_core", "faiss"
+)
+
+
+@dataclass
+class EntryPoint:
+    name: str
+    target: str          # module name, or a path under scripts/
+    budget_ms: float
+    allowed: Tuple[str, ...] = ()   # heavy modules this entry point may import eagerly
+
+    @property
+    def is_script(self) -> bool:
+        return self.target.endswith(".py")
+
+
+# Budgets: cumulative import time on a laptop-class CPU, with headroom.
+# fastapi / pydantic (API) and numpy are genuinely needed at import.
+ENTRY_POINTS = [
+    EntryPoint("config", "src.config", 60),                      # Streamlit app, every tool
+    EntryPoint("pipeline", "src.rag.pipeline", 400),
+    EntryPoint("batch", "src.rag.batch", 450),
+    EntryPoint("index-registry", "src.retrieval.index_registry", 250),
+    EntryPoint("evaluation", "src.evaluation.retrieval", 300),
+    EntryPoint("synthetic", "src.data.synthetic", 100),
+    EntryPoint("api", "api.main", 1200),
+    EntryPoint("build-index", "scripts/03_build_index.py", 350),
+    EntryPoint("evaluate", "scripts/04_evaluate.py", 350),
+    EntryPoint("tune-index", "scripts/tune_index.py", 350),
+    EntryPoint("batch-answer", "scripts/batch_answer.py", 500),
+    EntryPoint("sample-contracts", "scripts/create_sample_contracts.py", 350),
+    EntryPoint("load-test", "scripts/load_test.py", 300),
+    EntryPoint("benchmark-retrieval", "scripts/benchmark_retrieval.py", 500, allowed=("faiss",)),
+]
+
+
+@dataclass
+class Measurement:
+    entry: EntryPoint
+    total_ms: float
+    breakdown: Dict[str, float] = field(default_factory=dict)  # direct imports -> cumulative ms
+    heavy: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def over_budget(self) -> bool:
+        return self.total_ms > self.entry.budget_ms
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.over_budget and not self.heavy
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, str, float]]:
+    """(depth, module, cumulative ms) per line of -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # " " + two spaces per nesting level + module name
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((depth, name.strip(), int(cumulative) / 1000))
+    return rows
+
+
+def direct_imports(rows: List[Tuple[int, str, float]], module: str) -> Dict[str, float]:
+    """Modules imported directly by `module` (importtime lists children before their parent)"""
+    children = {}
+    for depth, name, ms in rows:
+        if depth == 0:
+            if name == module:
+                return children
+            children = {}
+        elif depth == 1:
+            children[name] = ms
+    return {}
+
+
+def run_importtime(code: str) -> Tuple[str, int]:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    return proc.stderr, proc.returncode
+
+
+def import_code(entry: EntryPoint) -> str:
+    if entry.is_script:
+        path = ROOT / entry.target
+        return f"import runpy; runpy.run_path({str(path)!r}, run_name='__import_budget__')"
+    return f"import {entry.target}"
+
+
+def measure(entry: EntryPoint, baseline: set, repeat: int) -> Measurement:
+    best = None
+    for _ in range(repeat):
+        stderr, returncode = run_importtime(import_code(entry))
+        rows = parse_importtime(stderr)
+        if returncode != 0:
+            error = stderr.strip().splitlines()[-1] if stderr.strip() else f"exit code {returncode}"
+            return Measurement(entry, 0.0, error=error)
+        # Interpreter start-up (site, encodings, ...) is the same for every entry point
+        top_level = [(name, ms) for depth, name, ms in rows if depth == 0 and name not in baseline]
+        total = sum(ms for _, ms in top_level)
+        if best is None or total < best.total_ms:
+            breakdown = dict(top_level) if entry.is_script else direct_imports(rows, entry.target)
+            imported = {name for _, name, _ in rows}
+            heavy = [m for m in HEAVY if m in imported and m not in entry.allowed]
+            best = Measurement(entry, total, breakdown, heavy)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import time of each entry point against its budget")
+    parser.add_argument("--only", default=None, help="Comma-separated entry point names")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh-interpreter runs per entry point (best is kept)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow machines)")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest top-level imports to list per entry point")
+    parser.add_argument("--list", action="store_true", help="List entry points and budgets")
+    args = parser.parse_args()
+
+    entries = [replace(e, budget_ms=e.budget_ms * args.scale) for e in ENTRY_POINTS]
+    if args.only:
+        names = set(args.only.split(","))
+        unknown = names - {e.name for e in entries}
+        if unknown:
+            raise SystemExit(f"❌ Unknown entry point(s): {', '.join(sorted(unknown))}")
+        entries = [e for e in entries if e.name in names]
+    if args.list:
+        for entry in entries:
+            logger.info(f"  {entry.name:<22} {entry.target:<36} {entry.budget_ms:>6.0f} ms")
+        return
+
+    baseline = {name for _, name, _ in parse_importtime(run_importtime("pass")[0])}
+    results = []
+    logger.info(f"{'entry point':<22} {'import ms':>10} {'budget':>8}  heaviest imports")
+    logger.info("-" * 96)
+    for entry in entries:
+        result = measure(entry, baseline, args.repeat)
+        results.append(result)
+        if result.error:
+            logger.info(f"{entry.name:<22} {'error':>10} {entry.budget_ms:>8.0f}  ❌ {result.error}")
+            continue
+        heaviest = sorted(result.breakdown.items(), key=lambda item: -item[1])[:args.top]
+        status = "✅" if result.ok else "❌"
+        logger.info(f"{entry.name:<22} {result.total_ms:>10.1f} {entry.budget_ms:>8.0f}  {status} " +
+                    ", ".join(f"{name} {ms:.0f}" for name, ms in heaviest))
+        if result.heavy:
+            logger.info(f"{'':<43}eagerly imports: {', '.join(result.heavy)}")
+
+    failed = [r for r in results if not r.ok]
+    logger.info("")
+    if failed:
+        logger.error(f"❌ {len(failed)}/{len(results)} entry points over budget: "
+                     f"{', '.join(r.entry.name for r in failed)}")
+        sys.exit(1)
+    logger.info(f"✅ All {len(results)} entry points within budget")
+
+
+if __name__ == "__main__":
+    main()
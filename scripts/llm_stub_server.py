@@ -0,0 +1,212 @@
+"""
+Local stand-in for the Hugging Face text-generation API.
+
+Speaks the same wire format as HFInferenceBackend and can misbehave on
+purpose, so retries, rate limiting and the circuit breaker can be
+exercised without an HF account:
+
+    python scripts/llm_stub_server.py --port 8081 --rate-limit-prob 0.3 --slow-prob 0.1
+    python scripts/llm_stub_server.py --latency-dist lognormal --latency-ms 800 --latency-sigma 0.6
+    HF_INFERENCE_URL=http://localhost:8081/models python api/main.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import math
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+LATENCY_DISTS = ("normal", "lognormal", "exponential", "uniform", "fixed")
+
+
+class StubState:
+    def __init__(self, args):
+        self.args = args
+        self.started_at = time.time()
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+
+def sample_latency(args) -> float:
+    """Generation latency in seconds, drawn from --latency-dist"""
+    mean = args.latency_ms
+    if args.latency_dist == "fixed":
+        ms = mean
+    elif args.latency_dist == "uniform":
+        ms = random.uniform(mean - args.latency_jitter_ms, mean + args.latency_jitter_ms)
+    elif args.latency_dist == "exponential":
+        ms = random.expovariate(1 / mean) if mean > 0 else 0.0
+    elif args.latency_dist == "lognormal":
+        # --latency-ms is the median; sigma sets how heavy the tail is
+        ms = random.lognormvariate(math.log(mean), args.latency_sigma) if mean > 0 else 0.0
+    else:
+        ms = random.gauss(mean, args.latency_jitter_ms)
+    return max(0.0, ms) / 1000
+
+
+def stub_answer(prompt: str) -> str:
+    match = re.search(r"Question:\s*(.+?)\s*(?:\n|$)", prompt)
+    question = match.group(1) if match else "the question"
+    return (
+        f"Based on the provided contract excerpts, the answer to '{question}' "
+        f"is set out in the relevant clause. This is a stub response used for testing."
+    )
+
+
+def make_handler(state: StubState):
+    args = state.args
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *log_args):
+            if args.verbose:
+                super().log_message(fmt, *log_args)
+
+        def _json(self, status: int, body, headers: dict = None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                # Client gave up (timeout, or a hedged request that lost)
+                pass
+
+        def do_GET(self):
+            with state.lock:
+                stats = {
+                    "requests": state.requests,
+                    "rate_limited": state.rate_limited,
+                    "in_flight": state.in_flight,
+                    "max_in_flight": state.max_in_flight
+                }
+            self._json(200, stats)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+
+            with state.lock:
+                state.requests += 1
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            try:
+                self._generate(payload)
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+        def _generate(self, payload: dict):
+            if time.time() - state.started_at < args.loading_seconds:
+                remaining = args.loading_seconds - (time.time() - state.started_at)
+                self._json(503, {"error": "Model is currently loading", "estimated_time": remaining})
+                return
+
+            max_tokens = payload.get("parameters", {}).get("max_new_tokens", 500)
+            if not isinstance(max_tokens, int) or max_tokens <= 0:
+                # Same validation error TGI returns for a bad parameter
+                self._json(422, {"error": "Input validation error: `max_new_tokens` must be strictly positive"})
+                return
+
+            if random.random() < args.rate_limit_prob:
+                with state.lock:
+                    state.rate_limited += 1
+                self._json(429, {"error": "Rate limit reached"}, {"Retry-After": str(args.retry_after)})
+                return
+
+            if random.random() < args.error_prob:
+                self._json(500, {"error": "Internal stub error"})
+                return
+
+            latency = sample_latency(args)
+            # Prompt processing cost, roughly 4 characters per token
+            latency += len(payload.get("inputs", "")) / 4 * args.ms_per_input_token / 1000
+            if random.random() < args.slow_prob:
+                latency += args.slow_ms / 1000
+
+            answer = stub_answer(payload.get("inputs", ""))
+            tokens = re.findall(r"\S+\s*", answer)[:max_tokens]
+
+            if payload.get("stream"):
+                self._stream(tokens, latency)
+            else:
+                time.sleep(latency)
+                self._json(200, [{"generated_text": "".join(tokens)}])
+
+        def _stream(self, tokens, latency: float):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            # Time to first token, then evenly spaced tokens
+            time.sleep(latency * 0.3)
+            per_token = latency * 0.7 / max(1, len(tokens))
+            try:
+                for i, text in enumerate(tokens):
+                    event = {"token": {"id": i, "text": text, "special": False}}
+                    if i == len(tokens) - 1:
+                        event["generated_text"] = "".join(tokens)
+                    self._chunk(f"data:{json.dumps(event)}\n\n".encode())
+                    time.sleep(per_token)
+                self._chunk(b"")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def _chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the HF text-generation API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTS, default="normal",
+                        help="Shape of the generation latency distribution")
+    parser.add_argument("--latency-ms", type=float, default=300, help="Mean (median for lognormal) generation latency")
+    parser.add_argument("--latency-jitter-ms", type=float, default=50,
+                        help="Std-dev (normal) or half-width (uniform) of generation latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-space std-dev for lognormal latency")
+    parser.add_argument("--ms-per-input-token", type=float, default=0.0, help="Extra latency per prompt token")
+    parser.add_argument("--slow-prob", type=float, default=0.0, help="Fraction of requests that are slow")
+    parser.add_argument("--slow-ms", type=float, default=5000, help="Extra latency of a slow request")
+    parser.add_argument("--rate-limit-prob", type=float, default=0.0, help="Fraction of requests answered 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After header on 429s")
+    parser.add_argument("--error-prob", type=float, default=0.0, help="Fraction of requests answered 500")
+    parser.add_argument("--loading-seconds", type=float, default=0.0, help="Answer 503 'loading' for this long after start")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    state = StubState(args)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    print(f"🧪 LLM stub listening on http://{args.host}:{args.port}/models/<model>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
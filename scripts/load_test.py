@@ -0,0 +1,375 @@
+"""
+End-to-end load test of the API's /query endpoint.
+
+Runs a sweep of load steps and reports, for each one, throughput, latency
+percentiles and error rates, then the knee of the latency curve (where
+extra load starts buying latency instead of throughput).
+
+- closed loop (--concurrency 1,2,4,8): N clients, each sending its next
+  question as soon as the previous answer arrives;
+- open loop (--rates 1,2,5,10): requests arrive at a fixed rate (Poisson or
+  evenly spaced) whether or not earlier ones finished.  Latency is measured
+  from the scheduled arrival time, so a backed-up server isn't hidden by
+  the client slowing down (coordinated omission).
+
+    # start the LLM stub and the API with caches off, then sweep concurrency
+    python scripts/load_test.py --launch --concurrency 1,2,4,8,16 --stub-args "--latency-dist lognormal --latency-ms 600"
+    # open-loop arrivals against an already running server
+    python scripts/load_test.py --url http://localhost:8000 --rates 1,2,4,8 --duration 60
+
+Questions come from --questions (JSONL with a "question" field, or one
+question per line), else data/processed/eval_qa.jsonl, else the synthetic
+contract generator.  Against a running server, disable RESPONSE_CACHE and
+SEMANTIC_CACHE there, or repeated questions will measure the caches.
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import shlex
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from src.config import config
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).parent.parent
+STUB = Path(__file__).parent / "llm_stub_server.py"
+
+# (scheduled start, latency seconds, status: HTTP code or "timeout" / "error" / "dropped")
+Sample = Tuple[float, float, object]
+
+
+def load_questions(path: Optional[Path], seed: int) -> List[str]:
+    path = path or config.PROCESSED_DATA_DIR / "eval_qa.jsonl"
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        if path.suffix == ".jsonl":
+            questions = [json.loads(line)["question"] for line in lines]
+        else:
+            questions = lines
+        logger.info(f"Loaded {len(questions)} questions from {path}")
+    else:
+        from src.data.synthetic import SyntheticContractGenerator
+
+        generator = SyntheticContractGenerator(seed)
+        questions = [q["question"] for i in range(200) for q in generator.eval_questions(generator.generate(i))]
+        logger.info(f"Generated {len(questions)} synthetic questions")
+    random.Random(seed).shuffle(questions)
+    return questions
+
+
+# --------------------------------------------------------------------------- stack
+
+def wait_for(url: str, timeout: float, healthy=lambda r: r.status_code == 200) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if healthy(httpx.get(url, timeout=1)):
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    return False
+
+
+def launch_stack(args) -> List[subprocess.Popen]:
+    """Start the LLM stub and the API (caches off unless --keep-caches); returns the processes"""
+    procs = []
+    args.stack_log.parent.mkdir(parents=True, exist_ok=True)
+    log = open(args.stack_log, "w")
+    stub = subprocess.Popen(
+        [sys.executable, str(STUB), "--port", str(args.stub_port), *shlex.split(args.stub_args)],
+        stdout=log, stderr=subprocess.STDOUT
+    )
+    procs.append(stub)
+    if not wait_for(f"http://127.0.0.1:{args.stub_port}/", 10):
+        stop_stack(procs)
+        raise RuntimeError("LLM stub did not start")
+
+    env = dict(os.environ, HF_INFERENCE_URL=f"http://127.0.0.1:{args.stub_port}/models")
+    if not args.keep_caches:
+        env.update(RESPONSE_CACHE_ENABLED="false", SEMANTIC_CACHE_ENABLED="false")
+    for item in args.api_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.api_port), "--log-level", "warning"],
+        cwd=ROOT / "api", env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    procs.append(api)
+    logger.info(f"Waiting for the API to load the model and index (logs: {args.stack_log})...")
+    if not wait_for(f"{args.url}/ready", args.startup_timeout):
+        stop_stack(procs)
+        raise RuntimeError(f"API did not become ready; see {args.stack_log}")
+    return procs
+
+
+def stop_stack(procs: List[subprocess.Popen]):
+    for proc in reversed(procs):
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# --------------------------------------------------------------------------- load generation
+
+async def send(client: httpx.AsyncClient, url: str, question: str, top_k: int, scheduled: float) -> Sample:
+    try:
+        response = await client.post(url, json={"question": question, "top_k": top_k, "return_sources": False})
+        status = response.status_code
+    except httpx.TimeoutException:
+        status = "timeout"
+    except httpx.HTTPError:
+        status = "error"
+    return scheduled, time.perf_counter() - scheduled, status
+
+
+async def closed_loop(client, url, questions, concurrency: int, duration: float, top_k: int) -> List[Sample]:
+    deadline = time.perf_counter() + duration
+    samples: List[Sample] = []
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            samples.append(await send(client, url, next(questions), top_k, time.perf_counter()))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def open_loop(client, url, questions, rate: float, duration: float, top_k: int,
+                    arrival: str, max_outstanding: int, rng: random.Random) -> List[Sample]:
+    start = time.perf_counter()
+    samples: List[Sample] = []
+    pending = set()
+    scheduled = start
+    while scheduled < start + duration:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(pending) >= max_outstanding:
+            # The client can't keep up with the arrival rate; count it against the server
+            samples.append((scheduled, 0.0, "dropped"))
+        else:
+            task = asyncio.ensure_future(send(client, url, next(questions), top_k, scheduled))
+            pending.add(task)
+            task.add_done_callback(lambda t: (pending.discard(t), samples.append(t.result())))
+        scheduled += rng.expovariate(rate) if arrival == "poisson" else 1 / rate
+    if pending:
+        await asyncio.wait(set(pending))
+    return samples
+
+
+def summarize(samples: List[Sample], measured_from: float, measured_until: float) -> Dict:
+    window = [s for s in samples if measured_from <= s[0] < measured_until]
+    elapsed = measured_until - measured_from
+    ok = [latency for _, latency, status in window if status == 200]
+    errors: Dict[str, int] = {}
+    for _, _, status in window:
+        if status != 200:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+
+    summary = {
+        "requests": len(window),
+        "ok": len(ok),
+        "throughput": len(ok) / elapsed if elapsed > 0 else 0.0,
+        "error_rate": (len(window) - len(ok)) / len(window) if window else 0.0,
+        "errors": errors
+    }
+    if ok:
+        ms = np.asarray(ok) * 1000
+        summary.update({
+            "mean_ms": float(ms.mean()),
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p90_ms": float(np.percentile(ms, 90)),
+            "p95_ms": float(np.percentile(ms, 95)),
+            "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max())
+        })
+    return summary
+
+
+async def run_step(args, questions, mode: str, load: float, rng: random.Random) -> Dict:
+    outstanding = args.max_outstanding if mode == "rate" else int(load)
+    limits = httpx.Limits(max_connections=outstanding, max_keepalive_connections=outstanding)
+    url = f"{args.url}/query"
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        start = time.perf_counter()
+        if mode == "concurrency":
+            samples = await closed_loop(client, url, questions, int(load), args.warmup + args.duration, args.top_k)
+        else:
+            samples = await open_loop(client, url, questions, load, args.warmup + args.duration, args.top_k,
+                                      args.arrival, args.max_outstanding, rng)
+    summary = summarize(samples, start + args.warmup, start + args.warmup + args.duration)
+    return {mode: load, **summary}
+
+
+# --------------------------------------------------------------------------- analysis
+
+def find_knee(steps: List[Dict], mode: str, metric: str = "p95_ms") -> Optional[Dict]:
+    """
+    Kneedle on (offered load, latency): scale both to [0, 1] and take the
+    step furthest above the diagonal, i.e. where throughput gains stop
+    keeping up with latency growth.
+    """
+    points = [(s[mode], s[metric]) for s in steps if metric in s]
+    if len(points) < 3:
+        return None
+    x = np.array([p[0] for p in points], dtype=float)
+    y = np.array([p[1] for p in points], dtype=float)
+    if np.ptp(x) == 0 or np.ptp(y) == 0:
+        return None
+    xn = (x - x.min()) / np.ptp(x)
+    yn = (y - y.min()) / np.ptp(y)
+    # Latency curves are convex: the knee is where the curve sags furthest below the chord
+    difference = xn - yn
+    knee = int(np.argmax(difference))
+    if difference[knee] <= 0:
+        return None
+    return next(s for s in steps if s[mode] == points[knee][0])
+
+
+def print_table(steps: List[Dict], mode: str):
+    header = f"{mode:>12} {'req':>6} {'ok/s':>8} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  errors"
+    logger.info(header)
+    logger.info("-" * len(header))
+    for s in steps:
+        logger.info(
+            f"{s[mode]:>12g} {s['requests']:>6} {s['throughput']:>8.2f} {s['error_rate'] * 100:>6.1f} "
+            f"{s.get('p50_ms', float('nan')):>9.0f} {s.get('p95_ms', float('nan')):>9.0f} "
+            f"{s.get('p99_ms', float('nan')):>9.0f} {s.get('max_ms', float('nan')):>9.0f}  "
+            f"{', '.join(f'{k}: {v}' for k, v in sorted(s['errors'].items())) or '-'}"
+        )
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args, questions: List[str]) -> List[Dict]:
+    mode = "rate" if args.rates else "concurrency"
+    loads = [float(v) for v in (args.rates or args.concurrency).split(",")]
+    cycle = itertools.cycle(questions)
+    rng = random.Random(args.seed)
+    steps = []
+    for load in loads:
+        logger.info(f"▶ {mode} {load:g}: {args.warmup:g}s warm-up + {args.duration:g}s")
+        step = await run_step(args, cycle, mode, load, rng)
+        steps.append(step)
+        logger.info(
+            f"  {step['throughput']:.2f} ok/s, p95 {step.get('p95_ms', float('nan')):.0f} ms, "
+            f"errors {step['error_rate']:.1%}"
+        )
+        if step["error_rate"] > args.stop_error_rate:
+            logger.warning(f"⚠️  Error rate above {args.stop_error_rate:.0%}; stopping the sweep")
+            break
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the RAG API's /query endpoint")
+    parser.add_argument("--url", default=None, help="API base URL (default: http://127.0.0.1:<api-port>)")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", default="1,2,4,8,16", help="Closed-loop client counts to sweep")
+    load.add_argument("--rates", default=None, help="Open-loop arrival rates (requests/s) to sweep")
+    parser.add_argument("--arrival", choices=["poisson", "uniform"], default="poisson")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before each step")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request client timeout")
+    parser.add_argument("--max-outstanding", type=int, default=512, help="Open-loop cap on in-flight requests")
+    parser.add_argument("--stop-error-rate", type=float, default=0.5, help="Stop the sweep above this error rate")
+    parser.add_argument("--slo-ms", type=float, default=None, help="p95 target for the 'max sustainable' report")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error budget for 'max sustainable'")
+    parser.add_argument("--top-k", type=int, default=config.TOP_K)
+    parser.add_argument("--questions", type=Path, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None)
+    stack = parser.add_argument_group("local stack")
+    stack.add_argument("--launch", action="store_true", help="Start the LLM stub and the API for the run")
+    stack.add_argument("--api-port", type=int, default=8010)
+    stack.add_argument("--stub-port", type=int, default=8091)
+    stack.add_argument("--stub-args", default="", help="Extra llm_stub_server.py arguments, e.g. latency shape")
+    stack.add_argument("--api-env", action="append", default=[], help="KEY=VALUE for the API process (repeatable)")
+    stack.add_argument("--keep-caches", action="store_true", help="Leave the response and semantic caches on")
+    stack.add_argument("--startup-timeout", type=float, default=300)
+    stack.add_argument("--stack-log", type=Path, default=config.PROJECT_ROOT / "logs" / "load_test_stack.log",
+                       help="Where the stub's and API's output goes")
+    args = parser.parse_args()
+    args.url = (args.url or f"http://127.0.0.1:{args.api_port}").rstrip("/")
+
+    questions = load_questions(args.questions, args.seed)
+    procs = launch_stack(args) if args.launch else []
+    try:
+        steps = asyncio.run(run(args, questions))
+    finally:
+        stop_stack(procs)
+
+    mode = "rate" if args.rates else "concurrency"
+    logger.info("")
+    print_table(steps, mode)
+
+    knee = find_knee(steps, mode)
+    peak = max(steps, key=lambda s: s["throughput"])
+    within = [
+        s for s in steps
+        if s["error_rate"] <= args.max_error_rate and (args.slo_ms is None or s.get("p95_ms", float("inf")) <= args.slo_ms)
+    ]
+    sustainable = max(within, key=lambda s: s["throughput"]) if within else None
+
+    logger.info("")
+    logger.info(f"Peak throughput: {peak['throughput']:.2f} ok/s at {mode} {peak[mode]:g}")
+    if knee:
+        logger.info(f"Knee: {mode} {knee[mode]:g} ({knee['throughput']:.2f} ok/s, p95 {knee['p95_ms']:.0f} ms)")
+    else:
+        logger.info("Knee: not found (latency didn't bend within the sweep; try higher load)")
+    if sustainable:
+        limit = f"p95 <= {args.slo_ms:g} ms and " if args.slo_ms else ""
+        logger.info(f"Max sustainable ({limit}errors <= {args.max_error_rate:.0%}): "
+                    f"{sustainable['throughput']:.2f} ok/s at {mode} {sustainable[mode]:g}")
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "url": args.url,
+            "launched": args.launch,
+            "stub_args": args.stub_args if args.launch else None,
+            "questions": len(questions),
+            "args": {k: str(v) for k, v in vars(args).items()}
+        },
+        "mode": mode,
+        "steps": steps,
+        "knee": knee,
+        "peak": peak,
+        "max_sustainable": sustainable
+    }
+    output = args.output or config.DATA_DIR / "benchmarks" / f"load-{results['meta']['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    logger.info(f"✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
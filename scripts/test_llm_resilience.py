@@ -0,0 +1,235 @@
+"""
+Exercise the resilient LLM client against scripts/llm_stub_server.py.
+
+Starts a stub per scenario on a local port and checks that:
+  1. 429s are retried with backoff until the call succeeds
+  2. the per-backend semaphore caps parallel calls
+  3. slow responses time out, and repeated failures open the circuit
+  4. a cancelled half-open probe doesn't leave the circuit stuck half-open
+  5. client errors (422 for a bad parameter) neither retry nor open the circuit
+  6. setting the cancel event aborts an in-flight request (a hedge that lost)
+"""
+
+import asyncio
+import sys
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import requests
+
+from src.rag.backends import HFInferenceBackend, AsyncHFInferenceBackend
+from src.rag.resilience import (
+    ResilientBackend, AsyncResilientBackend, TokenBucket, CircuitBreaker, RetryPolicy,
+    CircuitOpenError, LLMError, CallCancelledError, CancelEvent
+)
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STUB = Path(__file__).parent / "llm_stub_server.py"
+PORT = 8099
+BASE_URL = f"http://127.0.0.1:{PORT}/models"
+
+
+def start_stub(*args) -> subprocess.Popen:
+    proc = subprocess.Popen([sys.executable, str(STUB), "--port", str(PORT), "--seed", "7", *args])
+    for _ in range(50):
+        try:
+            requests.get(f"http://127.0.0.1:{PORT}/", timeout=0.2)
+            return proc
+        except requests.exceptions.RequestException:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("Stub server did not start")
+
+
+def stub_stats() -> dict:
+    return requests.get(f"http://127.0.0.1:{PORT}/", timeout=1).json()
+
+
+def make_client(timeout: float = 5, max_concurrency: int = 4, **breaker) -> ResilientBackend:
+    return ResilientBackend(
+        HFInferenceBackend("stub-model", base_url=BASE_URL, timeout=timeout),
+        max_concurrency=max_concurrency,
+        rate_limiter=TokenBucket(rate=50, capacity=50),
+        circuit_breaker=CircuitBreaker(**breaker) if breaker else CircuitBreaker(5, 1.0),
+        retry_policy=RetryPolicy(max_attempts=6, base_delay=0.05, max_delay=0.2)
+    )
+
+
+def scenario_rate_limits() -> bool:
+    logger.info("\n" + "-" * 60)
+    logger.info("Scenario 1: 50% of requests answered 429")
+    proc = start_stub("--rate-limit-prob", "0.5", "--retry-after", "0.1", "--latency-ms", "20")
+    try:
+        client = make_client()
+        answers = [client.generate("Question: What is the term?\n", max_new_tokens=20) for _ in range(10)]
+        stats = stub_stats()
+        logger.info(f"  Client: {client.stats()}")
+        logger.info(f"  Stub:   {stats}")
+        ok = all(answers) and client.retries > 0 and client.failures == 0
+        logger.info(f"  {'✅' if ok else '❌'} all {len(answers)} calls succeeded after {client.retries} retries")
+        return ok
+    finally:
+        proc.terminate()
+
+
+def scenario_concurrency_cap() -> bool:
+    logger.info("\n" + "-" * 60)
+    logger.info("Scenario 2: 16 parallel callers, semaphore of 3")
+    proc = start_stub("--latency-ms", "200", "--latency-jitter-ms", "0")
+    try:
+        client = make_client(max_concurrency=3)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(lambda _: client.generate("Question: Who pays?\n"), range(16)))
+        stats = stub_stats()
+        ok = stats["max_in_flight"] <= 3
+        logger.info(f"  {'✅' if ok else '❌'} stub saw at most {stats['max_in_flight']} concurrent requests")
+        return ok
+    finally:
+        proc.terminate()
+
+
+def scenario_slow_backend() -> bool:
+    logger.info("\n" + "-" * 60)
+    logger.info("Scenario 3: every response takes 2s, client timeout 0.3s")
+    proc = start_stub("--latency-ms", "2000", "--latency-jitter-ms", "0")
+    try:
+        client = make_client(timeout=0.3, failure_threshold=3, reset_timeout=60)
+        try:
+            client.generate("Question: Slow?\n")
+            logger.info("  ❌ expected a timeout")
+            return False
+        except LLMError as e:
+            logger.info(f"  Gave up after retries: {e.__class__.__name__}")
+
+        start = time.time()
+        try:
+            client.generate("Question: Still slow?\n")
+            return False
+        except CircuitOpenError:
+            elapsed = time.time() - start
+            ok = elapsed < 0.05
+            logger.info(f"  {'✅' if ok else '❌'} circuit open, failed fast in {elapsed * 1000:.1f}ms")
+            return ok
+    finally:
+        proc.terminate()
+
+
+def scenario_cancelled_probe() -> bool:
+    logger.info("\n" + "-" * 60)
+    logger.info("Scenario 4: half-open probe cancelled (client disconnect / lost hedge)")
+    proc = start_stub("--latency-ms", "500", "--latency-jitter-ms", "0")
+
+    async def run() -> bool:
+        client = make_client(failure_threshold=1, reset_timeout=0.2)
+        async_client = AsyncResilientBackend(AsyncHFInferenceBackend("stub-model", base_url=BASE_URL), client)
+        breaker = client.circuit_breaker
+        try:
+            breaker.record_failure()
+            await asyncio.sleep(0.25)
+
+            probe = asyncio.create_task(async_client.generate("Question: Probe?\n"))
+            await asyncio.sleep(0.1)
+            logger.info(f"  Probe in flight: state {breaker.state}")
+            probe.cancel()
+            await asyncio.gather(probe, return_exceptions=True)
+
+            try:
+                answer = await async_client.generate("Question: After the probe?\n")
+            except CircuitOpenError:
+                logger.info(f"  ❌ circuit stuck {breaker.state} after the cancelled probe")
+                return False
+            ok = bool(answer) and breaker.state == CircuitBreaker.CLOSED
+            logger.info(f"  {'✅' if ok else '❌'} next call probed and closed the circuit ({breaker.state})")
+            return ok
+        finally:
+            await async_client.backend.aclose()
+
+    try:
+        return asyncio.run(run())
+    finally:
+        proc.terminate()
+
+
+def scenario_client_errors() -> bool:
+    logger.info("\n" + "-" * 60)
+    logger.info("Scenario 5: repeated 422s for a bad parameter")
+    proc = start_stub("--latency-ms", "20", "--latency-jitter-ms", "0")
+    try:
+        client = make_client(failure_threshold=3, reset_timeout=60)
+        rejected = 0
+        for _ in range(6):
+            try:
+                client.generate("Question: Bad parameter?\n", max_new_tokens=0)
+            except CircuitOpenError:
+                break
+            except LLMError:
+                rejected += 1
+
+        state = client.circuit_breaker.state
+        if state != CircuitBreaker.CLOSED:
+            logger.info(f"  ❌ circuit {state} after {rejected} client errors")
+            return False
+        answer = client.generate("Question: Still served?\n", max_new_tokens=20)
+        ok = rejected == 6 and client.retries == 0 and state == CircuitBreaker.CLOSED and bool(answer)
+        logger.info(f"  {'✅' if ok else '❌'} {rejected} rejected without retries, circuit {state}")
+        return ok
+    finally:
+        proc.terminate()
+
+
+def scenario_cancel_in_flight() -> bool:
+    logger.info("\n" + "-" * 60)
+    logger.info("Scenario 6: cancelling an in-flight request")
+    proc = start_stub("--latency-ms", "2000", "--latency-jitter-ms", "0")
+    try:
+        client = make_client()
+        cancel = CancelEvent()
+        threading.Timer(0.2, cancel.set).start()
+        start = time.time()
+        try:
+            client.generate("Question: Lost the hedge?\n", cancel=cancel)
+            logger.info("  ❌ request was not cancelled")
+            return False
+        except CallCancelledError:
+            elapsed = time.time() - start
+        free_slots = client._semaphore._value
+
+        # The aborted connection must not poison the pool
+        answer = client.generate("Question: Next one?\n", cancel=CancelEvent())
+        ok = elapsed < 1.0 and free_slots == client.max_concurrency and bool(answer)
+        logger.info(f"  {'✅' if ok else '❌'} aborted after {elapsed:.2f}s of a 2s request, "
+                    f"{free_slots}/{client.max_concurrency} slots free, next call answered")
+        return ok
+    finally:
+        proc.terminate()
+
+
+def main():
+    logger.info("=" * 60)
+    logger.info("TESTING RESILIENT LLM CLIENT")
+    logger.info("=" * 60)
+
+    results = {
+        "rate_limits": scenario_rate_limits(),
+        "concurrency_cap": scenario_concurrency_cap(),
+        "slow_backend": scenario_slow_backend(),
+        "cancelled_probe": scenario_cancelled_probe(),
+        "client_errors": scenario_client_errors(),
+        "cancel_in_flight": scenario_cancel_in_flight()
+    }
+
+    logger.info("\n" + "=" * 60)
+    for name, ok in results.items():
+        logger.info(f"  {'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(results.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Tune nprobe (IVF) or efSearch (HNSW) of an index against a recall target.
+
+Encodes the eval questions, uses exact search over the index's own vectors
+as ground truth, sweeps the search parameter, prints the recall / p95
+latency Pareto frontier and saves the cheapest setting that reaches
+--target-recall next to the index (search_params.json).  A running API
+picks it up on the next POST /admin/reload.
+
+    python scripts/tune_index.py --target-recall 0.95
+    python scripts/tune_index.py --version 20240301-120000 --target-recall 0.98 --slo-ms 2 --dry-run
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.config import config
+from src.retrieval.autotune import SearchParamTuner, pareto_frontier, choose, stored_vectors
+from src.retrieval.index_registry import IndexRegistry
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def load_queries(args, store) -> np.ndarray:
+    queries = []
+    if args.eval_set.exists():
+        from src.models.embedder import SBERTEmbedder
+
+        with open(args.eval_set, encoding="utf-8") as f:
+            questions = [json.loads(line)["question"] for line in f if line.strip()]
+        questions = questions[:args.max_queries]
+        logger.info(f"Encoding {len(questions)} eval questions from {args.eval_set}")
+        queries.append(SBERTEmbedder().encode(questions, batch_size=64))
+    else:
+        logger.warning(f"⚠️  Eval set not found: {args.eval_set}")
+
+    if args.sample_chunks:
+        # Stored chunk vectors, slightly perturbed, stand in for more questions on small eval sets
+        rng = np.random.default_rng(args.seed)
+        vectors = stored_vectors(store.index)
+        rows = vectors[rng.choice(len(vectors), size=min(args.sample_chunks, len(vectors)), replace=False)]
+        noisy = rows + 0.05 * rng.standard_normal(rows.shape).astype(np.float32)
+        queries.append(noisy / np.linalg.norm(noisy, axis=1, keepdims=True))
+
+    if not queries:
+        raise SystemExit("❌ No queries: provide --eval-set or --sample-chunks")
+    return np.vstack(queries).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune ANN search parameters against a recall target")
+    parser.add_argument("--version", default=None, help="Index version (default: CURRENT)")
+    parser.add_argument("--eval-set", type=Path, default=config.PROCESSED_DATA_DIR / "eval_qa.jsonl")
+    parser.add_argument("--max-queries", type=int, default=2000)
+    parser.add_argument("--sample-chunks", type=int, default=0, help="Extra queries drawn from stored chunks")
+    parser.add_argument("--target-recall", type=float, default=0.95, help="recall@k against exact search")
+    parser.add_argument("--slo-ms", type=float, default=None, help="p95 single-query search budget")
+    parser.add_argument("--top-k", type=int, default=config.TOP_K)
+    parser.add_argument("--values", default=None, help="Comma-separated values to try (default: built-in grid)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed passes over the queries per value")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dry-run", action="store_true", help="Report only; don't save the choice")
+    args = parser.parse_args()
+
+    registry = IndexRegistry()
+    index_path, _, version = registry.resolve(args.version)
+    store = registry.load(version)
+    if store.index_type == "flat":
+        logger.info("Index is flat (exact search); nothing to tune")
+        return
+
+    queries = load_queries(args, store)
+    tuner = SearchParamTuner(store, queries, top_k=args.top_k, repeats=args.repeats)
+    logger.info(f"Sweeping {tuner.param} for {store.index_type} index {version} "
+                f"({store.index.ntotal} vectors, {len(queries)} queries)")
+    values = [int(v) for v in args.values.split(",")] if args.values else None
+    trials = tuner.sweep(values)
+
+    frontier = pareto_frontier(trials)
+    logger.info("")
+    logger.info(f"Pareto frontier (recall@{args.top_k} vs p95):")
+    logger.info(f"  {tuner.param:>10} {'recall':>8} {'p50 ms':>9} {'p95 ms':>9}")
+    for t in frontier:
+        logger.info(f"  {t.value:>10} {t.recall:>8.4f} {t.p50_ms:>9.3f} {t.p95_ms:>9.3f}")
+
+    chosen = choose(frontier, args.target_recall, args.slo_ms)
+    if chosen is None:
+        best = frontier[-1]
+        slo = f" within p95 {args.slo_ms:g}ms" if args.slo_ms else ""
+        logger.error(f"❌ No setting reaches recall {args.target_recall}{slo} "
+                     f"(best: {tuner.param}={best.value}, recall {best.recall:.4f}, p95 {best.p95_ms:.3f}ms). "
+                     "Rebuild with a larger nlist / M or relax the target.")
+        sys.exit(1)
+
+    logger.info("")
+    logger.info(f"✅ Chosen: {tuner.param}={chosen.value} (recall {chosen.recall:.4f}, p95 {chosen.p95_ms:.3f}ms)")
+    if args.dry_run:
+        return
+
+    store.set_search_params(**{tuner.param: chosen.value})
+    store.tuning = {
+        "param": tuner.param,
+        "value": chosen.value,
+        "top_k": args.top_k,
+        "target_recall": args.target_recall,
+        "slo_ms": args.slo_ms,
+        "recall": chosen.recall,
+        "p50_ms": chosen.p50_ms,
+        "p95_ms": chosen.p95_ms,
+        "queries": len(queries),
+        "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "frontier": [t.to_dict() for t in frontier]
+    }
+    store.save_search_params(index_path)
+    logger.info("Running API? Apply it with: "
+                "curl -X POST -H \"Authorization: Bearer $ADMIN_TOKEN\" http://localhost:8000/admin/reload")
+
+
+if __name__ == "__main__":
+    main()
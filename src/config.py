@@ -14,6 +14,8 @@ class Config:
     PROCESSED_DATA_DIR = DATA_DIR / "processed"
     MODELS_DIR = PROJECT_ROOT / "models"
     EMBEDDINGS_DIR = DATA_DIR / "embeddings"
+    INDEX_VERSIONS_DIR = EMBEDDINGS_DIR / "versions"
+    INDEX_CURRENT_FILE = EMBEDDINGS_DIR / "CURRENT"
     
     # Model Configuration
     BASE_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
@@ -33,9 +35,42 @@ class Config:
     # Retrieval Parameters
     TOP_K = 5
     SIMILARITY_THRESHOLD = 0.0  # Accept all results
+    WARMUP_QUERY = "termination clause"
+    WARMUP_ROUNDS = int(os.getenv("WARMUP_ROUNDS", "3"))  # dummy queries before the API reports ready
+    
+    # FAISS index type for new builds: "flat" (exact), "ivf" or "hnsw" (approximate)
+    INDEX_TYPE = os.getenv("INDEX_TYPE", "flat").lower()
+    IVF_NLIST = int(os.getenv("IVF_NLIST", "0"))              # 0 = ~4*sqrt(num_chunks)
+    IVF_NPROBE = int(os.getenv("IVF_NPROBE", "16"))
+    HNSW_M = int(os.getenv("HNSW_M", "32"))
+    HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+    HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+    
+    # Online recall of ivf / hnsw indexes against exact search (src/retrieval/recall_monitor.py)
+    RECALL_MONITOR_ENABLED = os.getenv("RECALL_MONITOR_ENABLED", "true").lower() == "true"
+    RECALL_MONITOR_SAMPLE_RATE = float(os.getenv("RECALL_MONITOR_SAMPLE_RATE", "0.01"))  # fraction of queries
+    RECALL_MONITOR_TOP_K = int(os.getenv("RECALL_MONITOR_TOP_K", "10"))
+    RECALL_MONITOR_WINDOW = int(os.getenv("RECALL_MONITOR_WINDOW", "500"))   # samples in the rolling recall
     
     # RAG Parameters
-    MAX_CONTEXT_LENGTH = 2000
+    MAX_CONTEXT_TOKENS = int(os.getenv("MAX_CONTEXT_TOKENS", "512"))
+    CONTEXT_TOKENIZER = os.getenv("CONTEXT_TOKENIZER", "cl100k_base")  # tiktoken encoding
+    
+    # Extractive compression of the retrieved context (sentence selection)
+    CONTEXT_COMPRESSION = os.getenv("CONTEXT_COMPRESSION", "false").lower() == "true"
+    COMPRESSION_MAX_TOKENS = int(os.getenv("COMPRESSION_MAX_TOKENS", "256"))
+    COMPRESSION_MIN_SIMILARITY = float(os.getenv("COMPRESSION_MIN_SIMILARITY", "0.1"))
+    
+    # Semantic answer cache
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1024"))
+    SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+    
+    # Exact-match response cache (API layer)
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
     
     # LLM Configuration
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -43,6 +78,54 @@ class Config:
     LLM_TEMPERATURE = 0.3
     MAX_TOKENS = 500
     
+    # Hugging Face text generation (any endpoint speaking the HF/TGI wire format)
+    HF_MODEL = os.getenv("HF_MODEL", "mistralai/Mistral-7B-Instruct-v0.2")
+    HF_INFERENCE_URL_DEFAULT = "https://api-inference.huggingface.co/models"
+    HF_INFERENCE_URL = os.getenv("HF_INFERENCE_URL", HF_INFERENCE_URL_DEFAULT)
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+    LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "16"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+    LLM_RATE_LIMIT = float(os.getenv("LLM_RATE_LIMIT", "2.0"))      # requests / second
+    LLM_RATE_BURST = float(os.getenv("LLM_RATE_BURST", "4"))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))        # attempts, including the first
+    LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+    LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+    LLM_CIRCUIT_FAILURES = int(os.getenv("LLM_CIRCUIT_FAILURES", "5"))
+    LLM_CIRCUIT_RESET = float(os.getenv("LLM_CIRCUIT_RESET", "30"))
+    
+    # "hf" (any HF/TGI-compatible endpoint) or "local" (in-process transformers on CPU)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "hf").lower()
+    LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "HuggingFaceTB/SmolLM2-135M-Instruct")
+    LOCAL_LLM_DEVICE = os.getenv("LOCAL_LLM_DEVICE", "cpu")
+    LOCAL_LLM_THREADS = int(os.getenv("LOCAL_LLM_THREADS", "0"))    # 0 = torch default
+    LOCAL_LLM_CONCURRENCY = int(os.getenv("LOCAL_LLM_CONCURRENCY", "1"))
+    
+    # Extra backends for hedging: comma-separated "model" or "model@base_url"
+    LLM_BACKENDS = os.getenv("LLM_BACKENDS", "")
+    LLM_HEDGING = os.getenv("LLM_HEDGING", "true").lower() == "true"
+    LLM_MAX_HEDGES = int(os.getenv("LLM_MAX_HEDGES", "1"))
+    LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+    LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5"))
+    LLM_HEDGE_MAX_DELAY = float(os.getenv("LLM_HEDGE_MAX_DELAY", "10"))
+    LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "3"))
+    
+    # Offline batch jobs (scripts/batch_answer.py)
+    BATCH_JOB_SIZE = int(os.getenv("BATCH_JOB_SIZE", "32"))               # questions per encode/search call
+    BATCH_JOB_CONCURRENCY = int(os.getenv("BATCH_JOB_CONCURRENCY", "4"))  # generation calls in flight
+    
+    # Request tracing (src/utils/tracing.py)
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "json").lower()       # json, log or otlp
+    TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))   # fraction of requests traced
+    TRACING_JSON_PATH = os.getenv("TRACING_JSON_PATH", str(PROJECT_ROOT / "logs" / "traces.jsonl"))
+    TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "legal-rag-api")
+    
+    # On-demand profiling (/admin/profiler/*)
+    PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0.1"))   # fraction of queries profiled
+    PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))     # stack sampling period
+    PROFILER_MAX_DURATION = float(os.getenv("PROFILER_MAX_DURATION", "600")) # sessions stop on their own
+    
     # MLOps
     WANDB_PROJECT = "legal-rag-sbert"
     WANDB_API_KEY = os.getenv("WANDB_API_KEY")
@@ -50,5 +133,11 @@ class Config:
     # API
     API_HOST = "0.0.0.0"
     API_PORT = 8000
+    API_WORKER_THREADS = int(os.getenv("API_WORKER_THREADS", "4"))
+    API_MAX_CONCURRENT_QUERIES = int(os.getenv("API_MAX_CONCURRENT_QUERIES", "8"))
+    API_QUEUE_TIMEOUT = float(os.getenv("API_QUEUE_TIMEOUT", "30"))
+    API_BATCH_MAX_QUESTIONS = int(os.getenv("API_BATCH_MAX_QUESTIONS", "32"))
+    API_BATCH_CONCURRENCY = int(os.getenv("API_BATCH_CONCURRENCY", "4"))  # generation calls per /query/batch
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # bearer token for /admin/*; unset disables those routes
 
 config = Config()
\ No newline at end of file
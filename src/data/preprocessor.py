@@ -1,12 +1,13 @@
 import re
 from typing import List, Dict
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 import logging
 
 logger = logging.getLogger(__name__)
 
 class TextPreprocessor:
     def __init__(self, chunk_size: int = 512, chunk_overlap: int = 50):
+        from langchain_text_splitters import RecursiveCharacterTextSplitter  # pulls in langchain_core
+        
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         
@@ -17,7 +18,8 @@ class TextPreprocessor:
             separators=["\n\n", "\n", ". ", " ", ""]
         )
     
-    def clean_text(self, text: str) -> str:
+    @staticmethod
+    def clean_text(text: str) -> str:
         text = re.sub(r'\s+', ' ', text)
         text = re.sub(r'[^\w\s.,!?;:()\-\']', '', text)
         return text.strip()
@@ -0,0 +1,758 @@
+"""
+Seeded synthetic contract generator for load and scale testing.
+
+Contract ``i`` depends only on ``(seed, i)``, so a corpus of any size can be
+generated in parallel, in any order, and regenerated byte-for-byte later.
+Contracts vary in:
+- type (service, employment, lease, license, NDA, supply);
+- parties, amounts, dates, notice periods and governing law;
+- clause selection, section order and sentence phrasing;
+- length, since the number of optional and boilerplate sections is
+  drawn from a long-tailed distribution.
+
+Documents use the loader's dict format, so they can go straight into
+TextPreprocessor.  Each contract also records its key facts together with
+the sentence that states them.  `eval_questions` and `target_chunk_ids`
+turn those facts into evaluation questions with known target chunks.
+"""
+
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+import os
+import random
+
+# --------------------------------------------------------------------------- vocabulary
+
+NAME_PREFIXES = [
+    "Acme", "Birch", "Cobalt", "Delta", "Evergreen", "Falcon", "Granite", "Harbor", "Iron", "Juniper",
+    "Keystone", "Lakeside", "Meridian", "Northwind", "Oakridge", "Pinnacle", "Quantum", "Redwood",
+    "Summit", "Tidewater", "Union", "Vanguard", "Westbrook", "Yellowstone", "Zenith", "Atlas", "Beacon",
+    "Crescent", "Driftwood", "Elm", "Frontier", "Golden", "Highland", "Ivory", "Jasper", "Kingsley",
+    "Liberty", "Maple", "Nova", "Orion"
+]
+NAME_CORES = [
+    "Analytics", "Logistics", "Consulting", "Software", "Manufacturing", "Capital", "Health", "Energy",
+    "Foods", "Media", "Robotics", "Systems", "Partners", "Labs", "Networks", "Realty", "Biotech",
+    "Outfitters", "Pharmaceuticals", "Textiles", "Aerospace", "Design", "Security", "Solutions",
+    "Logic", "Dynamics", "Ventures", "Holdings", "Industries", "Technologies"
+]
+NAME_SUFFIXES = ["Inc.", "LLC", "Corporation", "Ltd.", "Group LLC", "Co."]
+FIRST_NAMES = [
+    "Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Reese",
+    "Maria", "David", "Priya", "Wei", "Fatima", "Carlos", "Elena", "Samuel", "Aisha", "Kenji"
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Garcia", "Chen", "Patel", "Okafor", "Nguyen", "Rossi", "Kowalski", "Haddad",
+    "Lindqvist", "Moreau", "Tanaka", "Silva", "Murphy", "Schmidt", "Ivanova", "Cohen", "Mensah", "Park"
+]
+STATES = [
+    ("Delaware", "Wilmington", "DE"), ("New York", "New York", "NY"), ("California", "San Francisco", "CA"),
+    ("Texas", "Austin", "TX"), ("Illinois", "Chicago", "IL"), ("Massachusetts", "Boston", "MA"),
+    ("Washington", "Seattle", "WA"), ("Georgia", "Atlanta", "GA"), ("Colorado", "Denver", "CO"),
+    ("Florida", "Miami", "FL"), ("Ohio", "Columbus", "OH"), ("Oregon", "Portland", "OR")
+]
+STREETS = ["Market Street", "Main Street", "Commerce Drive", "Park Avenue", "Innovation Way", "Harbor Road",
+           "Technology Parkway", "Broadway", "Elm Street", "Riverside Drive"]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+          "November", "December"]
+NUMBER_WORDS = {
+    5: "five", 7: "seven", 10: "ten", 14: "fourteen", 15: "fifteen", 30: "thirty", 45: "forty-five",
+    60: "sixty", 90: "ninety", 120: "one hundred twenty", 180: "one hundred eighty", 1: "one", 2: "two",
+    3: "three", 4: "four", 6: "six", 12: "twelve", 18: "eighteen", 24: "twenty-four", 36: "thirty-six"
+}
+
+# --------------------------------------------------------------------------- contract types
+
+# a / b are the two parties' roles as the contract refers to them
+CONTRACT_TYPES = {
+    "service": {
+        "title": ["SERVICE AGREEMENT", "PROFESSIONAL SERVICES AGREEMENT", "CONSULTING SERVICES AGREEMENT"],
+        "roles": ("Company", "Service Provider"),
+        "purpose": "obtain {service} services",
+        "required": ["services", "payment", "term", "termination", "confidentiality", "governing_law"],
+        "optional": ["late_fees", "ip", "liability", "warranty", "non_solicit", "insurance", "audit"]
+    },
+    "employment": {
+        "title": ["EMPLOYMENT AGREEMENT", "EXECUTIVE EMPLOYMENT AGREEMENT"],
+        "roles": ("Employer", "Employee"),
+        "purpose": "employ the Employee as {position}",
+        "required": ["position", "salary", "benefits", "termination", "confidentiality", "governing_law"],
+        "optional": ["non_compete", "non_solicit", "ip", "bonus"],
+        "person_b": True
+    },
+    "lease": {
+        "title": ["COMMERCIAL LEASE AGREEMENT", "OFFICE LEASE", "LEASE AGREEMENT"],
+        "roles": ("Landlord", "Tenant"),
+        "purpose": "lease the Premises located at {premises}",
+        "required": ["premises", "rent", "deposit", "term", "maintenance", "governing_law"],
+        "optional": ["late_fees", "termination", "insurance", "liability", "renewal"]
+    },
+    "license": {
+        "title": ["SOFTWARE LICENSE AGREEMENT", "SOFTWARE LICENSE AND SUBSCRIPTION AGREEMENT", "SAAS AGREEMENT"],
+        "roles": ("Licensor", "Licensee"),
+        "purpose": "license the {product} platform",
+        "required": ["license_grant", "subscription_fee", "term", "support", "warranty", "governing_law"],
+        "optional": ["liability", "termination", "confidentiality", "ip", "audit", "renewal", "late_fees"]
+    },
+    "nda": {
+        "title": ["MUTUAL NON-DISCLOSURE AGREEMENT", "CONFIDENTIALITY AGREEMENT", "NON-DISCLOSURE AGREEMENT"],
+        "roles": ("Disclosing Party", "Receiving Party"),
+        "purpose": "evaluate a potential business relationship concerning {service}",
+        "required": ["definition_confidential", "confidentiality", "return_materials", "term", "governing_law"],
+        "optional": ["non_solicit", "remedies", "liability"]
+    },
+    "supply": {
+        "title": ["SUPPLY AGREEMENT", "MASTER PURCHASE AGREEMENT", "DISTRIBUTION AGREEMENT"],
+        "roles": ("Buyer", "Supplier"),
+        "purpose": "purchase {goods} from the Supplier",
+        "required": ["goods", "payment", "delivery", "warranty", "term", "governing_law"],
+        "optional": ["late_fees", "liability", "termination", "insurance", "audit", "confidentiality"]
+    }
+}
+CONTRACT_WEIGHTS = {"service": 5, "employment": 3, "lease": 3, "license": 3, "nda": 2, "supply": 2}
+
+SERVICES = ["business consulting", "data analytics", "marketing", "software development", "IT support",
+            "logistics management", "financial advisory", "cybersecurity assessment", "recruiting"]
+POSITIONS = ["Senior Software Engineer", "Chief Financial Officer", "Marketing Director", "Data Scientist",
+             "Operations Manager", "General Counsel", "Product Manager", "Sales Executive"]
+PRODUCTS = ["CloudLedger", "DataVault", "InsightIQ", "FlowDesk", "SecureSign", "OptiRoute", "PeopleHub"]
+GOODS = ["industrial components", "packaging materials", "medical supplies", "electronic assemblies",
+         "organic produce", "office furniture", "raw textiles"]
+
+# --------------------------------------------------------------------------- clauses
+#
+# Each clause has a heading and a list of sentences; a sentence is a list of
+# alternative phrasings, optional ones are prefixed with "?".  A clause with a
+# "fact" states one answerable term: "evidence" is the index of the sentence
+# that states it, and the question / answer templates describe it.
+
+CLAUSES = {
+    "services": {
+        "heading": ["SERVICES", "SCOPE OF SERVICES", "SERVICES AND DELIVERABLES"],
+        "sentences": [
+            ["The {b_role} shall provide {service} services to the {a_role} as described in Exhibit A (the \"Services\").",
+             "{b_name} agrees to perform {service} services for {a_name} in accordance with the statement of work attached as Exhibit A."],
+            ["?The {b_role} shall deliver written progress reports every {report_days} days.",
+             "?Progress reports shall be delivered to the {a_role} every {report_days} days."],
+            ["?The {b_role} shall perform the Services in a professional manner consistent with industry standards."]
+        ]
+    },
+    "payment": {
+        "heading": ["COMPENSATION AND PAYMENT TERMS", "FEES AND PAYMENT", "PAYMENT"],
+        "sentences": [
+            ["{a_name} shall pay {b_name} a monthly fee of ${fee:,}.00.",
+             "In consideration of the Services, {a_name} shall pay {b_name} ${fee:,}.00 per month."],
+            ["{a_name} shall pay each invoice from {b_name} within {payment_days_text} days of receipt.",
+             "Invoices issued by {b_name} are payable by {a_name} within {payment_days_text} days after receipt."],
+            ["?All fees are exclusive of applicable sales and use taxes."]
+        ],
+        "facts": [
+            {"key": "payment_terms", "evidence": 1, "answer": "{payment_days} days",
+             "question": ["How many days does {a_name} have to pay invoices from {b_name}?",
+                          "What are the invoice payment terms between {a_name} and {b_name}?"]},
+            {"key": "fee", "evidence": 0, "answer": "${fee:,} per month",
+             "question": ["What monthly fee does {a_name} pay {b_name}?"]}
+        ]
+    },
+    "late_fees": {
+        "heading": ["LATE PAYMENTS", "INTEREST ON LATE PAYMENTS"],
+        "sentences": [
+            ["Late payments owed to {b_name} shall accrue interest at {late_rate}% per month.",
+             "Any amount owed to {b_name} that is not paid when due bears interest at {late_rate}% per month."],
+            ["?{b_name} may suspend performance if any invoice remains unpaid for more than {notice_days} days."]
+        ],
+        "facts": [
+            {"key": "late_fee", "evidence": 0, "answer": "{late_rate}% per month",
+             "question": ["What interest applies to late payments owed to {b_name} by {a_name}?"]}
+        ]
+    },
+    "term": {
+        "heading": ["TERM", "TERM OF AGREEMENT", "DURATION"],
+        "sentences": [
+            ["This Agreement between {a_name} and {b_name} begins on the Effective Date and continues for {term_months_text} months.",
+             "The term of the agreement between {a_name} and {b_name} is {term_months_text} months from the Effective Date."],
+            ["?Unless terminated earlier, this Agreement renews for successive one-year periods."]
+        ],
+        "facts": [
+            {"key": "term", "evidence": 0, "answer": "{term_months} months",
+             "question": ["How long is the term of the agreement between {a_name} and {b_name}?",
+                          "What is the duration of the contract between {a_name} and {b_name}?"]}
+        ]
+    },
+    "termination": {
+        "heading": ["TERMINATION", "TERMINATION OF AGREEMENT"],
+        "sentences": [
+            ["Either {a_name} or {b_name} may terminate this Agreement upon {notice_days_text} days prior written notice.",
+             "{a_name} and {b_name} may each end this Agreement by giving {notice_days_text} days written notice to the other."],
+            ["?Either party may terminate immediately if the other party materially breaches this Agreement and fails to cure within {cure_days} days.",
+             "?A material breach not cured within {cure_days} days of notice permits immediate termination."],
+            ["?Sections relating to confidentiality and limitation of liability survive termination."]
+        ],
+        "facts": [
+            {"key": "termination_notice", "evidence": 0, "answer": "{notice_days} days",
+             "question": ["What notice is required to terminate the agreement between {a_name} and {b_name}?",
+                          "How many days notice must {a_name} or {b_name} give to terminate?"]}
+        ]
+    },
+    "confidentiality": {
+        "heading": ["CONFIDENTIALITY", "CONFIDENTIAL INFORMATION", "NON-DISCLOSURE"],
+        "sentences": [
+            ["?Each party may receive confidential business, technical and financial information of the other.",
+             "?During the relationship, each party may be given access to non-public information of the other."],
+            ["{b_name} shall keep the confidential information of {a_name} confidential for {conf_years_text} years after disclosure.",
+             "The confidentiality obligations of {b_name} toward {a_name} last {conf_years_text} years from the date of disclosure."],
+            ["?Confidential Information does not include information that is publicly available through no fault of the receiving party."]
+        ],
+        "facts": [
+            {"key": "confidentiality_period", "evidence": 1, "answer": "{conf_years} years",
+             "question": ["How long must {b_name} keep {a_name}'s information confidential?",
+                          "What is the confidentiality period in the agreement between {a_name} and {b_name}?"]}
+        ]
+    },
+    "governing_law": {
+        "heading": ["GOVERNING LAW", "GOVERNING LAW AND JURISDICTION", "APPLICABLE LAW"],
+        "sentences": [
+            ["This Agreement between {a_name} and {b_name} is governed by the laws of the State of {law_state}.",
+             "The laws of the State of {law_state} govern the agreement between {a_name} and {b_name}."],
+            ["?Any dispute shall be resolved exclusively in the state or federal courts located in {law_city}, {law_state}.",
+             "?Disputes shall be settled by binding arbitration in {law_city}, {law_state}."]
+        ],
+        "facts": [
+            {"key": "governing_law", "evidence": 0, "answer": "{law_state}",
+             "question": ["Which state's law governs the agreement between {a_name} and {b_name}?"]}
+        ]
+    },
+    "ip": {
+        "heading": ["INTELLECTUAL PROPERTY", "OWNERSHIP OF WORK PRODUCT"],
+        "sentences": [
+            ["All work product created by {b_name} under this Agreement is the exclusive property of {a_name}.",
+             "{a_name} owns all intellectual property rights in deliverables prepared by {b_name}."],
+            ["?{b_name} retains ownership of its pre-existing tools and methodologies."]
+        ],
+        "facts": [
+            {"key": "ip_ownership", "evidence": 0, "answer": "{a_name}",
+             "question": ["Who owns the work product created by {b_name} for {a_name}?"]}
+        ]
+    },
+    "liability": {
+        "heading": ["LIMITATION OF LIABILITY", "LIABILITY"],
+        "sentences": [
+            ["?Neither party is liable for indirect, incidental or consequential damages."],
+            ["The total liability of {b_name} to {a_name} shall not exceed ${liability_cap:,}.00.",
+             "Liability of {b_name} to {a_name} under this Agreement is capped at ${liability_cap:,}.00."]
+        ],
+        "facts": [
+            {"key": "liability_cap", "evidence": 1, "answer": "${liability_cap:,}",
+             "question": ["What is the liability cap of {b_name} toward {a_name}?"]}
+        ]
+    },
+    "warranty": {
+        "heading": ["WARRANTIES", "WARRANTY"],
+        "sentences": [
+            ["{b_name} warrants to {a_name} that its deliverables will conform to their specifications for {warranty_days_text} days.",
+             "For {warranty_days_text} days after delivery, {b_name} warrants to {a_name} that all deliverables are free of material defects."],
+            ["?The foregoing warranty is exclusive and replaces all other warranties, express or implied."]
+        ],
+        "facts": [
+            {"key": "warranty_period", "evidence": 0, "answer": "{warranty_days} days",
+             "question": ["How long is the warranty {b_name} gives {a_name}?"]}
+        ]
+    },
+    "non_solicit": {
+        "heading": ["NON-SOLICITATION"],
+        "sentences": [
+            ["For {non_solicit_months_text} months after termination, {b_name} shall not solicit employees of {a_name}.",
+             "{b_name} shall not recruit staff of {a_name} during the term and for {non_solicit_months_text} months afterward."]
+        ],
+        "facts": [
+            {"key": "non_solicit", "evidence": 0, "answer": "{non_solicit_months} months",
+             "question": ["How long is {b_name} barred from soliciting employees of {a_name}?"]}
+        ]
+    },
+    "non_compete": {
+        "heading": ["NON-COMPETITION", "RESTRICTIVE COVENANTS"],
+        "sentences": [
+            ["For {non_compete_months_text} months after employment ends, {b_name} shall not work for a competitor of {a_name}.",
+             "{b_name} agrees not to compete with {a_name} for {non_compete_months_text} months following termination of employment."],
+            ["?This restriction applies within a radius of {radius} miles of any office of {a_name}."]
+        ],
+        "facts": [
+            {"key": "non_compete", "evidence": 0, "answer": "{non_compete_months} months",
+             "question": ["How long is the non-compete period for {b_name} after leaving {a_name}?"]}
+        ]
+    },
+    "insurance": {
+        "heading": ["INSURANCE"],
+        "sentences": [
+            ["{b_name} shall maintain general liability insurance of at least ${insurance:,}.00 per occurrence.",
+             "During the term, {b_name} must carry commercial general liability coverage of no less than ${insurance:,}.00 per occurrence."]
+        ],
+        "facts": [
+            {"key": "insurance", "evidence": 0, "answer": "${insurance:,} per occurrence",
+             "question": ["How much liability insurance must {b_name} carry under its agreement with {a_name}?"]}
+        ]
+    },
+    "audit": {
+        "heading": ["RECORDS AND AUDIT", "AUDIT RIGHTS"],
+        "sentences": [
+            ["{a_name} may audit the relevant records of {b_name} once per year on {audit_days} days notice.",
+             "Upon {audit_days} days notice, {a_name} may inspect the books and records of {b_name} no more than once annually."]
+        ]
+    },
+    "position": {
+        "heading": ["POSITION AND DUTIES", "EMPLOYMENT AND DUTIES"],
+        "sentences": [
+            ["{a_name} employs {b_name} as {position}, reporting to the {manager}.",
+             "{b_name} shall serve {a_name} as {position} and report to the {manager}."],
+            ["?The Employee shall devote full business time and attention to the Employer."]
+        ],
+        "facts": [
+            {"key": "position", "evidence": 0, "answer": "{position}",
+             "question": ["What position does {b_name} hold at {a_name}?"]}
+        ]
+    },
+    "salary": {
+        "heading": ["COMPENSATION", "BASE SALARY"],
+        "sentences": [
+            ["{a_name} shall pay {b_name} an annual base salary of ${salary:,}.00.",
+             "The base salary of {b_name} is ${salary:,}.00 per year, paid by {a_name} in accordance with its payroll practices."],
+            ["?Salary is reviewed annually by the Employer."]
+        ],
+        "facts": [
+            {"key": "salary", "evidence": 0, "answer": "${salary:,} per year",
+             "question": ["What is the annual salary of {b_name} at {a_name}?"]}
+        ]
+    },
+    "bonus": {
+        "heading": ["BONUS"],
+        "sentences": [
+            ["{b_name} is eligible for an annual performance bonus of up to {bonus_pct}% of base salary.",
+             "{a_name} may award {b_name} a yearly bonus of up to {bonus_pct}% of base salary."]
+        ],
+        "facts": [
+            {"key": "bonus", "evidence": 0, "answer": "up to {bonus_pct}% of base salary",
+             "question": ["What bonus is {b_name} eligible for at {a_name}?"]}
+        ]
+    },
+    "benefits": {
+        "heading": ["BENEFITS", "BENEFITS AND VACATION"],
+        "sentences": [
+            ["?The Employee may participate in the Employer's health, dental and retirement plans."],
+            ["{b_name} is entitled to {vacation_days} days of paid vacation per year at {a_name}.",
+             "{a_name} shall provide {b_name} with {vacation_days} days of paid time off each year."]
+        ],
+        "facts": [
+            {"key": "vacation", "evidence": 1, "answer": "{vacation_days} days per year",
+             "question": ["How many vacation days does {b_name} receive from {a_name}?"]}
+        ]
+    },
+    "premises": {
+        "heading": ["PREMISES", "LEASED PREMISES"],
+        "sentences": [
+            ["{a_name} leases to {b_name} approximately {sqft:,} square feet at {premises} (the \"Premises\").",
+             "The Premises leased by {b_name} from {a_name} consist of about {sqft:,} square feet located at {premises}."],
+            ["?The Tenant shall use the Premises only for general office purposes."]
+        ],
+        "facts": [
+            {"key": "premises_size", "evidence": 0, "answer": "{sqft:,} square feet",
+             "question": ["How large are the premises {b_name} leases from {a_name}?"]}
+        ]
+    },
+    "rent": {
+        "heading": ["RENT", "BASE RENT"],
+        "sentences": [
+            ["{b_name} shall pay {a_name} monthly rent of ${rent:,}.00, due on the first day of each month.",
+             "Monthly base rent of ${rent:,}.00 is payable by {b_name} to {a_name} in advance on the first of each month."],
+            ["?Rent increases by {escalation}% on each anniversary of the Commencement Date."]
+        ],
+        "facts": [
+            {"key": "rent", "evidence": 0, "answer": "${rent:,} per month",
+             "question": ["What is the monthly rent {b_name} pays {a_name}?",
+                          "How much rent is due under the lease between {a_name} and {b_name}?"]}
+        ]
+    },
+    "deposit": {
+        "heading": ["SECURITY DEPOSIT"],
+        "sentences": [
+            ["{b_name} shall deposit ${deposit:,}.00 with {a_name} as security for its obligations.",
+             "A security deposit of ${deposit:,}.00 is payable by {b_name} to {a_name} on signing."],
+            ["?The deposit will be returned within {return_days} days after the lease ends, less any amounts owed."]
+        ],
+        "facts": [
+            {"key": "deposit", "evidence": 0, "answer": "${deposit:,}",
+             "question": ["What security deposit does {b_name} pay {a_name}?"]}
+        ]
+    },
+    "maintenance": {
+        "heading": ["MAINTENANCE AND REPAIRS", "REPAIRS"],
+        "sentences": [
+            ["{a_name} is responsible for structural repairs, and {b_name} maintains the interior of the Premises.",
+             "{b_name} shall keep the interior of the Premises in good repair, while {a_name} maintains the roof, structure and building systems."]
+        ],
+        "facts": [
+            {"key": "maintenance", "evidence": 0, "answer": "{a_name} handles structural repairs; {b_name} maintains the interior",
+             "question": ["Who is responsible for repairs under the lease between {a_name} and {b_name}?"]}
+        ]
+    },
+    "renewal": {
+        "heading": ["RENEWAL", "OPTION TO RENEW"],
+        "sentences": [
+            ["{b_name} may renew this Agreement with {a_name} for an additional {renewal_months} months by notice given {notice_days} days before expiry."]
+        ],
+        "facts": [
+            {"key": "renewal", "evidence": 0, "answer": "{renewal_months} months",
+             "question": ["How long is the renewal option in the agreement between {a_name} and {b_name}?"]}
+        ]
+    },
+    "license_grant": {
+        "heading": ["LICENSE GRANT", "GRANT OF LICENSE"],
+        "sentences": [
+            ["{a_name} grants {b_name} a non-exclusive, non-transferable license to use {product} for up to {seats} users.",
+             "Subject to this Agreement, {b_name} may use {product} for no more than {seats} named users under a non-exclusive license from {a_name}."]
+        ],
+        "facts": [
+            {"key": "license_seats", "evidence": 0, "answer": "{seats} users",
+             "question": ["How many users may {b_name} license from {a_name}?"]}
+        ]
+    },
+    "subscription_fee": {
+        "heading": ["SUBSCRIPTION FEES", "FEES"],
+        "sentences": [
+            ["{b_name} shall pay {a_name} an annual subscription fee of ${annual_fee:,}.00, invoiced in advance.",
+             "The annual subscription fee payable by {b_name} to {a_name} is ${annual_fee:,}.00."],
+            ["?Fees are payable within {payment_days} days of invoice."]
+        ],
+        "facts": [
+            {"key": "subscription_fee", "evidence": 0, "answer": "${annual_fee:,} per year",
+             "question": ["What is the annual subscription fee {b_name} pays {a_name}?"]}
+        ]
+    },
+    "support": {
+        "heading": ["SUPPORT AND SERVICE LEVELS", "SUPPORT"],
+        "sentences": [
+            ["{a_name} shall provide {b_name} with technical support and guarantees {uptime}% monthly uptime.",
+             "{a_name} commits to {uptime}% monthly availability of {product} and will provide support to {b_name} during business hours."],
+            ["?Critical issues will receive a response within {response_hours} hours."]
+        ],
+        "facts": [
+            {"key": "uptime", "evidence": 0, "answer": "{uptime}%",
+             "question": ["What uptime does {a_name} guarantee to {b_name}?"]}
+        ]
+    },
+    "definition_confidential": {
+        "heading": ["DEFINITION OF CONFIDENTIAL INFORMATION", "CONFIDENTIAL INFORMATION"],
+        "sentences": [
+            ["\"Confidential Information\" means all non-public information disclosed by {a_name} to {b_name}, including trade secrets, pricing and customer data."]
+        ]
+    },
+    "return_materials": {
+        "heading": ["RETURN OF MATERIALS"],
+        "sentences": [
+            ["Within {return_days} days of a written request, {b_name} shall return or destroy all Confidential Information of {a_name}.",
+             "{b_name} must return or destroy the Confidential Information of {a_name} within {return_days} days after request."]
+        ],
+        "facts": [
+            {"key": "return_materials", "evidence": 0, "answer": "{return_days} days",
+             "question": ["How quickly must {b_name} return {a_name}'s confidential materials?"]}
+        ]
+    },
+    "remedies": {
+        "heading": ["REMEDIES"],
+        "sentences": [
+            ["?Each party acknowledges that a breach may cause irreparable harm for which damages are inadequate."],
+            ["{a_name} is entitled to seek injunctive relief against {b_name} without posting a bond."]
+        ]
+    },
+    "goods": {
+        "heading": ["PURCHASE OF GOODS", "PRODUCTS"],
+        "sentences": [
+            ["{b_name} shall supply {a_name} with {goods} at the unit prices listed in Schedule 1.",
+             "{a_name} agrees to buy, and {b_name} agrees to sell, {goods} on the terms of this Agreement."],
+            ["?{a_name} shall purchase a minimum of {min_units:,} units per quarter."]
+        ]
+    },
+    "delivery": {
+        "heading": ["DELIVERY", "SHIPPING AND DELIVERY"],
+        "sentences": [
+            ["{b_name} shall deliver each order to {a_name} within {delivery_days} days of the purchase order.",
+             "Orders placed by {a_name} must be delivered by {b_name} no later than {delivery_days} days after the purchase order date."],
+            ["?Title and risk of loss pass on delivery to the Buyer's facility."]
+        ],
+        "facts": [
+            {"key": "delivery", "evidence": 0, "answer": "{delivery_days} days",
+             "question": ["How quickly must {b_name} deliver orders to {a_name}?"]}
+        ]
+    }
+}
+
+BOILERPLATE = [
+    ("NOTICES", "All notices under this Agreement must be in writing and delivered to the addresses stated above."),
+    ("ENTIRE AGREEMENT", "This Agreement constitutes the entire agreement between the parties and supersedes all prior understandings."),
+    ("SEVERABILITY", "If any provision of this Agreement is held invalid, the remaining provisions remain in full force and effect."),
+    ("ASSIGNMENT", "Neither party may assign this Agreement without the prior written consent of the other party."),
+    ("FORCE MAJEURE", "Neither party is liable for delays caused by events beyond its reasonable control, including natural disasters and government action."),
+    ("AMENDMENTS", "This Agreement may be amended only by a written instrument signed by both parties."),
+    ("WAIVER", "No failure to exercise any right under this Agreement operates as a waiver of that right."),
+    ("COUNTERPARTS", "This Agreement may be executed in counterparts, each of which is deemed an original."),
+    ("INDEPENDENT PARTIES", "The parties are independent contractors, and nothing in this Agreement creates a partnership or joint venture."),
+    ("DATA PROTECTION", "Each party shall comply with applicable data protection laws when processing personal data under this Agreement."),
+    ("COMPLIANCE WITH LAWS", "Each party shall comply with all laws and regulations applicable to its performance of this Agreement."),
+    ("HEADINGS", "Section headings are for convenience only and do not affect interpretation of this Agreement."),
+    ("THIRD-PARTY BENEFICIARIES", "This Agreement is for the sole benefit of the parties and creates no rights in any third party."),
+    ("SURVIVAL", "Provisions which by their nature should survive termination shall survive termination of this Agreement.")
+]
+
+
+def _days_text(days: int) -> str:
+    words = NUMBER_WORDS.get(days)
+    return f"{words} ({days})" if words else str(days)
+
+
+class SyntheticContractGenerator:
+    """Deterministic contract factory: `generate(i)` always returns the same contract for a given seed"""
+
+    def __init__(self, seed: int = 42):
+        self.seed = seed
+        self._types = list(CONTRACT_WEIGHTS)
+        self._weights = [CONTRACT_WEIGHTS[t] for t in self._types]
+
+    def _rng(self, index: int) -> random.Random:
+        return random.Random(self.seed * 1_000_003 + index)
+
+    def _company(self, rng: random.Random) -> str:
+        return f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_CORES)} {rng.choice(NAME_SUFFIXES)}"
+
+    def _terms(self, rng: random.Random, spec: Dict) -> Dict:
+        a_name = self._company(rng)
+        b_name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" if spec.get("person_b") else self._company(rng)
+        while b_name == a_name:
+            b_name = self._company(rng)
+        law_state, law_city, _ = rng.choice(STATES)
+        state, city, abbr = rng.choice(STATES)
+        terms = {
+            "a_name": a_name,
+            "b_name": b_name,
+            "a_role": spec["roles"][0],
+            "b_role": spec["roles"][1],
+            "date": f"{rng.choice(MONTHS)} {rng.randint(1, 28)}, {rng.randint(2015, 2026)}",
+            "address": f"{rng.randint(10, 9999)} {rng.choice(STREETS)}, {city}, {abbr} {rng.randint(10000, 99999)}",
+            "law_state": law_state,
+            "law_city": law_city,
+            "service": rng.choice(SERVICES),
+            "position": rng.choice(POSITIONS),
+            "manager": rng.choice(["Chief Executive Officer", "Chief Operating Officer", "Board of Directors", "Vice President"]),
+            "product": rng.choice(PRODUCTS),
+            "goods": rng.choice(GOODS),
+            "premises": f"{rng.randint(10, 9999)} {rng.choice(STREETS)}, Suite {rng.randint(100, 999)}, {city}, {abbr}",
+            "fee": rng.randrange(2_000, 60_000, 500),
+            "payment_days": rng.choice([10, 15, 30, 45, 60, 90]),
+            "notice_days": rng.choice([10, 14, 30, 45, 60, 90, 120, 180]),
+            "cure_days": rng.choice([10, 15, 30]),
+            "report_days": rng.choice([7, 14, 30]),
+            "late_rate": rng.choice([0.5, 1, 1.5, 2]),
+            "term_months": rng.choice([6, 12, 18, 24, 36]),
+            "conf_years": rng.choice([1, 2, 3, 4, 5, 6]),
+            "liability_cap": rng.randrange(50_000, 5_000_000, 25_000),
+            "warranty_days": rng.choice([30, 60, 90, 180]),
+            "non_solicit_months": rng.choice([6, 12, 18, 24]),
+            "non_compete_months": rng.choice([6, 12, 18, 24]),
+            "radius": rng.choice([25, 50, 100]),
+            "insurance": rng.choice([500_000, 1_000_000, 2_000_000, 5_000_000]),
+            "audit_days": rng.choice([10, 15, 30]),
+            "salary": rng.randrange(60_000, 400_000, 5_000),
+            "bonus_pct": rng.choice([10, 15, 20, 25, 30, 50]),
+            "vacation_days": rng.choice([10, 15, 20, 25, 30]),
+            "sqft": rng.randrange(800, 60_000, 100),
+            "rent": rng.randrange(1_500, 90_000, 250),
+            "escalation": rng.choice([2, 3, 4, 5]),
+            "return_days": rng.choice([5, 10, 14, 30]),
+            "renewal_months": rng.choice([12, 24, 36, 60]),
+            "seats": rng.choice([10, 25, 50, 100, 250, 500, 1000]),
+            "annual_fee": rng.randrange(5_000, 500_000, 1_000),
+            "uptime": rng.choice([99.0, 99.5, 99.9, 99.95]),
+            "response_hours": rng.choice([1, 2, 4, 8]),
+            "delivery_days": rng.choice([5, 7, 10, 14, 30, 45]),
+            "min_units": rng.randrange(100, 100_000, 100)
+        }
+        terms["deposit"] = terms["rent"] * rng.choice([1, 2, 3])
+        for key in ("payment_days", "notice_days", "term_months", "conf_years", "warranty_days",
+                    "non_solicit_months", "non_compete_months"):
+            terms[f"{key}_text"] = _days_text(terms[key])
+        return terms
+
+    @staticmethod
+    def _sentence(rng: random.Random, variants: List[str], terms: Dict) -> Optional[str]:
+        variant = rng.choice(variants)
+        if variant.startswith("?"):
+            if rng.random() < 0.4:
+                return None
+            variant = variant[1:]
+        # Names like "Acme Co." would otherwise end a sentence with ".."
+        return variant.format(**terms).replace("..", ".")
+
+    def _clause(self, rng: random.Random, key: str, terms: Dict, facts: Dict) -> Dict:
+        clause = CLAUSES[key]
+        sentences = []
+        evidence_at = {}
+        for i, variants in enumerate(clause["sentences"]):
+            sentence = self._sentence(rng, variants, terms)
+            if sentence is not None:
+                evidence_at[i] = sentence
+                sentences.append(sentence)
+        for fact in clause.get("facts", []):
+            if fact["evidence"] in evidence_at:
+                facts[fact["key"]] = {
+                    "clause": key,
+                    "evidence": evidence_at[fact["evidence"]],
+                    "answer": fact["answer"].format(**terms),
+                    "questions": [q.format(**terms) for q in fact["question"]]
+                }
+        return {"heading": rng.choice(clause["heading"]), "sentences": sentences}
+
+    def generate(self, index: int) -> Dict:
+        """Contract `index` as a loader-style document plus its type, parties and facts"""
+        rng = self._rng(index)
+        contract_type = rng.choices(self._types, weights=self._weights)[0]
+        spec = CONTRACT_TYPES[contract_type]
+        terms = self._terms(rng, spec)
+        facts: Dict[str, Dict] = {}
+
+        # Required clauses always appear; a long-tailed number of optional and boilerplate ones follow
+        keys = list(spec["required"])
+        optional = list(spec["optional"])
+        rng.shuffle(optional)
+        keys += optional[:rng.randint(0, len(optional))]
+        first, rest = keys[:1], keys[1:]
+        rng.shuffle(rest)
+        sections = [self._clause(rng, key, terms, facts) for key in first + rest]
+
+        n_boilerplate = min(len(BOILERPLATE), int(rng.lognormvariate(1.2, 0.7)))
+        for heading, text in rng.sample(BOILERPLATE, n_boilerplate):
+            sections.append({"heading": heading, "sentences": [text]})
+
+        title = rng.choice(spec["title"])
+        purpose = spec["purpose"].format(**terms)
+        lines = [
+            title,
+            "",
+            f"This {title.title()} (the \"Agreement\") is entered into as of {terms['date']} (the \"Effective Date\") "
+            f"by and between {terms['a_name']} (the \"{terms['a_role']}\"), with offices at {terms['address']}, "
+            f"and {terms['b_name']} (the \"{terms['b_role']}\").",
+            "",
+            f"WHEREAS, the {terms['a_role']} wishes to {purpose}; and",
+            f"WHEREAS, the parties wish to set out the terms on which they will do so;",
+            "",
+            "NOW, THEREFORE, the parties agree as follows:",
+            ""
+        ]
+        for number, section in enumerate(sections, 1):
+            lines.append(f"{number}. {section['heading']}")
+            for sub, sentence in enumerate(section["sentences"], 1):
+                lines.append(f"{number}.{sub} {sentence}")
+            lines.append("")
+        lines += [
+            "IN WITNESS WHEREOF, the parties have executed this Agreement as of the Effective Date.",
+            "",
+            f"{terms['a_name'].upper()}",
+            f"By: {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}, {rng.choice(['CEO', 'President', 'General Counsel', 'COO'])}",
+            "",
+            f"{terms['b_name'].upper()}",
+            f"By: {terms['b_name'] if spec.get('person_b') else rng.choice(FIRST_NAMES) + ' ' + rng.choice(LAST_NAMES)}"
+        ]
+
+        filename = f"synthetic_{self.seed}_{index:08d}.txt"
+        return {
+            "filename": filename,
+            "content": "\n".join(lines),
+            "source_path": filename,
+            "source_file": filename,
+            "file_type": "txt",
+            "contract_type": contract_type,
+            "parties": [terms["a_name"], terms["b_name"]],
+            "facts": facts
+        }
+
+    def eval_questions(self, document: Dict, count: int = 1) -> List[Dict]:
+        """Up to `count` questions about distinct facts of one generated contract"""
+        rng = random.Random(f"{self.seed}:questions:{document['filename']}")
+        keys = sorted(document["facts"])
+        rng.shuffle(keys)
+        questions = []
+        for key in keys[:count]:
+            fact = document["facts"][key]
+            questions.append({
+                "question": rng.choice(fact["questions"]),
+                "answer": fact["answer"],
+                "context": fact["clause"],
+                "document_id": document["filename"],
+                "fact": key,
+                "evidence": fact["evidence"]
+            })
+        return questions
+
+
+def target_chunk_ids(evidence: str, chunks: List[Dict], clean_text: Callable[[str], str]) -> List[int]:
+    """
+    Chunk ids of one document whose text contains the evidence sentence.
+
+    Chunking cleans the text first, so the evidence is cleaned the same way.
+    If a chunk boundary splits the sentence, the chunks holding either half
+    count as targets.
+    """
+    cleaned = clean_text(evidence)
+    ids = [c["chunk_id"] for c in chunks if cleaned in c["text"]]
+    if ids:
+        return ids
+    middle = len(cleaned) // 2
+    halves = [cleaned[:middle].strip(), cleaned[middle:].strip()]
+    return [c["chunk_id"] for c in chunks if any(h and h in c["text"] for h in halves)]
+
+
+# --------------------------------------------------------------------------- parallel generation
+
+_worker_generator: Optional[SyntheticContractGenerator] = None
+_worker_output_dir: Optional[Path] = None
+
+
+def _init_worker(seed: int, output_dir: Optional[str]):
+    global _worker_generator, _worker_output_dir
+    _worker_generator = SyntheticContractGenerator(seed)
+    _worker_output_dir = Path(output_dir) if output_dir else None
+
+
+def _generate_one(index: int) -> Dict:
+    document = _worker_generator.generate(index)
+    if _worker_output_dir is not None:
+        path = _worker_output_dir / document["filename"]
+        path.write_text(document["content"], encoding="utf-8")
+        document["source_path"] = str(path)
+    return document
+
+
+def iter_contracts(
+    count: int,
+    seed: int = 42,
+    start: int = 0,
+    workers: int = None,
+    output_dir: Path = None,
+    chunksize: int = 64
+) -> Iterator[Dict]:
+    """
+    Yield contracts `start` .. `start + count - 1` in order, generated by a
+    process pool.  With `output_dir`, workers also write each contract there
+    as a .txt file.
+    """
+    workers = workers or os.cpu_count() or 1
+    if output_dir is not None:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    indices = range(start, start + count)
+
+    if workers == 1 or count <= chunksize:
+        _init_worker(seed, str(output_dir) if output_dir else None)
+        for index in indices:
+            yield _generate_one(index)
+        return
+
+    with Pool(workers, initializer=_init_worker, initargs=(seed, str(output_dir) if output_dir else None)) as pool:
+        yield from pool.imap(_generate_one, indices, chunksize=chunksize)
@@ -0,0 +1,208 @@
+"""
+Retrieval evaluation: recall@k, MRR, nDCG@k and hit rate over an eval set.
+
+Each eval question (one line of eval_qa.jsonl) is judged at the finest
+granularity it supports:
+- ``evidence`` (the synthetic set): relevant chunks are those of
+  ``document_id`` that contain the evidence sentence, recomputed for
+  each index, so different chunkers are judged fairly;
+- ``relevant_chunks``: those chunk ids of ``document_id``;
+- otherwise: any chunk of ``document_id``.  Only its first hit counts, so
+  recall and nDCG are per document, not per chunk.
+
+All questions are encoded in batches and searched with one FAISS call per
+batch.  Metrics are computed on a (questions x k) relevance matrix with numpy.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+import json
+import time
+import logging
+
+import numpy as np
+
+from src.config import config
+from src.data.preprocessor import TextPreprocessor
+from src.data.synthetic import target_chunk_ids
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KS = (1, 3, 5, 10)
+
+
+def load_eval_set(path: Path = None) -> List[Dict]:
+    path = Path(path or config.PROCESSED_DATA_DIR / "eval_qa.jsonl")
+    with open(path, encoding="utf-8") as f:
+        questions = [json.loads(line) for line in f if line.strip()]
+    logger.info(f"Loaded {len(questions)} eval questions from {path}")
+    return questions
+
+
+# --------------------------------------------------------------------------- metrics
+
+def retrieval_metrics(relevance: np.ndarray, num_relevant: np.ndarray, ks: Sequence[int] = DEFAULT_KS) -> Dict:
+    """
+    Metrics from a boolean (questions x k) matrix, True where the result at
+    that rank is a (not yet seen) relevant item, and the number of relevant
+    items per question (>= 1).
+    """
+    relevance = relevance.astype(bool)
+    num_relevant = np.maximum(num_relevant, 1)
+    depth = relevance.shape[1]
+    discounts = 1.0 / np.log2(np.arange(2, depth + 2))
+    ideal_cumulative = np.cumsum(discounts)
+
+    found = relevance.any(axis=1)
+    first_rank = np.argmax(relevance, axis=1) + 1
+    metrics = {"mrr": float(np.where(found, 1.0 / first_rank, 0.0).mean()) if len(relevance) else 0.0}
+
+    for k in ks:
+        k_eff = min(k, depth)
+        top = relevance[:, :k_eff]
+        hits = top.sum(axis=1)
+        dcg = (top * discounts[:k_eff]).sum(axis=1)
+        idcg = ideal_cumulative[np.minimum(num_relevant, k_eff) - 1]
+        metrics[f"hit_rate@{k}"] = float(top.any(axis=1).mean())
+        metrics[f"recall@{k}"] = float((hits / num_relevant).mean())
+        metrics[f"ndcg@{k}"] = float((dcg / idcg).mean())
+    return metrics
+
+
+def _first_hits(matches: np.ndarray) -> np.ndarray:
+    """Keep only the first True per row (one document judged once)"""
+    return matches & (np.cumsum(matches, axis=1) == 1)
+
+
+class RelevanceJudge:
+    """Maps eval questions onto the rows of one vector store"""
+
+    def __init__(self, questions: List[Dict], documents: List[Dict]):
+        self.size = len(documents)
+        files = [d.get("source_file") for d in documents]
+        self._file_codes: Dict[str, int] = {}
+        self.row_file = np.array([self._file_codes.setdefault(f, len(self._file_codes)) for f in files])
+
+        by_file: Dict[str, List[Tuple[int, Dict]]] = {}
+        for row, doc in enumerate(documents):
+            by_file.setdefault(doc.get("source_file"), []).append((row, doc))
+
+        self.chunk_keys: List[int] = []          # question * size + row, for chunk-level questions
+        self.num_relevant = np.zeros(len(questions), dtype=np.int64)
+        self.target_file = np.full(len(questions), -1)
+        self.chunk_level = np.zeros(len(questions), dtype=bool)
+
+        for q, question in enumerate(questions):
+            rows = by_file.get(question.get("document_id"), [])
+            if not rows:
+                continue
+            target_rows = None
+            if question.get("evidence"):
+                chunks = [doc for _, doc in rows]
+                chunk_ids = set(target_chunk_ids(question["evidence"], chunks, TextPreprocessor.clean_text))
+                target_rows = [row for row, doc in rows if doc.get("chunk_id") in chunk_ids]
+            elif question.get("relevant_chunks"):
+                wanted = set(question["relevant_chunks"])
+                target_rows = [row for row, doc in rows if doc.get("chunk_id") in wanted]
+
+            if target_rows:
+                self.chunk_level[q] = True
+                self.num_relevant[q] = len(target_rows)
+                self.chunk_keys.extend(q * self.size + row for row in target_rows)
+            else:
+                self.target_file[q] = self._file_codes[question["document_id"]]
+                self.num_relevant[q] = 1
+        self.chunk_keys = np.array(sorted(self.chunk_keys), dtype=np.int64)
+
+    @property
+    def judged(self) -> np.ndarray:
+        return self.num_relevant > 0
+
+    def relevance(self, ids: np.ndarray) -> np.ndarray:
+        """Boolean relevance matrix for FAISS row ids (questions x k); -1 pads missing hits"""
+        valid = ids >= 0
+        safe = np.where(valid, ids, 0)
+        questions = np.arange(len(ids))[:, None]
+
+        chunk_hits = np.isin(questions * self.size + safe, self.chunk_keys) & valid
+        file_hits = _first_hits((self.row_file[safe] == self.target_file[:, None]) & valid)
+        return np.where(self.chunk_level[:, None], chunk_hits, file_hits)
+
+
+# --------------------------------------------------------------------------- evaluator
+
+@dataclass
+class EvalResult:
+    name: str
+    metrics: Dict
+    latency: Dict
+    questions: int
+    judged: int
+    index: Dict = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "questions": self.questions, "judged": self.judged,
+                "metrics": self.metrics, "latency": self.latency, "index": self.index}
+
+
+class RetrievalEvaluator:
+    """Runs an eval set through an embedder + vector store and scores the rankings"""
+
+    def __init__(self, questions: List[Dict], ks: Sequence[int] = DEFAULT_KS, batch_size: int = 64):
+        self.questions = questions
+        self.ks = tuple(sorted(ks))
+        self.batch_size = batch_size
+
+    def evaluate(self, embedder, vector_store, name: str = "serving", index_info: Dict = None) -> EvalResult:
+        depth = max(self.ks)
+        texts = [q["question"] for q in self.questions]
+
+        start = time.perf_counter()
+        embeddings = embedder.encode(texts, batch_size=self.batch_size)
+        encode_time = time.perf_counter() - start
+
+        ids = np.full((len(texts), depth), -1, dtype=np.int64)
+        batch_times = []
+        for b in range(0, len(texts), self.batch_size):
+            t = time.perf_counter()
+            _, batch_ids = vector_store.search_ids(embeddings[b:b + self.batch_size], depth)
+            batch_times.append(time.perf_counter() - t)
+            ids[b:b + self.batch_size, :batch_ids.shape[1]] = batch_ids
+
+        # Per-query latency, as the API sees it
+        single = []
+        for row in embeddings[:min(len(embeddings), 200)]:
+            t = time.perf_counter()
+            vector_store.search_ids(row, depth)
+            single.append(time.perf_counter() - t)
+        single_ms = np.asarray(single) * 1000 if single else np.zeros(1)
+
+        judge = RelevanceJudge(self.questions, vector_store.documents)
+        judged = judge.judged
+        relevance = judge.relevance(ids)
+        metrics = retrieval_metrics(relevance[judged], judge.num_relevant[judged], self.ks)
+
+        n = max(len(texts), 1)
+        latency = {
+            "encode_ms_per_query": encode_time / n * 1000,
+            "search_ms_per_query_batched": sum(batch_times) / n * 1000,
+            "search_p50_ms": float(np.percentile(single_ms, 50)),
+            "search_p95_ms": float(np.percentile(single_ms, 95))
+        }
+        index = {"chunks": len(vector_store.documents), "index_type": vector_store.index_type,
+                 "index_bytes": vector_store.index_bytes(), **(index_info or {})}
+        if (~judged).any():
+            logger.warning(f"⚠️  {name}: {int((~judged).sum())} questions have no target in the index; skipped")
+        return EvalResult(name, metrics, latency, len(texts), int(judged.sum()), index)
+
+
+def parse_index_spec(spec: str) -> Tuple[str, Dict]:
+    """'hnsw:m=32;ef_search=128' -> ('hnsw', {'hnsw_m': 32, 'ef_search': 128})"""
+    index_type, _, params = spec.partition(":")
+    parsed = {}
+    for item in filter(None, params.replace(";", ",").split(",")):
+        key, _, value = item.partition("=")
+        key = "hnsw_m" if key == "m" else key
+        parsed[key] = int(value)
+    return index_type, parsed
@@ -1,10 +1,9 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
 from typing import List, Union
-import torch
 from pathlib import Path
 import logging
 
+from src.utils import tracing
 from src.config import config
 
 logger = logging.getLogger(__name__)
@@ -13,6 +12,10 @@ class SBERTEmbedder:
     """Generate embeddings using Sentence-BERT"""
     
     def __init__(self, model_path: Union[str, Path] = None):
+        # torch / sentence_transformers take seconds to import; only pay for it when a model is loaded
+        import torch
+        from sentence_transformers import SentenceTransformer
+        
         self.model_path = model_path or config.FINE_TUNED_MODEL_PATH
         
         # Load model
@@ -42,13 +45,14 @@ class SBERTEmbedder:
         if isinstance(texts, str):
             texts = [texts]
     
-        embeddings = self.model.encode(
-            texts,
-            batch_size=batch_size,
-            show_progress_bar=show_progress,
-            convert_to_numpy=True,
-            normalize_embeddings=True
-        )
+        with tracing.span("embedder.encode", texts=len(texts), batch_size=batch_size, device=self.device):
+            embeddings = self.model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=show_progress,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
     
     # FIX: Ensure 2D array
         if embeddings.ndim == 1:
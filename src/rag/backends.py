@@ -0,0 +1,354 @@
+"""
+HTTP backends for text generation.
+
+HFInferenceBackend speaks the Hugging Face text-generation wire format
+(the serverless Inference API and TGI endpoints both accept it):
+
+    POST {base_url}/{model}
+    {"inputs": "...", "parameters": {...}, "stream": false}
+    -> [{"generated_text": "..."}]
+
+With ``"stream": true`` the response is server-sent events, one
+``data: {"token": {"text": ...}}`` line per token.  Any server speaking
+this format works, including scripts/llm_stub_server.py.
+
+HFInferenceBackend is blocking (requests); setting the `cancel` event
+passed to its generate() shuts down the socket of the in-flight request.
+AsyncHFInferenceBackend is the asyncio variant (httpx), where cancelling
+the awaiting task aborts the upstream request.
+"""
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import json
+import logging
+import math
+import socket
+import threading
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from src.rag.resilience import (
+    LLMError, RateLimitedError, ModelLoadingError,
+    BackendTimeoutError, BackendUnavailableError, CallCancelledError, CancelEvent
+)
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def build_payload(prompt: str, max_new_tokens: int, temperature: float, stream: bool) -> Dict:
+    return {
+        "inputs": prompt,
+        "parameters": {
+            "max_new_tokens": max_new_tokens,
+            "temperature": temperature,
+            "do_sample": True,
+            "return_full_text": False
+        },
+        "options": {"wait_for_model": False},
+        "stream": stream
+    }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date); None if unparseable"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+        return max(0.0, seconds) if math.isfinite(seconds) else None
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def raise_for_status(model: str, status_code: int, body: str, retry_after: Optional[str]):
+    """Map an HTTP error response to the matching LLMError"""
+    if status_code == 429:
+        raise RateLimitedError(f"Rate limit reached ({model})", retry_after=parse_retry_after(retry_after))
+    if status_code == 503 and "loading" in body.lower():
+        try:
+            estimated = float(json.loads(body).get("estimated_time"))
+        except (ValueError, TypeError, AttributeError):
+            estimated = None
+        raise ModelLoadingError(f"Model loading ({model})", retry_after=estimated)
+    if status_code >= 500:
+        raise BackendUnavailableError(f"HTTP {status_code} from {model}: {body}")
+    raise LLMError(f"HTTP {status_code} from {model}: {body}")
+
+
+def parse_generated_text(model: str, response) -> str:
+    """generated_text from a non-streaming requests / httpx response"""
+    try:
+        data = response.json()
+        if isinstance(data, list):
+            data = data[0] if data else {}
+        text = data.get("generated_text", "")
+    except (ValueError, AttributeError) as e:
+        raise LLMError(f"Malformed response from {model}: {e}")
+    if not isinstance(text, str):
+        raise LLMError(f"Malformed response from {model}: generated_text is {type(text).__name__}")
+    return text
+
+
+def parse_stream_line(model: str, line: str) -> Optional[str]:
+    """Return the token text carried by one SSE line, if any"""
+    if not line or not line.startswith("data:"):
+        return None
+    try:
+        event = json.loads(line[len("data:"):].strip())
+        if "error" in event:
+            raise BackendUnavailableError(f"Stream error from {model}: {event['error']}")
+        token = event.get("token") or {}
+        if token.get("special"):
+            return None
+        text = token.get("text")
+    except (ValueError, TypeError, AttributeError) as e:
+        raise LLMError(f"Malformed stream event from {model}: {e}")
+    if text is not None and not isinstance(text, str):
+        raise LLMError(f"Malformed stream event from {model}: token text is {type(text).__name__}")
+    return text or None
+
+
+# Abort scope of the cancellable request running on this thread, if any
+_abort_scopes = threading.local()
+
+
+class _AbortScope:
+    """
+    The pooled connection serving one cancellable request.  Another thread
+    can shut its socket down mid-request; the connection is detached before
+    it goes back to the pool, so a late abort never hits someone else's request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection: Optional[HTTPConnection] = None
+        self.aborted = False
+        self.finished = False
+
+    def attach(self, connection: HTTPConnection):
+        with self._lock:
+            if self.aborted:
+                raise ConnectionAbortedError("Request cancelled before it was sent")
+            if self.finished:
+                return
+            self._connection = connection
+            connection.abort_scope = self
+
+    def detach(self, connection: HTTPConnection):
+        with self._lock:
+            if self._connection is connection:
+                self._connection = None
+            connection.abort_scope = None
+
+    def finish(self):
+        with self._lock:
+            self.finished = True
+            self._connection = None
+
+    def abort(self):
+        with self._lock:
+            if self.finished:
+                return
+            self.aborted = True
+            sock = getattr(self._connection, "sock", None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+class _AbortableConnectionMixin:
+    abort_scope: Optional[_AbortScope] = None
+
+    def request(self, *args, **kwargs):
+        scope = getattr(_abort_scopes, "current", None)
+        if scope is not None:
+            scope.attach(self)
+        return super().request(*args, **kwargs)
+
+
+class _AbortableHTTPConnection(_AbortableConnectionMixin, HTTPConnection):
+    pass
+
+
+class _AbortableHTTPSConnection(_AbortableConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _AbortablePoolMixin:
+    def _put_conn(self, conn):
+        if conn is not None and conn.abort_scope is not None:
+            conn.abort_scope.detach(conn)
+        super()._put_conn(conn)
+
+
+class _AbortableHTTPConnectionPool(_AbortablePoolMixin, HTTPConnectionPool):
+    ConnectionCls = _AbortableHTTPConnection
+
+
+class _AbortableHTTPSConnectionPool(_AbortablePoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _AbortableHTTPSConnection
+
+
+class _AbortableAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections can be cut by an _AbortScope"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _AbortableHTTPConnectionPool,
+            "https": _AbortableHTTPSConnectionPool
+        }
+
+
+class HFInferenceBackend:
+    """Text generation over a pooled, keep-alive HTTP session"""
+
+    def __init__(
+        self,
+        model: str,
+        token: str = None,
+        base_url: str = None,
+        pool_size: int = None,
+        timeout: float = None
+    ):
+        self.model = model
+        self.base_url = (base_url or config.HF_INFERENCE_URL).rstrip("/")
+        self.url = f"{self.base_url}/{model}"
+        self.timeout = timeout or config.LLM_TIMEOUT
+        self.name = model
+
+        pool_size = pool_size or config.LLM_POOL_SIZE
+        self.session = requests.Session()
+        # Retries are handled by ResilientBackend, not urllib3
+        adapter = _AbortableAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def _post(self, payload: Dict, stream: bool) -> requests.Response:
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout, stream=stream)
+        except requests.exceptions.Timeout as e:
+            raise BackendTimeoutError(f"Timed out after {self.timeout}s: {e}")
+        except requests.exceptions.ConnectionError as e:
+            raise BackendTimeoutError(f"Connection failed: {e}")
+
+        if response.status_code < 400:
+            return response
+
+        body = response.text[:500]
+        response.close()
+        raise_for_status(self.model, response.status_code, body, response.headers.get("Retry-After"))
+
+    def generate(self, prompt: str, max_new_tokens: int = 500, temperature: float = 0.3,
+                 cancel: CancelEvent = None) -> str:
+        """Setting `cancel` (e.g. a hedge won) aborts the request and raises CallCancelledError"""
+        payload = build_payload(prompt, max_new_tokens, temperature, stream=False)
+        if cancel is None:
+            return parse_generated_text(self.model, self._post(payload, stream=False))
+
+        scope = _AbortScope()
+        unregister = cancel.on_set(scope.abort)
+        _abort_scopes.current = scope
+        try:
+            return parse_generated_text(self.model, self._post(payload, stream=False))
+        except LLMError:
+            if scope.aborted:
+                raise CallCancelledError(f"Request to {self.model} cancelled")
+            raise
+        finally:
+            _abort_scopes.current = None
+            unregister()
+            scope.finish()
+
+    def stream(self, prompt: str, max_new_tokens: int = 500, temperature: float = 0.3) -> Iterator[str]:
+        response = self._post(build_payload(prompt, max_new_tokens, temperature, stream=True), stream=True)
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                token = parse_stream_line(self.model, line)
+                if token:
+                    yield token
+        except requests.exceptions.RequestException as e:
+            raise BackendTimeoutError(f"Stream interrupted: {e}")
+        finally:
+            response.close()
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncHFInferenceBackend:
+    """asyncio text generation over a pooled httpx.AsyncClient"""
+
+    def __init__(
+        self,
+        model: str,
+        token: str = None,
+        base_url: str = None,
+        pool_size: int = None,
+        timeout: float = None
+    ):
+        self.model = model
+        self.base_url = (base_url or config.HF_INFERENCE_URL).rstrip("/")
+        self.url = f"{self.base_url}/{model}"
+        self.timeout = timeout or config.LLM_TIMEOUT
+        self.name = model
+
+        pool_size = pool_size or config.LLM_POOL_SIZE
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    async def _check(self, response: httpx.Response):
+        if response.status_code < 400:
+            return
+        body = (await response.aread()).decode(errors="replace")[:500]
+        raise_for_status(self.model, response.status_code, body, response.headers.get("Retry-After"))
+
+    async def agenerate(self, prompt: str, max_new_tokens: int = 500, temperature: float = 0.3) -> str:
+        payload = build_payload(prompt, max_new_tokens, temperature, stream=False)
+        try:
+            response = await self.client.post(self.url, json=payload)
+        except httpx.TimeoutException as e:
+            raise BackendTimeoutError(f"Timed out after {self.timeout}s: {e}")
+        except httpx.TransportError as e:
+            raise BackendTimeoutError(f"Connection failed: {e}")
+        await self._check(response)
+        return parse_generated_text(self.model, response)
+
+    async def astream(self, prompt: str, max_new_tokens: int = 500, temperature: float = 0.3) -> AsyncIterator[str]:
+        payload = build_payload(prompt, max_new_tokens, temperature, stream=True)
+        try:
+            async with self.client.stream("POST", self.url, json=payload) as response:
+                await self._check(response)
+                async for line in response.aiter_lines():
+                    token = parse_stream_line(self.model, line)
+                    if token:
+                        yield token
+        except httpx.TimeoutException as e:
+            raise BackendTimeoutError(f"Timed out after {self.timeout}s: {e}")
+        except httpx.TransportError as e:
+            raise BackendTimeoutError(f"Stream interrupted: {e}")
+
+    async def aclose(self):
+        await self.client.aclose()
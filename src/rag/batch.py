@@ -0,0 +1,219 @@
+"""
+Offline batch question answering.
+
+Reads questions from JSONL (one ``{"id": ..., "question": ...}`` object per
+line), answers them through a RAGPipeline and appends one JSON record per
+question to the output file:
+
+    {"id": ..., "question": ..., "answer": ..., "sources": [...],
+     "llm_fallback": false, "cache_hit": false,
+     "timings": {"embedding_time": ..., "search_time": ..., "context_time": ...,
+                 "generation_time": ...},
+     "error": null}
+
+Each batch is embedded with one encode call and searched with one FAISS
+call; generation runs on a bounded thread pool.  The output file doubles
+as the checkpoint: records are flushed after every batch, and a restarted
+job skips ids that already have a successful record.  Questions that
+failed or got the extractive fallback are retried, so an id can appear more
+than once; the last record for an id is the one that counts.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple
+import json
+import os
+import time
+import logging
+
+from src.rag.pipeline import RAGPipeline, PreparedQuery
+from src.rag.llm_client import Generation
+from src.utils import tracing
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def read_questions(input_path: Path) -> Iterator[Dict]:
+    """Questions from JSONL; `id` defaults to the line number, bad lines carry an error"""
+    with open(input_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {"id": str(line_number), "question": None, "error": f"Invalid JSON: {e}"}
+                continue
+            question = item.get("question") if isinstance(item, dict) else None
+            if question is not None and not isinstance(question, str):
+                yield {"id": str(line_number), "question": None, "error": "'question' must be a string"}
+                continue
+            if not question or not question.strip():
+                yield {"id": str(line_number), "question": None, "error": "Missing 'question'"}
+                continue
+            yield {"id": str(item.get("id", line_number)), "question": question.strip(), "error": None}
+
+
+def is_complete(record: Dict) -> bool:
+    """Answered by the LLM, or rejected as bad input (retrying can't change that)"""
+    if record.get("question") is None:
+        return True
+    return not record.get("error") and not record.get("llm_fallback")
+
+
+def completed_ids(output_path: Path) -> Set[str]:
+    """Ids whose latest record in the output file needs no retry"""
+    done = set()
+    if not output_path.exists():
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                record_id = str(record["id"])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+            if is_complete(record):
+                done.add(record_id)
+            else:
+                done.discard(record_id)
+    return done
+
+
+def drop_partial_line(output_path: Path):
+    """Cut a torn last record (interrupted mid-write) so appends start on a fresh line"""
+    if not output_path.exists():
+        return
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            logger.warning(f"⚠️  Dropped incomplete last record in {output_path}")
+
+
+class BatchJob:
+    """Answer a JSONL file of questions in batches, resumably"""
+
+    def __init__(
+        self,
+        pipeline: RAGPipeline,
+        batch_size: int = None,
+        concurrency: int = None,
+        top_k: int = None
+    ):
+        self.pipeline = pipeline
+        self.batch_size = batch_size or config.BATCH_JOB_SIZE
+        self.concurrency = concurrency or config.BATCH_JOB_CONCURRENCY
+        self.top_k = top_k
+
+    def _answer(self, prepared: PreparedQuery) -> Tuple[Generation, float]:
+        start = time.time()
+        return self.pipeline.answer(prepared), time.time() - start
+
+    def _run_batch(self, items: List[Dict], pool: ThreadPoolExecutor) -> List[Dict]:
+        with tracing.span("batch.run", questions=len(items)):
+            return self._answer_batch(items, pool)
+
+    def _answer_batch(self, items: List[Dict], pool: ThreadPoolExecutor) -> List[Dict]:
+        records = [self._record(item) for item in items]
+        valid = [(item, record) for item, record in zip(items, records) if item["error"] is None]
+
+        try:
+            prepared_batch = self.pipeline.prepare_batch([item["question"] for item, _ in valid], top_k=self.top_k)
+        except Exception as e:
+            logger.error(f"❌ Retrieval failed for batch of {len(valid)}: {e}")
+            for _, record in valid:
+                record["error"] = f"Retrieval failed: {e}"
+            return records
+
+        # Each worker gets its own copy of the context so answer spans nest under this batch
+        futures = [(item, record, prepared, pool.submit(contextvars.copy_context().run, self._answer, prepared))
+                   for (item, record), prepared in zip(valid, prepared_batch)]
+        for item, record, prepared, future in futures:
+            record["timings"] = dict(prepared.timings)
+            try:
+                generation, generation_time = future.result()
+            except Exception as e:
+                logger.error(f"❌ Generation failed for {item['id']}: {e}")
+                record["error"] = f"Generation failed: {e}"
+                continue
+            response = self.pipeline.build_response(
+                prepared, generation, generation_time, prepared.retrieval_time + generation_time
+            )
+            record.update(
+                answer=response["answer"],
+                sources=response["sources"],
+                llm_fallback=generation.fallback,
+                cache_hit=prepared.cached_answer is not None
+            )
+            record["timings"]["generation_time"] = generation_time
+        return records
+
+    @staticmethod
+    def _record(item: Dict) -> Dict:
+        return {
+            "id": item["id"],
+            "question": item["question"],
+            "answer": None,
+            "sources": [],
+            "llm_fallback": False,
+            "cache_hit": False,
+            "timings": {},
+            "error": item["error"]
+        }
+
+    def run(self, input_path: Path, output_path: Path, resume: bool = True) -> Dict:
+        input_path, output_path = Path(input_path), Path(output_path)
+        done = set()
+        if resume:
+            drop_partial_line(output_path)
+            done = completed_ids(output_path)
+        if done:
+            logger.info(f"Resuming: {len(done)} questions already answered in {output_path}")
+
+        summary = {"total": 0, "skipped": 0, "answered": 0, "errors": 0, "fallbacks": 0}
+        start = time.time()
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "a" if resume else "w", encoding="utf-8") as out, \
+                ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch-llm") as pool:
+            batch = []
+            for item in read_questions(input_path):
+                summary["total"] += 1
+                if item["id"] in done:
+                    summary["skipped"] += 1
+                    continue
+                batch.append(item)
+                if len(batch) == self.batch_size:
+                    self._write(out, self._run_batch(batch, pool), summary)
+                    batch = []
+            if batch:
+                self._write(out, self._run_batch(batch, pool), summary)
+
+        summary["elapsed"] = time.time() - start
+        processed = summary["answered"] + summary["errors"]
+        summary["questions_per_sec"] = processed / summary["elapsed"] if summary["elapsed"] else 0.0
+        logger.info(
+            f"✅ Batch job done: {summary['answered']} answered, {summary['errors']} errors, "
+            f"{summary['skipped']} skipped in {summary['elapsed']:.1f}s "
+            f"({summary['questions_per_sec']:.1f} questions/s)"
+        )
+        return summary
+
+    @staticmethod
+    def _write(out, records: List[Dict], summary: Dict):
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if record["error"]:
+                summary["errors"] += 1
+            else:
+                summary["answered"] += 1
+                summary["fallbacks"] += record["llm_fallback"]
+        # Checkpoint: everything written so far survives a crash
+        out.flush()
+        os.fsync(out.fileno())
+        logger.info(f"Checkpointed {summary['answered'] + summary['errors']} records")
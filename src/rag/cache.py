@@ -0,0 +1,218 @@
+import re
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Optional, Tuple
+
+import numpy as np
+
+from src.config import config
+from src.utils.lazy import faiss
+
+logger = logging.getLogger(__name__)
+
+ChunkKey = Tuple[str, int]
+
+
+class SemanticAnswerCache:
+    """
+    Answer cache keyed on query-embedding similarity.
+
+    Paraphrases of an earlier question land close to it in embedding space,
+    so a new query reuses a cached answer when:
+      - its embedding has cosine similarity >= ``similarity_threshold`` with
+        the cached query, and
+      - it retrieved exactly the same set of chunks, and
+      - the cached entry was produced against the same index version.
+
+    Entries expire after ``ttl_seconds`` and the least recently used entry
+    is evicted once ``max_entries`` is reached.
+    """
+
+    # Nearest cached queries to inspect per lookup; more than one because the
+    # closest match may belong to a different chunk set or index version.
+    SEARCH_CANDIDATES = 8
+
+    def __init__(
+        self,
+        embedding_dim: int,
+        similarity_threshold: float = None,
+        max_entries: int = None,
+        ttl_seconds: float = None
+    ):
+        self.embedding_dim = embedding_dim
+        self.similarity_threshold = (
+            similarity_threshold if similarity_threshold is not None else config.SEMANTIC_CACHE_THRESHOLD
+        )
+        self.max_entries = max_entries if max_entries is not None else config.SEMANTIC_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.SEMANTIC_CACHE_TTL
+
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(embedding_dim))
+        self.entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(
+        self,
+        query_embedding: np.ndarray,
+        chunk_ids: FrozenSet[ChunkKey],
+        index_version: Optional[str]
+    ) -> Optional[str]:
+        """Return a cached answer for a semantically equivalent query, or None"""
+        query_embedding = self._as_row(query_embedding)
+
+        with self._lock:
+            self._evict_expired()
+
+            if self.index.ntotal > 0:
+                k = min(self.SEARCH_CANDIDATES, self.index.ntotal)
+                scores, ids = self.index.search(query_embedding, k)
+
+                stale = []
+                for score, entry_id in zip(scores[0], ids[0]):
+                    if entry_id < 0 or score < self.similarity_threshold:
+                        break
+                    entry = self.entries[int(entry_id)]
+                    if entry['index_version'] != index_version:
+                        stale.append(int(entry_id))
+                        continue
+                    if entry['chunk_ids'] != chunk_ids:
+                        continue
+
+                    self.entries.move_to_end(int(entry_id))
+                    self.hits += 1
+                    self._remove(stale)
+                    logger.info(f"Semantic cache hit (similarity {score:.3f})")
+                    return entry['answer']
+
+                self._remove(stale)
+
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        query_embedding: np.ndarray,
+        chunk_ids: FrozenSet[ChunkKey],
+        index_version: Optional[str],
+        answer: str
+    ):
+        query_embedding = self._as_row(query_embedding)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+
+            self.index.add_with_ids(query_embedding, np.array([entry_id], dtype=np.int64))
+            self.entries[entry_id] = {
+                'chunk_ids': chunk_ids,
+                'index_version': index_version,
+                'answer': answer,
+                'created_at': time.time()
+            }
+
+            if len(self.entries) > self.max_entries:
+                oldest_id, _ = self.entries.popitem(last=False)
+                self.index.remove_ids(np.array([oldest_id], dtype=np.int64))
+
+    def invalidate(self, keep_version: Optional[str] = None):
+        """Drop every entry not produced against `keep_version` (all entries if None)"""
+        with self._lock:
+            stale = [
+                entry_id for entry_id, entry in self.entries.items()
+                if keep_version is None or entry['index_version'] != keep_version
+            ]
+            self._remove(stale)
+        logger.info(f"Semantic cache invalidated {len(stale)} entries")
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'similarity_threshold': self.similarity_threshold,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+    def _evict_expired(self):
+        cutoff = time.time() - self.ttl_seconds
+        expired = []
+        # Entries are in LRU order, not insertion order, so scan them all
+        for entry_id, entry in self.entries.items():
+            if entry['created_at'] < cutoff:
+                expired.append(entry_id)
+        self._remove(expired)
+
+    def _remove(self, entry_ids):
+        if not entry_ids:
+            return
+        for entry_id in entry_ids:
+            self.entries.pop(entry_id, None)
+        self.index.remove_ids(np.array(entry_ids, dtype=np.int64))
+
+    def _as_row(self, embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if embedding.ndim == 1:
+            embedding = embedding.reshape(1, -1)
+        return embedding
+
+
+def normalize_question(question: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation"""
+    question = re.sub(r'\s+', ' ', question.casefold()).strip()
+    return question.rstrip('?!. ')
+
+
+class ResponseCache:
+    """Thread-safe exact-match cache with per-entry TTL and LRU eviction"""
+
+    def __init__(self, max_entries: int = None, ttl_seconds: float = None):
+        self.max_entries = max_entries if max_entries is not None else config.RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.RESPONSE_CACHE_TTL
+
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self.entries.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > time.time():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self.entries[key] = (time.time() + self.ttl_seconds, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'ttl_seconds': self.ttl_seconds
+        }
@@ -0,0 +1,167 @@
+"""
+Extractive context compression.
+
+Retrieved chunks are split into sentences, every sentence is scored
+against the query embedding in one matrix product, and only the best
+sentences that fit the token budget go into the prompt.  Kept sentences
+stay in document order so the context still reads coherently.
+
+When the index ships a SentenceIndex, its precomputed scores are used and
+nothing is encoded at query time.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import time
+import logging
+
+import numpy as np
+
+from src.models.embedder import SBERTEmbedder
+from src.retrieval.context_builder import TokenCounter, SEPARATOR
+from src.retrieval.sentence_index import SentenceHit, split_sentences
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CompressedContext:
+    text: str
+    original_tokens: int
+    tokens: int
+    sentences: int
+    kept_sentences: int
+    compression_time: float
+
+    @property
+    def ratio(self) -> float:
+        return self.tokens / self.original_tokens if self.original_tokens else 1.0
+
+
+class ExtractiveCompressor:
+    """Keep the query-relevant sentences of the retrieved chunks, within a token budget"""
+
+    def __init__(
+        self,
+        embedder: SBERTEmbedder,
+        token_counter: TokenCounter = None,
+        max_tokens: int = None,
+        min_similarity: float = None
+    ):
+        self.embedder = embedder
+        self.token_counter = token_counter or TokenCounter()
+        self.max_tokens = max_tokens or config.COMPRESSION_MAX_TOKENS
+        self.min_similarity = config.COMPRESSION_MIN_SIMILARITY if min_similarity is None else min_similarity
+
+        self.calls = 0
+        self.original_tokens = 0
+        self.compressed_tokens = 0
+        self.total_time = 0.0
+
+    def _score_sentences(
+        self,
+        query_embedding: np.ndarray,
+        results: List[Tuple[Dict, float]],
+        hits: Optional[List[SentenceHit]]
+    ) -> Tuple[List[Tuple[int, int, str]], np.ndarray]:
+        """((result rank, position, sentence), score) pairs, de-duplicated across overlapping chunks"""
+        if hits is not None:
+            candidates = [((h.result, h.start, h.text), h.score) for h in hits]
+        else:
+            sentences = [
+                (rank, position, sentence)
+                for rank, (doc, _) in enumerate(results)
+                for position, sentence in enumerate(split_sentences(doc['text']))
+            ]
+            if not sentences:
+                return [], np.zeros(0, dtype=np.float32)
+            embeddings = self.embedder.encode([s for _, _, s in sentences], batch_size=64)
+            scores = embeddings @ np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+            candidates = list(zip(sentences, scores))
+
+        seen = set()
+        sentences, scores = [], []
+        for sentence, score in candidates:
+            key = sentence[2].lower()
+            if key not in seen:
+                seen.add(key)
+                sentences.append(sentence)
+                scores.append(score)
+        return sentences, np.asarray(scores, dtype=np.float32)
+
+    def compress(
+        self,
+        query_embedding: np.ndarray,
+        results: List[Tuple[Dict, float]],
+        max_tokens: int = None,
+        hits: List[SentenceHit] = None
+    ) -> CompressedContext:
+        """Pass `hits` (SentenceIndex.rank output) to reuse precomputed sentence scores"""
+        start = time.time()
+        max_tokens = max_tokens or self.max_tokens
+        sentences, scores = self._score_sentences(query_embedding, results, hits)
+        if not sentences:
+            return CompressedContext("", 0, 0, 0, 0, time.time() - start)
+
+        texts = [sentence for _, _, sentence in sentences]
+        tokens = [self.token_counter.count(t) for t in texts]
+
+        # Best sentences first until the budget is spent; always keep the top one
+        keep = []
+        used = 0
+        oversized = False
+        for i in np.argsort(-scores):
+            if keep and scores[i] < self.min_similarity:
+                break
+            if used + tokens[i] > max_tokens:
+                if not keep:
+                    keep.append(i)
+                    oversized = True
+                    break
+                continue
+            keep.append(i)
+            used += tokens[i]
+
+        # Back to document order: by chunk rank, then position within the chunk
+        keep.sort(key=lambda i: sentences[i][:2])
+        parts = []
+        previous_rank = None
+        for i in keep:
+            rank, _, sentence = sentences[i]
+            if rank != previous_rank:
+                parts.append(sentence)
+            else:
+                parts[-1] += " " + sentence
+            previous_rank = rank
+        text = SEPARATOR.join(parts)
+        if oversized:
+            text = self.token_counter.truncate(text, max_tokens)
+
+        compressed = CompressedContext(
+            text=text,
+            original_tokens=sum(tokens),
+            tokens=self.token_counter.count(text),
+            sentences=len(sentences),
+            kept_sentences=len(keep),
+            compression_time=time.time() - start
+        )
+        self.calls += 1
+        self.original_tokens += compressed.original_tokens
+        self.compressed_tokens += compressed.tokens
+        self.total_time += compressed.compression_time
+
+        logger.info(
+            f"Compressed context {compressed.original_tokens} -> {compressed.tokens} tokens "
+            f"({compressed.kept_sentences}/{compressed.sentences} sentences, {compressed.compression_time * 1000:.0f}ms)"
+        )
+        return compressed
+
+    def stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "original_tokens": self.original_tokens,
+            "compressed_tokens": self.compressed_tokens,
+            "tokens_saved": self.original_tokens - self.compressed_tokens,
+            "avg_ratio": self.compressed_tokens / self.original_tokens if self.original_tokens else None,
+            "avg_time_ms": self.total_time / self.calls * 1000 if self.calls else None
+        }
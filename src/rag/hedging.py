@@ -0,0 +1,286 @@
+"""
+Hedged requests across one or more LLM backends.
+
+The first backend gets the request.  If it hasn't answered within the
+hedge delay (its recent p95 latency, clamped to a configured range), a
+duplicate goes to the next backend; whichever answers first wins and the
+others are told to stop.  A failed attempt triggers the next backend
+immediately instead of waiting out the delay.
+
+With a single backend the duplicate goes to the same backend, which
+still cuts the tail when slowness is per-request rather than per-backend.
+
+Losing attempts are cancelled outright: `generate` cuts their in-flight
+HTTP requests (see HFInferenceBackend.generate), and `agenerate` /
+`astream`, which do the same on asyncio backends, cancel their tasks.
+
+The hedge delay is learned from first attempts only.  Hedges start late
+and only the fast ones matter, so their latencies would drag the p95
+down; a first attempt that loses to a hedge is recorded with the time it
+had run when it was cancelled, a lower bound on its real latency.
+"""
+
+import asyncio
+import time
+import logging
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import AsyncIterator, Dict, Iterator, List
+
+from src.rag.resilience import (
+    ResilientBackend, AsyncResilientBackend, LatencyHistogram, LLMError, CallCancelledError, CancelEvent
+)
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class HedgedBackends:
+    """Dispatch generation calls to a list of ResilientBackends with hedging"""
+
+    # Observations needed before the histogram's p95 replaces the default delay
+    MIN_SAMPLES = 20
+
+    def __init__(
+        self,
+        backends: List[ResilientBackend],
+        async_backends: List[AsyncResilientBackend] = None,
+        hedging: bool = None,
+        max_hedges: int = None,
+        quantile: float = None,
+        min_delay: float = None,
+        max_delay: float = None,
+        default_delay: float = None
+    ):
+        if not backends:
+            raise ValueError("HedgedBackends needs at least one backend")
+        if async_backends is not None and len(async_backends) != len(backends):
+            raise ValueError("async_backends must pair up with backends")
+
+        self.backends = backends
+        # async_backends[i] talks to the same endpoint as backends[i]
+        self.async_backends = async_backends
+        self.hedging = config.LLM_HEDGING if hedging is None else hedging
+        self.max_hedges = config.LLM_MAX_HEDGES if max_hedges is None else max_hedges
+        self.quantile = quantile or config.LLM_HEDGE_QUANTILE
+        self.min_delay = min_delay or config.LLM_HEDGE_MIN_DELAY
+        self.max_delay = max_delay or config.LLM_HEDGE_MAX_DELAY
+        self.default_delay = default_delay or config.LLM_HEDGE_DEFAULT_DELAY
+
+        # Keyed by object identity: two endpoints may serve the same model name
+        self.histograms: Dict[int, LatencyHistogram] = {id(b): LatencyHistogram() for b in backends}
+        self._pool = ThreadPoolExecutor(
+            max_workers=sum(b.max_concurrency for b in backends) * (self.max_hedges + 1),
+            thread_name_prefix="llm-hedge"
+        )
+        self.calls = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+
+    @property
+    def name(self) -> str:
+        return self.backends[0].name
+
+    def hedge_delay(self, backend: ResilientBackend) -> float:
+        histogram = self.histograms[id(backend)]
+        if histogram.count < self.MIN_SAMPLES:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, histogram.quantile(self.quantile)))
+
+    def _candidate_indices(self) -> List[int]:
+        """Healthy backends first, in configured order, then one duplicate of the primary"""
+        healthy = [i for i, b in enumerate(self.backends) if b.available()] or list(range(len(self.backends)))
+        if len(healthy) <= self.max_hedges:
+            healthy = healthy + [healthy[0]] * (self.max_hedges + 1 - len(healthy))
+        return healthy[:self.max_hedges + 1]
+
+    def _candidates(self) -> List[ResilientBackend]:
+        return [self.backends[i] for i in self._candidate_indices()]
+
+    def _timed_call(
+        self, backend: ResilientBackend, prompt: str, cancel: CancelEvent, params: Dict, record: bool
+    ) -> str:
+        start = time.monotonic()
+        try:
+            text = backend.generate(prompt, cancel=cancel, **params)
+        except CallCancelledError:
+            # Lost to a hedge: its real latency is at least the time it had run
+            if record:
+                self.histograms[id(backend)].record(time.monotonic() - start)
+            raise
+        if record:
+            self.histograms[id(backend)].record(time.monotonic() - start)
+        return text
+
+    def generate(self, prompt: str, **params) -> str:
+        self.calls += 1
+        candidates = self._candidates() if self.hedging else self._candidates()[:1]
+        cancel = CancelEvent()
+        pending = {}
+        last_error = None
+
+        def launch(i: int):
+            backend = candidates[i]
+            future = self._pool.submit(self._timed_call, backend, prompt, cancel, params, i == 0)
+            pending[future] = (i, backend)
+
+        launch(0)
+        next_idx = 1
+        try:
+            while pending:
+                primary = candidates[next_idx - 1]
+                timeout = self.hedge_delay(primary) if next_idx < len(candidates) else None
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # Nobody answered within the hedge delay: send a duplicate
+                    logger.info(f"Hedging: {primary.name} slow after {timeout:.2f}s, "
+                                f"duplicating to {candidates[next_idx].name}")
+                    self.hedges_sent += 1
+                    launch(next_idx)
+                    next_idx += 1
+                    continue
+
+                for future in done:
+                    i, backend = pending.pop(future)
+                    try:
+                        text = future.result()
+                    except LLMError as e:
+                        last_error = e
+                        logger.warning(f"⚠️  {backend.name} failed: {e}")
+                        continue
+
+                    if i > 0:
+                        self.hedge_wins += 1
+                    return text
+
+                # Every finished attempt failed; fail over right away
+                if not pending and next_idx < len(candidates):
+                    launch(next_idx)
+                    next_idx += 1
+
+            raise last_error or LLMError("All LLM backends failed")
+        finally:
+            # Aborts the losers' in-flight HTTP requests (local backends stop at the next token)
+            cancel.set()
+
+    def stream(self, prompt: str, **params) -> Iterator[str]:
+        """Stream from the first healthy backend, failing over while no token has been sent"""
+        last_error = None
+        for backend in self._candidates()[:len(self.backends)]:
+            emitted = False
+            try:
+                for token in backend.stream(prompt, **params):
+                    emitted = True
+                    yield token
+                return
+            except LLMError as e:
+                if emitted or isinstance(e, CallCancelledError):
+                    raise
+                last_error = e
+                logger.warning(f"⚠️  {backend.name} failed before first token, failing over: {e}")
+        raise last_error or LLMError("All LLM backends failed")
+
+    async def _atimed_call(self, i: int, prompt: str, params: Dict, record: bool) -> str:
+        start = time.monotonic()
+        try:
+            text = await self.async_backends[i].generate(prompt, **params)
+        except (CallCancelledError, asyncio.CancelledError):
+            # Lost to a hedge: its real latency is at least the time it had run
+            if record:
+                self.histograms[id(self.backends[i])].record(time.monotonic() - start)
+            raise
+        if record:
+            self.histograms[id(self.backends[i])].record(time.monotonic() - start)
+        return text
+
+    async def agenerate(self, prompt: str, **params) -> str:
+        """asyncio version of generate; cancelling the caller cancels every attempt"""
+        if self.async_backends is None:
+            raise LLMError("No async backends configured")
+
+        self.calls += 1
+        candidates = self._candidate_indices() if self.hedging else self._candidate_indices()[:1]
+        pending = {}
+        last_error = None
+
+        def launch(n: int):
+            i = candidates[n]
+            task = asyncio.ensure_future(self._atimed_call(i, prompt, params, n == 0))
+            pending[task] = (n, self.backends[i])
+
+        launch(0)
+        next_idx = 1
+        try:
+            while pending:
+                primary = self.backends[candidates[next_idx - 1]]
+                timeout = self.hedge_delay(primary) if next_idx < len(candidates) else None
+                done, _ = await asyncio.wait(list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    logger.info(f"Hedging: {primary.name} slow after {timeout:.2f}s, "
+                                f"duplicating to {self.backends[candidates[next_idx]].name}")
+                    self.hedges_sent += 1
+                    launch(next_idx)
+                    next_idx += 1
+                    continue
+
+                for task in done:
+                    n, backend = pending.pop(task)
+                    try:
+                        text = task.result()
+                    except LLMError as e:
+                        last_error = e
+                        logger.warning(f"⚠️  {backend.name} failed: {e}")
+                        continue
+
+                    if n > 0:
+                        self.hedge_wins += 1
+                    return text
+
+                if not pending and next_idx < len(candidates):
+                    launch(next_idx)
+                    next_idx += 1
+
+            raise last_error or LLMError("All LLM backends failed")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def astream(self, prompt: str, **params) -> AsyncIterator[str]:
+        """asyncio version of stream"""
+        if self.async_backends is None:
+            raise LLMError("No async backends configured")
+
+        last_error = None
+        for i in self._candidate_indices()[:len(self.backends)]:
+            backend = self.async_backends[i]
+            emitted = False
+            try:
+                async with aclosing(backend.stream(prompt, **params)) as tokens:
+                    async for token in tokens:
+                        emitted = True
+                        yield token
+                return
+            except LLMError as e:
+                if emitted:
+                    raise
+                last_error = e
+                logger.warning(f"⚠️  {backend.name} failed before first token, failing over: {e}")
+        raise last_error or LLMError("All LLM backends failed")
+
+    def stats(self) -> Dict:
+        return {
+            "hedging": self.hedging,
+            "calls": self.calls,
+            "hedges_sent": self.hedges_sent,
+            "hedge_wins": self.hedge_wins,
+            "backends": [
+                {
+                    **backend.stats(),
+                    "latency": self.histograms[id(backend)].snapshot(),
+                    "hedge_delay": self.hedge_delay(backend)
+                }
+                for backend in self.backends
+            ]
+        }
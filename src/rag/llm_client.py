@@ -1,11 +1,32 @@
 import os
+import re
 import logging
-from typing import Optional
-from huggingface_hub import InferenceClient
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, List, Optional
+from src.rag.hedging import HedgedBackends
+from src.rag.resilience import (
+    ResilientBackend, AsyncResilientBackend, TokenBucket,
+    RateLimitedError, ModelLoadingError, CircuitOpenError
+)
+from src.utils.metrics import LLM_FALLBACKS
+from src.utils import tracing
 from src.config import config
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SYSTEM_PROMPT = """You are a legal contract analysis assistant.
+Answer questions based ONLY on the provided context from legal contracts.
+If the context doesn't contain the answer, say so clearly.
+Be concise and cite specific contract clauses."""
+
+@dataclass
+class Generation:
+    """Generated answer plus whether it came from the extractive fallback"""
+    text: str = ""
+    fallback: bool = False
+    note: str = ""
+
 class LLMClient:
     """
     LLM client using Hugging Face Inference API (100% FREE)
@@ -14,110 +35,437 @@ class LLMClient:
     - mistralai/Mistral-7B-Instruct-v0.2 (fast, good quality)
     - meta-llama/Meta-Llama-3-8B-Instruct (best quality, slower)
     - google/flan-t5-xxl (fast, lightweight)
+    
+    With LLM_BACKEND=local a small causal LM runs in-process on CPU
+    instead (config.LOCAL_LLM_MODEL), for offline environments.
     """
     
-    def __init__(self, model: str = None):
+    def __init__(
+        self,
+        model: str = None,
+        base_url: str = None,
+        backends: List[str] = None,
+        backend_type: str = None
+    ):
+        """
+        Args:
+            model: primary model id (defaults to config.HF_MODEL, or LOCAL_LLM_MODEL when local)
+            base_url: endpoint for the primary model (defaults to config.HF_INFERENCE_URL)
+            backends: extra "model" or "model@base_url" specs for hedging
+                      (defaults to config.LLM_BACKENDS)
+            backend_type: "hf" or "local" (defaults to config.LLM_BACKEND)
+        """
+        self.local = (backend_type or config.LLM_BACKEND) == "local"
+        if self.local:
+            self._init_local(model)
+            return
+        
         self.hf_token = os.getenv("HUGGINGFACE_API_KEY") or os.getenv("HF_TOKEN")
+        if self.hf_token == "your_hf_token_here":
+            self.hf_token = None
+        base_url = base_url or config.HF_INFERENCE_URL
         
-        if not self.hf_token or self.hf_token == "your_hf_token_here":
+        # A self-hosted endpoint (TGI, local stub) doesn't need a token
+        if not self.hf_token and base_url == config.HF_INFERENCE_URL_DEFAULT:
             logger.warning("⚠️  HF token not set. Using mock mode.")
             self.client = None
             self.model = "mock"
             return
         
         # Best free models on HF Inference API
-        self.model = model or "mistralai/Mistral-7B-Instruct-v0.2"
+        self.model = model or config.HF_MODEL
         
-        try:
-            self.client = InferenceClient(token=self.hf_token)
-            logger.info(f"✅ Hugging Face client initialized")
-            logger.info(f"   Model: {self.model}")
-        except Exception as e:
-            logger.error(f"❌ HF client init failed: {e}")
-            self.client = None
-            self.model = "mock"
-    
-    def generate_answer(
-        self,
-        query: str,
-        context: str,
-        temperature: float = None,
-        max_tokens: int = None,
-        system_prompt: str = None
-    ) -> str:
-        """Generate answer using Hugging Face model"""
+        if backends is None:
+            backends = [spec.strip() for spec in config.LLM_BACKENDS.split(",") if spec.strip()]
         
-        if self.client is None:
-            return self._mock_answer(query, context)
+        specs = [(self.model, base_url)]
+        for spec in backends:
+            extra_model, _, extra_url = spec.partition("@")
+            specs.append((extra_model, extra_url or base_url))
         
-        temperature = temperature or 0.3
-        max_tokens = max_tokens or 500
+        # requests / httpx are only needed once a remote endpoint is configured
+        from src.rag.backends import HFInferenceBackend, AsyncHFInferenceBackend
+        
+        # Prompts are formatted for the primary model; keep backends in one family.
+        # Each endpoint gets a blocking and an asyncio transport sharing one
+        # breaker / rate limiter, so both paths see the same health state.
+        sync_backends = [
+            ResilientBackend(HFInferenceBackend(spec_model, token=self.hf_token, base_url=spec_url))
+            for spec_model, spec_url in specs
+        ]
+        async_backends = [
+            AsyncResilientBackend(
+                AsyncHFInferenceBackend(spec_model, token=self.hf_token, base_url=spec_url),
+                sync_backend
+            )
+            for (spec_model, spec_url), sync_backend in zip(specs, sync_backends)
+        ]
+        self.client = HedgedBackends(sync_backends, async_backends=async_backends)
+        logger.info(f"✅ Hugging Face client initialized")
+        for spec_model, spec_url in specs:
+            logger.info(f"   Backend: {spec_model} @ {spec_url}")
+    
+    def _init_local(self, model: str = None):
+        # torch / transformers are only needed for the local backend
+        from src.rag.local_backend import LocalLLMBackend
         
+        self.hf_token = None
+        self.model = model or config.LOCAL_LLM_MODEL
+        local = LocalLLMBackend(self.model, prefix=self._prompt_prefix())
+        sync_backend = ResilientBackend(
+            local,
+            max_concurrency=config.LOCAL_LLM_CONCURRENCY,
+            # No remote quota to protect
+            rate_limiter=TokenBucket(rate=1000, capacity=1000)
+        )
+        # Hedging would only duplicate work on the same CPU
+        self.client = HedgedBackends(
+            [sync_backend],
+            async_backends=[AsyncResilientBackend(local, sync_backend)],
+            hedging=False
+        )
+        logger.info(f"✅ Local LLM client initialized ({self.model})")
+    
+    def _prompt_prefix(self, system_prompt: str = None) -> str:
+        """Leading part of the prompt that doesn't depend on the question (KV-cacheable locally)"""
         if system_prompt is None:
-            system_prompt = """You are a legal contract analysis assistant.
-Answer questions based ONLY on the provided context from legal contracts.
-If the context doesn't contain the answer, say so clearly.
-Be concise and cite specific contract clauses."""
+            system_prompt = DEFAULT_SYSTEM_PROMPT
+        
+        if self.local:
+            return f"{system_prompt}\n\nContext from contracts:\n"
         
         # Format prompt for instruction-tuned models
         if "Mistral" in self.model or "Llama" in self.model:
-            prompt = f"""<s>[INST] {system_prompt}
+            return f"<s>[INST] {system_prompt}\n\nContext from contracts:\n"
+        
+        return "Context: "
+    
+    def _build_prompt(self, query: str, context: str, system_prompt: str = None) -> str:
+        prefix = self._prompt_prefix(system_prompt)
+        
+        if self.local:
+            return f"""{prefix}{context}
 
-Context from contracts:
-{context}
+Question: {query}
+
+Answer:"""
+        
+        if "Mistral" in self.model or "Llama" in self.model:
+            return f"""{prefix}{context}
 
 Question: {query}
 
 Answer: [/INST]"""
-        else:
-            prompt = f"""Context: {context}
+        
+        return f"""{prefix}{context}
 
 Question: {query}
 
 Answer based on the context above:"""
+    
+    def _fallback_note(self, error: Exception) -> str:
+        """Log an HF failure (after retries) and return the note shown with the mock answer"""
+        
+        # Handle rate limit
+        if isinstance(error, RateLimitedError):
+            logger.warning("⚠️  Rate limit hit. Using mock answer.")
+            return "(Rate limit reached)"
+        
+        # Handle model loading
+        if isinstance(error, ModelLoadingError):
+            logger.warning("⚠️  Model loading. Try again in 20 seconds.")
+            return "(Model loading, retry in 20s)"
+        
+        if isinstance(error, CircuitOpenError):
+            logger.warning("⚠️  LLM circuit open. Using mock answer.")
+            return "(LLM temporarily unavailable)"
+        
+        logger.error(f"❌ HF error: {error}")
+        return ""
+    
+    def generate_answer(
+        self,
+        query: str,
+        context: str,
+        temperature: float = None,
+        max_tokens: int = None,
+        system_prompt: str = None
+    ) -> str:
+        """Generate answer using Hugging Face model"""
+        return self.generate(query, context, temperature, max_tokens, system_prompt).text
+    
+    def generate(
+        self,
+        query: str,
+        context: str,
+        temperature: float = None,
+        max_tokens: int = None,
+        system_prompt: str = None,
+        ranked_sentences: List[str] = None
+    ) -> Generation:
+        """
+        Like generate_answer, but also reports whether the mock fallback answered.
+        `ranked_sentences` (best first) lets the fallback skip its own sentence scoring.
+        """
+        with tracing.span("llm.generate", model=self.model, context_chars=len(context or "")) as span:
+            generation = self._generate(query, context, temperature, max_tokens, system_prompt, ranked_sentences)
+            self._annotate(span, generation)
+        return generation
+    
+    def _generate(
+        self,
+        query: str,
+        context: str,
+        temperature: float = None,
+        max_tokens: int = None,
+        system_prompt: str = None,
+        ranked_sentences: List[str] = None
+    ) -> Generation:
+        if self.client is None:
+            return Generation(self._mock_answer(query, context, "no_backend", ranked_sentences=ranked_sentences), fallback=True)
+        
+        temperature = temperature or 0.3
+        max_tokens = max_tokens or 500
+        prompt = self._build_prompt(query, context, system_prompt)
         
         try:
             logger.info(f"Calling HF model: {self.model}")
             
-            response = self.client.text_generation(
+            response = self.client.generate(
                 prompt,
-                model=self.model,
                 max_new_tokens=max_tokens,
-                temperature=temperature,
-                do_sample=True,
-                return_full_text=False,
-                stream=False
+                temperature=temperature
             )
             
             answer = response.strip()
             logger.info(f"✅ Generated answer ({len(answer)} chars)")
-            return answer
+            return Generation(answer)
+            
+        except Exception as e:
+            note = self._fallback_note(e)
+            return Generation(self._mock_answer(query, context, "llm_error", note=note, ranked_sentences=ranked_sentences), fallback=True, note=note)
+    
+    async def agenerate(
+        self,
+        query: str,
+        context: str,
+        temperature: float = None,
+        max_tokens: int = None,
+        system_prompt: str = None,
+        ranked_sentences: List[str] = None
+    ) -> Generation:
+        """
+        asyncio version of generate.  Cancelling the awaiting task cancels
+        the upstream HTTP request(s) instead of letting them run to completion.
+        """
+        with tracing.span("llm.generate", model=self.model, context_chars=len(context or "")) as span:
+            generation = await self._agenerate(query, context, temperature, max_tokens, system_prompt, ranked_sentences)
+            self._annotate(span, generation)
+        return generation
+    
+    async def _agenerate(
+        self,
+        query: str,
+        context: str,
+        temperature: float = None,
+        max_tokens: int = None,
+        system_prompt: str = None,
+        ranked_sentences: List[str] = None
+    ) -> Generation:
+        if self.client is None:
+            return Generation(self._mock_answer(query, context, "no_backend", ranked_sentences=ranked_sentences), fallback=True)
+        
+        temperature = temperature or 0.3
+        max_tokens = max_tokens or 500
+        prompt = self._build_prompt(query, context, system_prompt)
+        
+        try:
+            logger.info(f"Calling HF model (async): {self.model}")
+            
+            response = await self.client.agenerate(
+                prompt,
+                max_new_tokens=max_tokens,
+                temperature=temperature
+            )
+            
+            answer = response.strip()
+            logger.info(f"✅ Generated answer ({len(answer)} chars)")
+            return Generation(answer)
             
         except Exception as e:
-            error_msg = str(e)
+            note = self._fallback_note(e)
+            return Generation(self._mock_answer(query, context, "llm_error", note=note, ranked_sentences=ranked_sentences), fallback=True, note=note)
+    
+    def stream_answer(
+        self,
+        query: str,
+        context: str,
+        temperature: float = None,
+        max_tokens: int = None,
+        system_prompt: str = None,
+        result: Generation = None,
+        ranked_sentences: List[str] = None
+    ) -> Iterator[str]:
+        """
+        Yield the answer incrementally as the model produces tokens.
+        Pass a Generation as `result` to collect the full text and fallback flag.
+        """
+        result = result if result is not None else Generation()
+        with tracing.span("llm.stream", model=self.model, context_chars=len(context or "")) as span:
+            yield from self._stream_answer(query, context, temperature, max_tokens, system_prompt, result, ranked_sentences)
+            self._annotate(span, result)
+    
+    def _stream_answer(
+        self,
+        query: str,
+        context: str,
+        temperature: float,
+        max_tokens: int,
+        system_prompt: str,
+        result: Generation,
+        ranked_sentences: List[str]
+    ) -> Iterator[str]:
+        if self.client is None:
+            result.fallback = True
+            for piece in self.stream_text(self._mock_answer(query, context, "no_backend", ranked_sentences=ranked_sentences)):
+                result.text += piece
+                yield piece
+            return
+        
+        temperature = temperature or 0.3
+        max_tokens = max_tokens or 500
+        prompt = self._build_prompt(query, context, system_prompt)
+        
+        emitted = 0
+        try:
+            logger.info(f"Streaming from HF model: {self.model}")
+            
+            for token in self.client.stream(
+                prompt,
+                max_new_tokens=max_tokens,
+                temperature=temperature
+            ):
+                emitted += 1
+                result.text += token
+                yield token
+            
+            logger.info(f"✅ Streamed answer ({emitted} tokens)")
+            
+        except Exception as e:
+            note = self._fallback_note(e)
+            # Once tokens have gone out we can't swap in a different answer
+            result.fallback = True
+            result.note = note
+            if emitted == 0:
+                for piece in self.stream_text(self._mock_answer(query, context, "llm_error", note=note, ranked_sentences=ranked_sentences)):
+                    result.text += piece
+                    yield piece
+    
+    async def astream_answer(
+        self,
+        query: str,
+        context: str,
+        temperature: float = None,
+        max_tokens: int = None,
+        system_prompt: str = None,
+        result: Generation = None,
+        ranked_sentences: List[str] = None
+    ) -> AsyncIterator[str]:
+        """asyncio version of stream_answer; closing the iterator aborts the upstream stream"""
+        result = result if result is not None else Generation()
+        with tracing.span("llm.stream", model=self.model, context_chars=len(context or "")) as span:
+            async with aclosing(self._astream_answer(
+                query, context, temperature, max_tokens, system_prompt, result, ranked_sentences
+            )) as pieces:
+                async for piece in pieces:
+                    yield piece
+            self._annotate(span, result)
+    
+    async def _astream_answer(
+        self,
+        query: str,
+        context: str,
+        temperature: float,
+        max_tokens: int,
+        system_prompt: str,
+        result: Generation,
+        ranked_sentences: List[str]
+    ) -> AsyncIterator[str]:
+        if self.client is None:
+            result.fallback = True
+            for piece in self.stream_text(self._mock_answer(query, context, "no_backend", ranked_sentences=ranked_sentences)):
+                result.text += piece
+                yield piece
+            return
+        
+        temperature = temperature or 0.3
+        max_tokens = max_tokens or 500
+        prompt = self._build_prompt(query, context, system_prompt)
+        
+        emitted = 0
+        try:
+            logger.info(f"Streaming from HF model (async): {self.model}")
             
-            # Handle rate limit
-            if "rate limit" in error_msg.lower():
-                logger.warning("⚠️  Rate limit hit. Using mock answer.")
-                return self._mock_answer(query, context, note="(Rate limit reached)")
+            async with aclosing(self.client.astream(
+                prompt,
+                max_new_tokens=max_tokens,
+                temperature=temperature
+            )) as tokens:
+                async for token in tokens:
+                    emitted += 1
+                    result.text += token
+                    yield token
             
-            # Handle model loading
-            if "loading" in error_msg.lower():
-                logger.warning("⚠️  Model loading. Try again in 20 seconds.")
-                return self._mock_answer(query, context, note="(Model loading, retry in 20s)")
+            logger.info(f"✅ Streamed answer ({emitted} tokens)")
             
-            logger.error(f"❌ HF error: {e}")
-            return self._mock_answer(query, context)
+        except Exception as e:
+            note = self._fallback_note(e)
+            result.fallback = True
+            result.note = note
+            if emitted == 0:
+                for piece in self.stream_text(self._mock_answer(query, context, "llm_error", note=note, ranked_sentences=ranked_sentences)):
+                    result.text += piece
+                    yield piece
     
-    def _mock_answer(self, query: str, context: str, note: str = "") -> str:
+    @staticmethod
+    def _annotate(span, generation: Generation):
+        span.set_attributes(fallback=generation.fallback, answer_chars=len(generation.text))
+        if generation.note:
+            span.set_attribute("fallback_reason", generation.note)
+    
+    def stats(self) -> dict:
+        if self.client is None:
+            return {"backend": "mock"}
+        return self.client.stats()
+    
+    @staticmethod
+    def stream_text(text: str) -> Iterator[str]:
+        """Split a ready-made answer into word-sized pieces for streaming"""
+        for piece in re.findall(r"\S+\s*|\s+", text):
+            yield piece
+    
+    def _mock_answer(
+        self, query: str, context: str, reason: str, note: str = "", ranked_sentences: List[str] = None
+    ) -> str:
         """
         Fallback when no LLM available.
-        Extracts relevant sentences from context.
+        Extracts relevant sentences from context, or takes the top
+        `ranked_sentences` when the index provides embedding-ranked ones.
+        `reason` (no_backend, llm_error) labels the fallback counter.
         """
+        LLM_FALLBACKS.labels(reason).inc()
+        if ranked_sentences:
+            answer = "**Based on the contract documents:**\n\n"
+            for i, sent in enumerate(ranked_sentences[:3], 1):
+                answer += f"{i}. {sent.rstrip('.')}.\n"
+            if note:
+                answer += f"\n_{note}_"
+            return answer
+        
         if not context or len(context.strip()) < 10:
             return f"No relevant information found. {note}"
         
-        # Score sentences by relevance
+        # Score sentences by word overlap
         query_words = set(query.lower().split())
         sentences = [s.strip() for s in context.replace('\n', ' ').split('.') 
                      if len(s.strip()) > 30]
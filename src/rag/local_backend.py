@@ -0,0 +1,195 @@
+"""
+Local CPU text generation with transformers, for offline / air-gapped use.
+
+Every prompt starts with the same system-prompt prefix, so its KV cache
+is computed once at start-up; each request only runs the context and
+question through the model before decoding.  Exposes the same
+`generate` / `stream` (and asyncio `agenerate` / `astream`) interface as
+the HTTP backends, so it plugs into ResilientBackend / HedgedBackends.
+
+    LLM_BACKEND=local LOCAL_LLM_MODEL=HuggingFaceTB/SmolLM2-135M-Instruct python api/main.py
+"""
+
+import asyncio
+import copy
+import threading
+import time
+import logging
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from src.rag.resilience import LLMError, BackendUnavailableError, CallCancelledError
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLLMBackend:
+    """Small causal LM on CPU with a cached prompt-prefix KV state"""
+
+    def __init__(self, model: str = None, prefix: str = None, device: str = None, threads: int = None):
+        self.model_name = model or config.LOCAL_LLM_MODEL
+        self.name = f"local:{self.model_name}"
+        self.device = device or config.LOCAL_LLM_DEVICE
+
+        threads = threads or config.LOCAL_LLM_THREADS
+        if threads:
+            torch.set_num_threads(threads)
+
+        logger.info(f"Loading local LLM {self.model_name} on {self.device}...")
+        start = time.time()
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self.model = AutoModelForCausalLM.from_pretrained(self.model_name, torch_dtype=torch.float32)
+        self.model.to(self.device)
+        self.model.eval()
+        self.max_positions = getattr(self.model.config, "max_position_embeddings", 2048)
+        logger.info(f"✅ Local LLM loaded in {time.time() - start:.1f}s")
+
+        self.prefix = prefix or ""
+        self._prefix_ids = None
+        self._prefix_cache = None
+        if self.prefix:
+            self._cache_prefix()
+
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prefix_hits = 0
+        self.prompt_tokens = 0
+        self.generated_tokens = 0
+        self.prefill_time = 0.0
+        self.decode_time = 0.0
+
+    @torch.no_grad()
+    def _cache_prefix(self):
+        start = time.time()
+        self._prefix_ids = self.tokenizer(self.prefix, return_tensors="pt").input_ids.to(self.device)
+        out = self.model(input_ids=self._prefix_ids, use_cache=True)
+        self._prefix_cache = out.past_key_values
+        logger.info(f"✅ Cached KV state for {self._prefix_ids.shape[1]}-token prompt prefix "
+                    f"in {time.time() - start:.2f}s")
+
+    def _prompt_ids(self, prompt: str, max_new_tokens: int):
+        """(input ids still to process, starting KV cache or None)"""
+        if self._prefix_cache is not None and prompt.startswith(self.prefix):
+            ids = self.tokenizer(prompt[len(self.prefix):], add_special_tokens=False, return_tensors="pt").input_ids
+            # The model extends the cache in place; work on a copy
+            past = copy.deepcopy(self._prefix_cache)
+            budget = self.max_positions - self._prefix_ids.shape[1] - max_new_tokens
+            hit = True
+        else:
+            ids = self.tokenizer(prompt, return_tensors="pt").input_ids
+            past = None
+            budget = self.max_positions - max_new_tokens
+            hit = False
+
+        if budget <= 0:
+            # Not retryable: the same request would overflow the context again
+            raise LLMError(
+                f"max_new_tokens={max_new_tokens} leaves no room for the prompt in the "
+                f"{self.max_positions}-token context of {self.name}"
+            )
+        if ids.shape[1] > budget:
+            # Keep the end of the prompt: the question and answer cue live there
+            ids = ids[:, -budget:]
+        return ids.to(self.device), past, hit
+
+    @staticmethod
+    def _sample(logits: torch.Tensor, temperature: float) -> torch.Tensor:
+        if temperature <= 0:
+            return logits.argmax(dim=-1, keepdim=True)
+        probs = torch.softmax(logits / temperature, dim=-1)
+        return torch.multinomial(probs, num_samples=1)
+
+    @torch.no_grad()
+    def _decode(
+        self,
+        prompt: str,
+        max_new_tokens: int,
+        temperature: float,
+        cancel: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        start = time.time()
+        ids, past, hit = self._prompt_ids(prompt, max_new_tokens)
+        try:
+            out = self.model(input_ids=ids, past_key_values=past, use_cache=True)
+        except RuntimeError as e:
+            raise BackendUnavailableError(f"Local generation failed: {e}")
+        prefill_time = time.time() - start
+
+        decode_start = time.time()
+        generated = []
+        text = ""
+        try:
+            for _ in range(max_new_tokens):
+                if cancel is not None and cancel.is_set():
+                    raise CallCancelledError("Local generation cancelled")
+                next_id = self._sample(out.logits[:, -1, :], temperature)
+                if next_id.item() == self.tokenizer.eos_token_id:
+                    break
+                generated.append(next_id.item())
+                # Decode the whole answer so multi-byte / leading-space tokens come out right
+                new_text = self.tokenizer.decode(generated, skip_special_tokens=True)
+                if len(new_text) > len(text):
+                    yield new_text[len(text):]
+                    text = new_text
+                out = self.model(input_ids=next_id, past_key_values=out.past_key_values, use_cache=True)
+        except RuntimeError as e:
+            raise BackendUnavailableError(f"Local generation failed: {e}")
+        finally:
+            decode_time = time.time() - decode_start
+            with self._lock:
+                self.requests += 1
+                self.prefix_hits += hit
+                self.prompt_tokens += ids.shape[1]
+                self.generated_tokens += len(generated)
+                self.prefill_time += prefill_time
+                self.decode_time += decode_time
+            logger.info(
+                f"Local LLM: {ids.shape[1]} prompt tokens in {prefill_time:.2f}s"
+                f"{' (prefix cached)' if hit else ''}, {len(generated)} tokens in {decode_time:.2f}s "
+                f"({len(generated) / decode_time if decode_time else 0:.1f} tok/s)"
+            )
+
+    def generate(self, prompt: str, max_new_tokens: int = 500, temperature: float = 0.3,
+                 cancel: threading.Event = None) -> str:
+        return "".join(self._decode(prompt, max_new_tokens, temperature, cancel))
+
+    def stream(self, prompt: str, max_new_tokens: int = 500, temperature: float = 0.3) -> Iterator[str]:
+        yield from self._decode(prompt, max_new_tokens, temperature)
+
+    async def agenerate(self, prompt: str, max_new_tokens: int = 500, temperature: float = 0.3) -> str:
+        """Runs on a worker thread; cancelling the task stops decoding at the next token"""
+        cancel = threading.Event()
+        try:
+            return await asyncio.to_thread(self.generate, prompt, max_new_tokens, temperature, cancel)
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    async def astream(self, prompt: str, max_new_tokens: int = 500, temperature: float = 0.3) -> AsyncIterator[str]:
+        cancel = threading.Event()
+        tokens = self._decode(prompt, max_new_tokens, temperature, cancel)
+        done = object()
+        try:
+            while True:
+                token = await asyncio.to_thread(next, tokens, done)
+                if token is done:
+                    return
+                yield token
+        finally:
+            cancel.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "prefix_tokens": self._prefix_ids.shape[1] if self._prefix_ids is not None else 0,
+                "requests": self.requests,
+                "prefix_cache_hits": self.prefix_hits,
+                "prompt_tokens": self.prompt_tokens,
+                "generated_tokens": self.generated_tokens,
+                "prefill_tokens_per_sec": self.prompt_tokens / self.prefill_time if self.prefill_time else None,
+                "decode_tokens_per_sec": self.generated_tokens / self.decode_time if self.decode_time else None
+            }
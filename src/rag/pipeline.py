@@ -1,19 +1,218 @@
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import aclosing
+from dataclasses import dataclass, field
+import asyncio
 import time
 import logging
 
+import numpy as np
+
 from src.retrieval.retriever import DocumentRetriever
-from src.rag.llm_client import LLMClient
+from src.rag.llm_client import LLMClient, Generation
+from src.rag.cache import SemanticAnswerCache
+from src.rag.compression import ExtractiveCompressor, CompressedContext
+from src.retrieval.sentence_index import SentenceHit, SentenceIndex
+from src.utils.metrics import time_stage, observe_stage, record_cache_lookup
+from src.utils import tracing
+from src.utils.profiling import profiler
 from src.config import config
 
 logger = logging.getLogger(__name__)
 
+NO_RESULTS_ANSWER = "I couldn't find any relevant information to answer your question."
+# Characters of chunk text returned per source
+EXCERPT_CHARS = 200
+
+@dataclass
+class PreparedQuery:
+    """Output of the blocking retrieval stage, ready for generation"""
+    question: str
+    query_embedding: np.ndarray
+    retrieved_docs: List[Tuple[Dict, float]]
+    retrieval_time: float
+    cached_answer: Optional[str] = None
+    context: Optional[str] = None
+    context_tokens: Optional[int] = None
+    compression: Optional[CompressedContext] = None
+    sentence_hits: Optional[List[SentenceHit]] = None  # ranked, when the index has a sentence table
+    timings: Dict[str, float] = field(default_factory=dict)  # per-stage, for batch runs
+    
+    def ranked_sentences(self, limit: int = 5) -> Optional[List[str]]:
+        if not self.sentence_hits:
+            return None
+        # Overlapping chunks and boilerplate repeat sentences verbatim
+        sentences = []
+        for hit in self.sentence_hits:
+            if hit.text not in sentences:
+                sentences.append(hit.text)
+                if len(sentences) == limit:
+                    break
+        return sentences
+
 class RAGPipeline:
     """End-to-end RAG pipeline"""
     
-    def __init__(self, retriever: DocumentRetriever = None, llm_client: LLMClient = None):
+    def __init__(
+        self,
+        retriever: DocumentRetriever = None,
+        llm_client: LLMClient = None,
+        answer_cache: SemanticAnswerCache = None,
+        compressor: ExtractiveCompressor = None
+    ):
         self.retriever = retriever or DocumentRetriever()
         self.llm_client = llm_client or LLMClient()
+        
+        if answer_cache is None and config.SEMANTIC_CACHE_ENABLED:
+            answer_cache = SemanticAnswerCache(self.retriever.embedder.get_embedding_dim())
+        self.answer_cache = answer_cache
+        
+        if compressor is None and config.CONTEXT_COMPRESSION:
+            compressor = ExtractiveCompressor(
+                self.retriever.embedder, token_counter=self.retriever.context_builder.token_counter
+            )
+        self.compressor = compressor
+    
+    @property
+    def index_version(self) -> Optional[str]:
+        return self.retriever.vector_store.version
+    
+    def _retrieve(self, question: str, top_k: int = None) -> Tuple[np.ndarray, List[Tuple[Dict, float]]]:
+        with time_stage("embedding"), profiler.stage("embedding"):
+            query_embedding = self.retriever.embedder.encode(question)
+        with time_stage("search"), profiler.stage("search"):
+            return query_embedding, self.retriever.retrieve_by_embedding(query_embedding, top_k=top_k)
+    
+    def _cached_answer(self, query_embedding: np.ndarray, retrieved_docs: List[Tuple[Dict, float]]) -> Optional[str]:
+        if self.answer_cache is None:
+            return None
+        answer = self.answer_cache.lookup(query_embedding, self._chunk_keys(retrieved_docs), self.index_version)
+        record_cache_lookup("answer", answer is not None)
+        return answer
+    
+    def _cache_answer(self, query_embedding: np.ndarray, retrieved_docs: List[Tuple[Dict, float]], generation: Generation):
+        # Fallback answers are a stop-gap for an unavailable LLM; don't pin them
+        if self.answer_cache is None or generation.fallback:
+            return
+        self.answer_cache.put(
+            query_embedding, self._chunk_keys(retrieved_docs), self.index_version, generation.text
+        )
+    
+    def prepare(self, question: str, top_k: int = None) -> PreparedQuery:
+        """
+        Blocking half of a query: embed, search, check the answer cache and,
+        on a miss, assemble the LLM context.  Async callers run this on a
+        worker thread and await generation on the event loop.
+        """
+        with tracing.span("rag.prepare", top_k=top_k) as span:
+            start_time = time.time()
+            query_embedding, retrieved_docs = self._retrieve(question, top_k=top_k)
+            prepared = PreparedQuery(question, query_embedding, retrieved_docs, time.time() - start_time)
+            self._complete(prepared, top_k)
+            self._annotate(span, prepared)
+        return prepared
+    
+    def prepare_batch(self, questions: List[str], top_k: int = None) -> List[PreparedQuery]:
+        """
+        prepare() for many questions: one encode call and one FAISS search
+        for the whole batch.  Embedding and search time are split evenly
+        across the items in `timings`.
+        """
+        if not questions:
+            return []
+        
+        with tracing.span("rag.prepare_batch", questions=len(questions), top_k=top_k):
+            return self._prepare_batch(questions, top_k)
+    
+    def _prepare_batch(self, questions: List[str], top_k: int = None) -> List[PreparedQuery]:
+        start_time = time.time()
+        with profiler.stage("embedding"):
+            embeddings = self.retriever.embedder.encode(questions, batch_size=64)
+        embedding_time = (time.time() - start_time) / len(questions)
+        
+        search_start = time.time()
+        with profiler.stage("search"):
+            batch_results = self.retriever.retrieve_batch_by_embedding(embeddings, top_k=top_k)
+        search_time = (time.time() - search_start) / len(questions)
+        logger.info(f"Retrieved documents for {len(questions)} questions in one search")
+        
+        prepared_batch = []
+        for question, query_embedding, retrieved_docs in zip(questions, embeddings, batch_results):
+            prepared = PreparedQuery(question, query_embedding.reshape(1, -1), retrieved_docs,
+                                     embedding_time + search_time)
+            context_start = time.time()
+            with tracing.span("rag.complete") as span:
+                self._complete(prepared, top_k)
+                self._annotate(span, prepared)
+            prepared.timings = {
+                'embedding_time': embedding_time,
+                'search_time': search_time,
+                'context_time': time.time() - context_start
+            }
+            observe_stage("embedding", embedding_time)
+            observe_stage("search", search_time)
+            prepared_batch.append(prepared)
+        return prepared_batch
+    
+    def _complete(self, prepared: PreparedQuery, top_k: int = None):
+        """Sentence ranking, answer-cache lookup and (on a miss) context for a retrieved query"""
+        if not prepared.retrieved_docs:
+            return
+        sentence_index = self.retriever.vector_store.sentence_index
+        if sentence_index is not None:
+            with time_stage("sentence_rank"), profiler.stage("sentence_rank"), tracing.span("rag.sentence_rank"):
+                prepared.sentence_hits = sentence_index.rank(prepared.query_embedding, prepared.retrieved_docs)
+        prepared.cached_answer = self._cached_answer(prepared.query_embedding, prepared.retrieved_docs)
+        if prepared.cached_answer is None:
+            with time_stage("context"), profiler.stage("context"), \
+                    tracing.span("rag.context", compression=self.compressor is not None):
+                self._build_context(prepared, top_k)
+    
+    @staticmethod
+    def _annotate(span, prepared: PreparedQuery):
+        span.set_attributes(
+            retrieved=len(prepared.retrieved_docs),
+            cache_hit=prepared.cached_answer is not None,
+            context_tokens=prepared.context_tokens or 0
+        )
+    
+    def _build_context(self, prepared: PreparedQuery, top_k: int = None):
+        if self.compressor is not None:
+            prepared.compression = self.compressor.compress(
+                prepared.query_embedding, prepared.retrieved_docs, hits=prepared.sentence_hits
+            )
+            prepared.context = prepared.compression.text
+            prepared.context_tokens = prepared.compression.tokens
+        else:
+            prepared.context = self.retriever.get_context(
+                prepared.question, top_k=top_k, results=prepared.retrieved_docs
+            )
+            prepared.context_tokens = self.retriever.context_builder.token_counter.count(prepared.context)
+    
+    def answer(self, prepared: PreparedQuery) -> Generation:
+        """Generation half of a query: cached answer, or the LLM (result is cached)"""
+        if not prepared.retrieved_docs:
+            return Generation(NO_RESULTS_ANSWER)
+        if prepared.cached_answer is not None:
+            return Generation(prepared.cached_answer)
+        with time_stage("generation"), profiler.stage("generation"):
+            generation = self.llm_client.generate(
+                prepared.question, prepared.context, ranked_sentences=prepared.ranked_sentences()
+            )
+        self._cache_answer(prepared.query_embedding, prepared.retrieved_docs, generation)
+        return generation
+    
+    async def aanswer(self, prepared: PreparedQuery) -> Generation:
+        """asyncio version of answer; cancelling the caller cancels the LLM request"""
+        if not prepared.retrieved_docs:
+            return Generation(NO_RESULTS_ANSWER)
+        if prepared.cached_answer is not None:
+            return Generation(prepared.cached_answer)
+        with time_stage("generation"):
+            generation = await self.llm_client.agenerate(
+                prepared.question, prepared.context, ranked_sentences=prepared.ranked_sentences()
+            )
+        self._cache_answer(prepared.query_embedding, prepared.retrieved_docs, generation)
+        return generation
     
     def query(
         self,
@@ -25,48 +224,288 @@ class RAGPipeline:
         start_time = time.time()
         
         logger.info(f"Query: {question}")
-        retrieved_docs = self.retriever.retrieve(question, top_k=top_k)
-        
-        if not retrieved_docs:
-            return {
-                'answer': "I couldn't find any relevant information to answer your question.",
-                'sources': [],
-                'metadata': {'num_sources': 0, 'retrieval_time': time.time() - start_time}
-            }
-        
-        retrieval_time = time.time() - start_time
+        with tracing.span("rag.query", top_k=top_k):
+            prepared = self.prepare(question, top_k=top_k)
+            if not prepared.retrieved_docs:
+                return self._no_results_response(prepared)
+            
+            gen_start = time.time()
+            generation = self.answer(prepared)
+            generation_time = time.time() - gen_start
         
-        context = self.retriever.get_context(question, top_k=top_k)
+        return self.build_response(
+            prepared, generation, generation_time, time.time() - start_time, return_sources, return_metadata
+        )
+    
+    async def aquery(
+        self,
+        question: str,
+        top_k: int = None,
+        return_sources: bool = True,
+        return_metadata: bool = False,
+        run_blocking: Callable[..., Awaitable] = None
+    ) -> Dict:
+        """
+        asyncio version of query.  Retrieval runs through `run_blocking`
+        (default: asyncio.to_thread); generation is awaited natively, so
+        cancelling the caller also cancels the LLM request.
+        """
+        run_blocking = run_blocking or asyncio.to_thread
+        start_time = time.time()
         
-        gen_start = time.time()
-        answer = self.llm_client.generate_answer(question, context)
-        generation_time = time.time() - gen_start
+        logger.info(f"Query: {question}")
+        with tracing.span("rag.query", top_k=top_k):
+            prepared = await run_blocking(self.prepare, question, top_k)
+            if not prepared.retrieved_docs:
+                return self._no_results_response(prepared)
+            
+            gen_start = time.time()
+            generation = await self.aanswer(prepared)
+            generation_time = time.time() - gen_start
         
-        total_time = time.time() - start_time
+        return self.build_response(
+            prepared, generation, generation_time, time.time() - start_time, return_sources, return_metadata
+        )
+    
+    def _no_results_response(self, prepared: PreparedQuery) -> Dict:
+        return {
+            'answer': NO_RESULTS_ANSWER,
+            'question': prepared.question,
+            'sources': [],
+            'metadata': {'num_sources': 0, 'retrieval_time': prepared.retrieval_time}
+        }
+    
+    def build_response(
+        self,
+        prepared: PreparedQuery,
+        generation: Generation,
+        generation_time: float,
+        total_time: float,
+        return_sources: bool = True,
+        return_metadata: bool = False
+    ) -> Dict:
+        """The /query response dict for a prepared query and its answer"""
+        if not prepared.retrieved_docs:
+            return self._no_results_response(prepared)
         
+        retrieved_docs = prepared.retrieved_docs
         response = {
-            'answer': answer,
-            'question': question
+            'answer': generation.text,
+            'question': prepared.question
         }
         
         if return_sources:
-            response['sources'] = [
-                {
-                    'text': doc['text'][:200] + '...',
-                    'source_file': doc['source_file'],
-                    'chunk_id': doc['chunk_id'],
-                    'similarity_score': float(score)
-                }
-                for doc, score in retrieved_docs
-            ]
+            response['sources'] = self._format_sources(retrieved_docs, prepared.sentence_hits)
         
         if return_metadata:
             response['metadata'] = {
                 'num_sources': len(retrieved_docs),
-                'retrieval_time': retrieval_time,
+                'retrieval_time': prepared.retrieval_time,
                 'generation_time': generation_time,
                 'total_time': total_time,
-                'avg_similarity': sum(s for _, s in retrieved_docs) / len(retrieved_docs)
+                'avg_similarity': sum(s for _, s in retrieved_docs) / len(retrieved_docs),
+                'cache_hit': prepared.cached_answer is not None,
+                'llm_fallback': generation.fallback,
+                **self._context_metadata(prepared),
+                **prepared.timings
             }
         
-        return response
\ No newline at end of file
+        return response
+    
+    def stream_query(
+        self,
+        question: str,
+        top_k: int = None,
+        return_sources: bool = True
+    ) -> Iterator[Dict]:
+        """
+        Run the pipeline and yield events as they become available:
+        `sources` right after retrieval, one `token` per generated piece,
+        then a final `metadata` event.
+        """
+        start_time = time.time()
+        
+        logger.info(f"Streaming query: {question}")
+        with tracing.span("rag.stream_query", top_k=top_k) as span:
+            prepared = self.prepare(question, top_k=top_k)
+            yield self._sources_event(prepared, return_sources)
+        
+            generation = Generation()
+            gen_start = time.time()
+            time_to_first_token = None
+            num_tokens = 0
+            for token in self._answer_tokens(prepared, self.llm_client.stream_answer, generation):
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start_time
+                num_tokens += 1
+                yield {'event': 'token', 'data': {'text': token}}
+        
+            self._cache_streamed(prepared, generation, gen_start)
+            span.set_attributes(tokens=num_tokens, time_to_first_token=time_to_first_token or 0.0)
+            yield self._metadata_event(prepared, num_tokens, gen_start, time_to_first_token, start_time)
+    
+    async def astream_query(
+        self,
+        question: str,
+        top_k: int = None,
+        return_sources: bool = True,
+        run_blocking: Callable[..., Awaitable] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        asyncio version of stream_query.  Closing the iterator (e.g. when
+        the HTTP client disconnects) aborts the upstream LLM stream.
+        """
+        run_blocking = run_blocking or asyncio.to_thread
+        start_time = time.time()
+        
+        logger.info(f"Streaming query: {question}")
+        with tracing.span("rag.stream_query", top_k=top_k) as span:
+            prepared = await run_blocking(self.prepare, question, top_k)
+            yield self._sources_event(prepared, return_sources)
+        
+            generation = Generation()
+            gen_start = time.time()
+            time_to_first_token = None
+            num_tokens = 0
+            if prepared.context is not None:
+                tokens = self.llm_client.astream_answer(
+                    question, prepared.context, result=generation, ranked_sentences=prepared.ranked_sentences()
+                )
+            else:
+                tokens = self._aiter(self._answer_tokens(prepared, None, generation))
+            async with aclosing(tokens):
+                async for token in tokens:
+                    if time_to_first_token is None:
+                        time_to_first_token = time.time() - start_time
+                    num_tokens += 1
+                    yield {'event': 'token', 'data': {'text': token}}
+        
+            self._cache_streamed(prepared, generation, gen_start)
+            span.set_attributes(tokens=num_tokens, time_to_first_token=time_to_first_token or 0.0)
+            yield self._metadata_event(prepared, num_tokens, gen_start, time_to_first_token, start_time)
+    
+    def _sources_event(self, prepared: PreparedQuery, return_sources: bool) -> Dict:
+        return {
+            'event': 'sources',
+            'data': {
+                'question': prepared.question,
+                'sources': self._format_sources(prepared.retrieved_docs, prepared.sentence_hits) if return_sources else []
+            }
+        }
+    
+    def _answer_tokens(self, prepared: PreparedQuery, stream_answer: Callable, generation: Generation) -> Iterator[str]:
+        """Tokens for answers that don't need the LLM, else `stream_answer` over the context"""
+        if not prepared.retrieved_docs:
+            return iter([NO_RESULTS_ANSWER])
+        if prepared.cached_answer is not None:
+            return self.llm_client.stream_text(prepared.cached_answer)
+        return stream_answer(
+            prepared.question, prepared.context, result=generation, ranked_sentences=prepared.ranked_sentences()
+        )
+    
+    def _cache_streamed(self, prepared: PreparedQuery, generation: Generation, gen_start: float):
+        if prepared.context is not None:
+            observe_stage("generation", time.time() - gen_start)
+            self._cache_answer(prepared.query_embedding, prepared.retrieved_docs, generation)
+    
+    def _metadata_event(
+        self,
+        prepared: PreparedQuery,
+        num_tokens: int,
+        gen_start: float,
+        time_to_first_token: Optional[float],
+        start_time: float
+    ) -> Dict:
+        retrieved_docs = prepared.retrieved_docs
+        return {
+            'event': 'metadata',
+            'data': {
+                'num_sources': len(retrieved_docs),
+                'num_tokens': num_tokens,
+                'retrieval_time': prepared.retrieval_time,
+                'generation_time': time.time() - gen_start if retrieved_docs else 0.0,
+                'time_to_first_token': time_to_first_token,
+                'total_time': time.time() - start_time,
+                'avg_similarity': (
+                    sum(s for _, s in retrieved_docs) / len(retrieved_docs) if retrieved_docs else 0.0
+                ),
+                'cache_hit': prepared.cached_answer is not None,
+                **self._context_metadata(prepared)
+            }
+        }
+    
+    @staticmethod
+    def _context_metadata(prepared: PreparedQuery) -> Dict:
+        """Prompt-size figures, to measure what compression saves"""
+        if prepared.context_tokens is None:
+            return {}
+        metadata = {'context_tokens': prepared.context_tokens}
+        if prepared.compression is not None:
+            metadata['context_tokens_uncompressed'] = prepared.compression.original_tokens
+            metadata['compression_time'] = prepared.compression.compression_time
+        return metadata
+    
+    @staticmethod
+    async def _aiter(items: Iterator[str]) -> AsyncIterator[str]:
+        for item in items:
+            yield item
+    
+    @staticmethod
+    def _chunk_keys(retrieved_docs: List[Tuple[Dict, float]]):
+        return frozenset((doc['source_file'], doc['chunk_id']) for doc, _ in retrieved_docs)
+    
+    @staticmethod
+    def _excerpt(text: str, start: int = None, end: int = None) -> Tuple[str, int]:
+        """
+        EXCERPT_CHARS of `text`, centred on [start, end) when given, with "..."
+        marking cut ends.  Returns (excerpt, shift): chunk offset minus `shift`
+        is the offset in the excerpt.
+        """
+        if len(text) <= EXCERPT_CHARS:
+            return text, 0
+        window_start = 0
+        if start is not None:
+            centre = (start + end) // 2
+            window_start = max(0, min(centre - EXCERPT_CHARS // 2, len(text) - EXCERPT_CHARS))
+            # A sentence longer than the window keeps its beginning
+            window_start = min(window_start, start)
+        window_end = window_start + EXCERPT_CHARS
+        prefix = '...' if window_start > 0 else ''
+        suffix = '...' if window_end < len(text) else ''
+        return prefix + text[window_start:window_end] + suffix, window_start - len(prefix)
+
+    @staticmethod
+    def _format_sources(
+        retrieved_docs: List[Tuple[Dict, float]],
+        sentence_hits: List[SentenceHit] = None
+    ) -> List[Dict]:
+        """
+        Source excerpts, each with its best-matching sentence when a sentence
+        table is loaded; the excerpt is centred on that sentence and the
+        highlight offsets index into the excerpt
+        """
+        best = SentenceIndex.best_per_result(sentence_hits) if sentence_hits else {}
+        sources = []
+        for i, (doc, score) in enumerate(retrieved_docs):
+            hit = best.get(i)
+            if hit is None:
+                excerpt, _ = RAGPipeline._excerpt(doc['text'])
+            else:
+                excerpt, shift = RAGPipeline._excerpt(doc['text'], hit.start, hit.end)
+            source = {
+                'text': excerpt,
+                'source_file': doc['source_file'],
+                'chunk_id': doc['chunk_id'],
+                'similarity_score': float(score)
+            }
+            if hit is not None:
+                start = hit.start - shift
+                source['highlight'] = {
+                    'text': hit.text,
+                    'start': start,
+                    # Clipped when the sentence runs past the excerpt
+                    'end': min(hit.end - shift, start + EXCERPT_CHARS),
+                    'score': hit.score
+                }
+            sources.append(source)
+        return sources
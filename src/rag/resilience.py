@@ -0,0 +1,487 @@
+"""
+Resilience primitives for calls to remote LLM backends.
+
+    ResilientBackend
+        ├── CircuitBreaker   stop calling a backend that keeps failing
+        ├── TokenBucket      client-side rate limit (requests / second)
+        ├── Semaphore        cap on parallel in-flight calls
+        └── RetryPolicy      jittered exponential backoff on retryable errors
+
+Backends raise the LLMError subclasses below; only the ones marked
+retryable are retried and count toward opening the circuit, everything
+else surfaces immediately.
+"""
+
+import asyncio
+import random
+import threading
+import time
+import logging
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """Base class for LLM backend failures"""
+    retryable = False
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitedError(LLMError):
+    """Backend answered 429"""
+    retryable = True
+
+
+class ModelLoadingError(LLMError):
+    """Backend is still loading the model (HF answers 503 with estimated_time)"""
+    retryable = True
+
+
+class BackendTimeoutError(LLMError):
+    """Request timed out or the connection dropped"""
+    retryable = True
+
+
+class BackendUnavailableError(LLMError):
+    """Backend answered with a 5xx"""
+    retryable = True
+
+
+class CircuitOpenError(LLMError):
+    """Circuit breaker is open; the backend is not being called"""
+
+
+class CallCancelledError(LLMError):
+    """The caller no longer needs the result (e.g. a hedged request lost)"""
+
+
+class CancelEvent(threading.Event):
+    """threading.Event that also runs callbacks when set, so blocked I/O can be cut short"""
+
+    def __init__(self):
+        super().__init__()
+        self._callbacks: List[Callable[[], None]] = []
+        self._callbacks_lock = threading.Lock()
+
+    def on_set(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run `callback` once the event is set (now, if it already is); returns an unregister function"""
+        with self._callbacks_lock:
+            if not self.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback: Callable[[], None]):
+        with self._callbacks_lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def set(self):
+        with self._callbacks_lock:
+            super().set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"⚠️  Cancel callback failed: {e}")
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursting up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """Take a token if available; otherwise return seconds until one is"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.  After `failure_threshold` consecutive
+    failures the circuit opens and calls fail fast for `reset_timeout`
+    seconds; then a single probe call is let through (half-open) and its
+    outcome closes or re-opens the circuit.  A probe that ends without an
+    outcome (cancelled, rate limited client-side) is released so the next
+    call can probe instead.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+        self.failure_threshold = failure_threshold or config.LLM_CIRCUIT_FAILURES
+        self.reset_timeout = reset_timeout or config.LLM_CIRCUIT_RESET
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_id = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Tuple[bool, Optional[int]]:
+        """(call allowed, probe id if this call is the half-open probe)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True, None
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._probe_id += 1
+                return True, self._probe_id
+            return False, None
+
+    def allow(self) -> bool:
+        return self.acquire()[0]
+
+    def release_probe(self, probe: Optional[int]):
+        """The probe ended with no result: stay half-open and let the next call probe"""
+        if probe is None:
+            return
+        with self._lock:
+            # No-op once the probe recorded an outcome or a newer probe took over
+            if self.state == self.HALF_OPEN and self._probe_in_flight and probe == self._probe_id:
+                self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("✅ Circuit closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"⚠️  Circuit opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honouring server Retry-After hints"""
+
+    def __init__(self, max_attempts: int = None, base_delay: float = None, max_delay: float = None):
+        self.max_attempts = max_attempts or config.LLM_MAX_RETRIES
+        self.base_delay = base_delay or config.LLM_BACKOFF_BASE
+        self.max_delay = max_delay or config.LLM_BACKOFF_MAX
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)"""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        if retry_after is not None:
+            backoff = max(backoff, min(retry_after, self.max_delay))
+        return backoff
+
+
+class ResilientBackend:
+    """Wraps a backend's `generate` / `stream` calls with the policies above"""
+
+    def __init__(
+        self,
+        backend,
+        max_concurrency: int = None,
+        rate_limiter: TokenBucket = None,
+        circuit_breaker: CircuitBreaker = None,
+        retry_policy: RetryPolicy = None
+    ):
+        self.backend = backend
+        self.name = getattr(backend, "name", backend.__class__.__name__)
+        self.max_concurrency = max_concurrency or config.LLM_MAX_CONCURRENCY
+        self.rate_limiter = rate_limiter or TokenBucket(config.LLM_RATE_LIMIT, config.LLM_RATE_BURST)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.retry_policy = retry_policy or RetryPolicy()
+
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _before_attempt(self, cancel: threading.Event = None) -> Optional[int]:
+        """Rate-limit, then claim the circuit; returns the probe id if this attempt is the half-open probe"""
+        if cancel is not None and cancel.is_set():
+            raise CallCancelledError(f"Call to {self.name} cancelled")
+        if not self.available():
+            raise CircuitOpenError(f"Circuit open for backend {self.name}")
+        # Token first: a probe must not be claimed by a call that then waits out the rate limit
+        if not self.rate_limiter.acquire(timeout=self.retry_policy.max_delay):
+            raise RateLimitedError(f"Client-side rate limit for backend {self.name}")
+        allowed, probe = self.circuit_breaker.acquire()
+        if not allowed:
+            raise CircuitOpenError(f"Circuit open for backend {self.name}")
+        return probe
+
+    def _retry_or_raise(self, error: LLMError, attempt: int, cancel: threading.Event = None):
+        # Client-side errors (bad parameters, prompt too long) say nothing about backend health
+        if error.retryable:
+            self.circuit_breaker.record_failure()
+        if not error.retryable or attempt >= self.retry_policy.max_attempts:
+            self.failures += 1
+            raise error
+        delay = self.retry_policy.delay(attempt, error.retry_after)
+        self.retries += 1
+        logger.warning(f"⚠️  {self.name}: {error} — retry {attempt} in {delay:.1f}s")
+        if cancel is not None:
+            if cancel.wait(delay):
+                raise CallCancelledError(f"Call to {self.name} cancelled during backoff")
+        else:
+            time.sleep(delay)
+
+    def generate(self, prompt: str, cancel: threading.Event = None, **params) -> str:
+        """Generate with retries; setting `cancel` stops further attempts"""
+        self.calls += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = self._before_attempt(cancel)
+            try:
+                with self._semaphore:
+                    if cancel is not None and cancel.is_set():
+                        raise CallCancelledError(f"Call to {self.name} cancelled")
+                    text = self.backend.generate(prompt, cancel=cancel, **params)
+                self.circuit_breaker.record_success()
+                return text
+            except CallCancelledError:
+                raise
+            except LLMError as e:
+                self._retry_or_raise(e, attempt, cancel)
+            finally:
+                # Cancelled or otherwise outcome-less probes must not wedge the breaker half-open
+                self.circuit_breaker.release_probe(probe)
+
+    def stream(self, prompt: str, **params) -> Iterator[str]:
+        """Stream tokens; retries only happen before the first token is out"""
+        self.calls += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = self._before_attempt()
+            emitted = False
+            try:
+                with self._semaphore:
+                    for token in self.backend.stream(prompt, **params):
+                        emitted = True
+                        yield token
+                self.circuit_breaker.record_success()
+                return
+            except CallCancelledError:
+                raise
+            except LLMError as e:
+                if emitted:
+                    self.circuit_breaker.record_failure()
+                    self.failures += 1
+                    raise
+                self._retry_or_raise(e, attempt)
+            finally:
+                # Also runs when the consumer closes the stream early (GeneratorExit)
+                self.circuit_breaker.release_probe(probe)
+
+    def available(self) -> bool:
+        """False while the circuit is open (cheap pre-check for backend selection)"""
+        return self.circuit_breaker.state != CircuitBreaker.OPEN or \
+            time.monotonic() - self.circuit_breaker.opened_at >= self.circuit_breaker.reset_timeout
+
+    def stats(self) -> Dict:
+        stats = {
+            "backend": self.name,
+            "circuit_state": self.circuit_breaker.state,
+            "max_concurrency": self.max_concurrency,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures
+        }
+        # Backends that measure their own throughput (e.g. the local LLM)
+        if hasattr(self.backend, "stats"):
+            stats["engine"] = self.backend.stats()
+        return stats
+
+
+class AsyncResilientBackend:
+    """
+    asyncio counterpart of ResilientBackend for backends exposing
+    `agenerate` / `astream`.  Built from a sync ResilientBackend, it shares
+    that backend's circuit breaker, rate limiter and retry policy so both
+    paths see the same health state.  Cancelling the awaiting task cancels
+    the upstream HTTP request.
+    """
+
+    def __init__(self, backend, sync_backend: ResilientBackend):
+        self.backend = backend
+        self.name = sync_backend.name
+        self.max_concurrency = sync_backend.max_concurrency
+        self.rate_limiter = sync_backend.rate_limiter
+        self.circuit_breaker = sync_backend.circuit_breaker
+        self.retry_policy = sync_backend.retry_policy
+        self.sync_backend = sync_backend
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _before_attempt(self) -> Optional[int]:
+        """Rate-limit, then claim the circuit; returns the probe id if this attempt is the half-open probe"""
+        if not self.available():
+            raise CircuitOpenError(f"Circuit open for backend {self.name}")
+        deadline = time.monotonic() + self.retry_policy.max_delay
+        while True:
+            wait = self.rate_limiter.try_acquire()
+            if wait == 0.0:
+                break
+            if time.monotonic() + wait > deadline:
+                raise RateLimitedError(f"Client-side rate limit for backend {self.name}")
+            await asyncio.sleep(wait)
+        allowed, probe = self.circuit_breaker.acquire()
+        if not allowed:
+            raise CircuitOpenError(f"Circuit open for backend {self.name}")
+        return probe
+
+    async def _retry_or_raise(self, error: LLMError, attempt: int):
+        # Client-side errors (bad parameters, prompt too long) say nothing about backend health
+        if error.retryable:
+            self.circuit_breaker.record_failure()
+        if not error.retryable or attempt >= self.retry_policy.max_attempts:
+            self.sync_backend.failures += 1
+            raise error
+        delay = self.retry_policy.delay(attempt, error.retry_after)
+        self.sync_backend.retries += 1
+        logger.warning(f"⚠️  {self.name}: {error} — retry {attempt} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    async def generate(self, prompt: str, **params) -> str:
+        self.sync_backend.calls += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = await self._before_attempt()
+            try:
+                async with self._semaphore:
+                    text = await self.backend.agenerate(prompt, **params)
+                self.circuit_breaker.record_success()
+                return text
+            except CallCancelledError:
+                raise
+            except LLMError as e:
+                await self._retry_or_raise(e, attempt)
+            finally:
+                # Client disconnects and lost hedges cancel the task (asyncio.CancelledError)
+                self.circuit_breaker.release_probe(probe)
+
+    async def stream(self, prompt: str, **params) -> AsyncIterator[str]:
+        """Stream tokens; retries only happen before the first token is out"""
+        self.sync_backend.calls += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            probe = await self._before_attempt()
+            emitted = False
+            try:
+                async with self._semaphore, aclosing(self.backend.astream(prompt, **params)) as tokens:
+                    async for token in tokens:
+                        emitted = True
+                        yield token
+                self.circuit_breaker.record_success()
+                return
+            except CallCancelledError:
+                raise
+            except LLMError as e:
+                if emitted:
+                    self.circuit_breaker.record_failure()
+                    self.sync_backend.failures += 1
+                    raise
+                await self._retry_or_raise(e, attempt)
+            finally:
+                self.circuit_breaker.release_probe(probe)
+
+    def available(self) -> bool:
+        return self.sync_backend.available()
+
+
+class LatencyHistogram:
+    """
+    Thread-safe latency histogram over geometric buckets (5ms .. ~5min).
+
+    Counts are halved every `decay_every` observations so quantiles track
+    recent behaviour rather than the whole process lifetime.
+    """
+
+    def __init__(self, min_value: float = 0.005, growth: float = 1.2, num_buckets: int = 60, decay_every: int = 500):
+        self.bounds = [min_value * growth ** i for i in range(num_buckets)]
+        self.counts = [0.0] * (num_buckets + 1)  # last bucket catches everything above
+        self.decay_every = decay_every
+        self.count = 0
+        self._since_decay = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            idx = len(self.bounds)
+            for i, bound in enumerate(self.bounds):
+                if seconds <= bound:
+                    idx = i
+                    break
+            self.counts[idx] += 1
+            self.count += 1
+            self._since_decay += 1
+            if self._since_decay >= self.decay_every:
+                self.counts = [c / 2 for c in self.counts]
+                self._since_decay = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket containing the q-th quantile (None if empty)"""
+        with self._lock:
+            total = sum(self.counts)
+            if total == 0:
+                return None
+            target = q * total
+            cumulative = 0.0
+            for i, c in enumerate(self.counts):
+                cumulative += c
+                if cumulative >= target:
+                    return self.bounds[min(i, len(self.bounds) - 1)]
+            return self.bounds[-1]
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
@@ -0,0 +1,135 @@
+"""
+Search-parameter autotuning for approximate FAISS indexes.
+
+Sweeps the index's recall / speed knob (``nprobe`` for IVF, ``efSearch``
+for HNSW) over a set of query vectors.  Ground truth is an exact
+inner-product search over the same stored vectors.  Each trial records
+recall@k and single-query latency.  `pareto_frontier` keeps the settings
+that no other setting beats on both; `choose` picks the cheapest one that
+reaches the target recall.
+"""
+
+from dataclasses import dataclass, asdict
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+import time
+import logging
+
+import numpy as np
+
+from src.retrieval.vector_store import FAISSVectorStore, index_type_of
+
+if TYPE_CHECKING:
+    import faiss
+else:
+    from src.utils.lazy import faiss
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRIDS = {
+    "ivf": [1, 2, 4, 8, 12, 16, 24, 32, 48, 64, 96, 128, 256, 512],
+    "hnsw": [8, 16, 24, 32, 48, 64, 96, 128, 192, 256, 384, 512]
+}
+PARAM_NAMES = {"ivf": "nprobe", "hnsw": "ef_search"}
+
+
+@dataclass
+class Trial:
+    value: int
+    recall: float
+    p50_ms: float
+    p95_ms: float
+    mean_ms: float
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def stored_vectors(index: "faiss.Index") -> np.ndarray:
+    """All vectors held by a flat-storage index (IVF needs a direct map to reconstruct)"""
+    if index_type_of(index) == "ivf":
+        faiss.extract_index_ivf(index).make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def exact_neighbors(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    exact = faiss.IndexFlatIP(vectors.shape[1])
+    exact.add(vectors)
+    _, ids = exact.search(queries, k)
+    return ids
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = (found[:, :, None] == truth[:, None, :]).any(axis=2) & (found >= 0)
+    return float(hits.sum() / truth.size)
+
+
+class SearchParamTuner:
+    """Measures recall and latency of one FAISSVectorStore across search-parameter values"""
+
+    def __init__(self, store: FAISSVectorStore, queries: np.ndarray, top_k: int = 5, repeats: int = 3):
+        if store.index_type not in PARAM_NAMES:
+            raise ValueError(f"Nothing to tune for a '{store.index_type}' index")
+        self.store = store
+        self.queries = np.ascontiguousarray(queries, dtype=np.float32)
+        self.top_k = top_k
+        self.repeats = repeats
+        self.param = PARAM_NAMES[store.index_type]
+        self.truth = exact_neighbors(stored_vectors(store.index), self.queries, top_k)
+
+    def grid(self) -> List[int]:
+        values = DEFAULT_GRIDS[self.store.index_type]
+        if self.store.index_type == "ivf":
+            nlist = faiss.extract_index_ivf(self.store.index).nlist
+            values = sorted({min(v, nlist) for v in values})
+        else:
+            values = [v for v in values if v >= self.top_k]
+        return values
+
+    def _apply(self, value: int):
+        self.store.set_search_params(**{self.param: value})
+
+    def trial(self, value: int) -> Trial:
+        self._apply(value)
+        _, found = self.store.search_ids(self.queries, self.top_k)
+
+        for q in self.queries[:10]:  # warm-up
+            self.store.search_ids(q, self.top_k)
+        latencies = []
+        for _ in range(self.repeats):
+            for q in self.queries:
+                start = time.perf_counter()
+                self.store.search_ids(q, self.top_k)
+                latencies.append(time.perf_counter() - start)
+        ms = np.asarray(latencies) * 1000
+        return Trial(value, recall_at_k(found, self.truth), float(np.percentile(ms, 50)),
+                     float(np.percentile(ms, 95)), float(ms.mean()))
+
+    def sweep(self, values: Sequence[int] = None) -> List[Trial]:
+        original = getattr(self.store, self.param)
+        trials = []
+        try:
+            for value in values or self.grid():
+                trial = self.trial(value)
+                logger.info(f"  {self.param}={value:<4} recall@{self.top_k} {trial.recall:.4f}  "
+                            f"p50 {trial.p50_ms:.3f}ms  p95 {trial.p95_ms:.3f}ms")
+                trials.append(trial)
+        finally:
+            self._apply(original)
+        return trials
+
+
+def pareto_frontier(trials: List[Trial]) -> List[Trial]:
+    """Trials not beaten on both recall and p95 latency, cheapest first"""
+    frontier = []
+    for trial in sorted(trials, key=lambda t: (t.p95_ms, -t.recall)):
+        if not frontier or trial.recall > frontier[-1].recall:
+            frontier.append(trial)
+    return frontier
+
+
+def choose(frontier: List[Trial], target_recall: float, slo_ms: float = None) -> Optional[Trial]:
+    """Cheapest frontier setting that reaches the target recall (and the p95 SLO, if given)"""
+    for trial in frontier:
+        if trial.recall >= target_recall:
+            return trial if slo_ms is None or trial.p95_ms <= slo_ms else None
+    return None
@@ -0,0 +1,181 @@
+"""
+Token-budgeted context assembly.
+
+Retrieved chunks are grouped into spans: consecutive chunk_ids from one
+source file become a single passage with the splitter's overlap removed.
+The spans that fit the token budget are then chosen to maximise total
+retrieval score (0/1 knapsack), instead of taking chunks in rank order and
+cutting the last one off mid-sentence.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+import logging
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = "\n\n"
+# Shorter suffix/prefix matches are more likely coincidence than splitter overlap
+MIN_OVERLAP = 8
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken, or estimates ~4 chars/token if it isn't usable"""
+
+    def __init__(self, encoding_name: str = None):
+        self.encoding_name = encoding_name or config.CONTEXT_TOKENIZER
+        self._encoding = None
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+        except Exception as e:
+            # tiktoken downloads its BPE files on first use; offline hosts fall back
+            logger.warning(f"⚠️  tiktoken encoding '{self.encoding_name}' unavailable ({e}); estimating tokens")
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return max(1, (len(text) + 3) // 4)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut `text` to at most `max_tokens`, at a token (or word) boundary"""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return self._encoding.decode(tokens[:max_tokens])
+        cut = text[:max_tokens * 4]
+        return cut.rsplit(" ", 1)[0] if " " in cut else cut
+
+
+@dataclass
+class Span:
+    """Consecutive chunks of one source file, merged"""
+    source_file: str
+    chunk_ids: List[int]
+    parts: List[str]  # per-chunk text, overlap already removed
+    scores: List[float]
+    rank: int  # best retrieval rank among the span's chunks
+    tokens: int = 0
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.parts)
+
+    @property
+    def score(self) -> float:
+        return sum(self.scores)
+
+
+def strip_overlap(previous: str, following: str, max_overlap: int) -> str:
+    """Drop the prefix of `following` that repeats the end of `previous`"""
+    for k in range(min(len(previous), len(following), max_overlap), MIN_OVERLAP - 1, -1):
+        if previous.endswith(following[:k]):
+            return following[k:].lstrip()
+    return following
+
+
+class ContextBuilder:
+    """Pack retrieved chunks into a prompt context under a token budget"""
+
+    def __init__(self, token_counter: TokenCounter = None, max_tokens: int = None, max_overlap: int = None):
+        self.token_counter = token_counter or TokenCounter()
+        self.max_tokens = max_tokens or config.MAX_CONTEXT_TOKENS
+        # The splitter backs off to a word boundary, so the repeat can be a bit longer than CHUNK_OVERLAP
+        self.max_overlap = max_overlap or config.CHUNK_OVERLAP * 2
+        self._separator_tokens = self.token_counter.count(SEPARATOR)
+
+    def merge_spans(self, results: List[Tuple[Dict, float]]) -> List[Span]:
+        """Group results into spans of consecutive chunk_ids per source file"""
+        by_file: Dict[str, List[Tuple[int, Dict, float]]] = {}
+        for rank, (doc, score) in enumerate(results):
+            by_file.setdefault(doc['source_file'], []).append((rank, doc, score))
+
+        spans = []
+        for source_file, entries in by_file.items():
+            entries.sort(key=lambda e: e[1]['chunk_id'])
+            current = None
+            for rank, doc, score in entries:
+                chunk_id = doc['chunk_id']
+                if current is not None and chunk_id == current.chunk_ids[-1]:
+                    continue  # duplicate hit
+                if current is not None and chunk_id == current.chunk_ids[-1] + 1:
+                    current.parts.append(strip_overlap(current.parts[-1], doc['text'], self.max_overlap))
+                    current.chunk_ids.append(chunk_id)
+                    current.scores.append(score)
+                    current.rank = min(current.rank, rank)
+                    continue
+                current = Span(source_file, [chunk_id], [doc['text']], [score], rank)
+                spans.append(current)
+
+        for span in spans:
+            span.tokens = self.token_counter.count(span.text)
+        return spans
+
+    def _split(self, span: Span) -> List[Span]:
+        """Break an over-budget span back into single chunks (overlap stays trimmed)"""
+        pieces = [
+            Span(span.source_file, [chunk_id], [part], [score], span.rank)
+            for chunk_id, part, score in zip(span.chunk_ids, span.parts, span.scores)
+        ]
+        for piece in pieces:
+            piece.tokens = self.token_counter.count(piece.text)
+        return pieces
+
+    def select(self, spans: List[Span], max_tokens: int) -> List[Span]:
+        """0/1 knapsack over spans: maximise summed score within the token budget"""
+        items = [s for s in spans if s.tokens <= max_tokens]
+        if not items:
+            return []
+
+        weights = [s.tokens + self._separator_tokens for s in items]
+        # One separator fewer than spans: give the budget one separator back
+        capacity = max_tokens + self._separator_tokens
+        best = [0.0] * (capacity + 1)
+        keep = [[False] * (capacity + 1) for _ in items]
+        for i, (span, weight) in enumerate(zip(items, weights)):
+            for c in range(capacity, weight - 1, -1):
+                candidate = best[c - weight] + span.score
+                if candidate > best[c]:
+                    best[c] = candidate
+                    keep[i][c] = True
+
+        chosen = []
+        c = capacity
+        for i in range(len(items) - 1, -1, -1):
+            if keep[i][c]:
+                chosen.append(items[i])
+                c -= weights[i]
+        return chosen
+
+    def build(self, results: List[Tuple[Dict, float]], max_tokens: int = None) -> str:
+        max_tokens = max_tokens or self.max_tokens
+        if not results:
+            return ""
+
+        spans = self.merge_spans(results)
+        candidates = []
+        for span in spans:
+            candidates.extend(self._split(span) if span.tokens > max_tokens else [span])
+
+        chosen = self.select(candidates, max_tokens)
+        if not chosen:
+            # Even the best single chunk is over budget: truncate it
+            best = min(candidates, key=lambda s: (s.rank, -s.score))
+            text = self.token_counter.truncate(best.text, max_tokens)
+            best = Span(best.source_file, best.chunk_ids, [text], best.scores, best.rank,
+                        self.token_counter.count(text))
+            chosen = [best]
+
+        # Most relevant passages first, as before
+        chosen.sort(key=lambda s: s.rank)
+        context = SEPARATOR.join(s.text for s in chosen)
+        logger.info(
+            f"Built context from {sum(len(s.chunk_ids) for s in chosen)}/{len(results)} chunks "
+            f"in {len(chosen)} spans ({sum(s.tokens for s in chosen)}/{max_tokens} tokens)"
+        )
+        return context
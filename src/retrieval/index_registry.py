@@ -0,0 +1,139 @@
+"""
+Versioned on-disk layout for FAISS indexes.
+
+    data/embeddings/
+        CURRENT                     # name of the active version
+        versions/
+            20240301-120000/
+                faiss_index.bin
+                metadata.pkl
+                sentences.npz       # optional sentence embedding table
+            20240302-093000/
+                ...
+
+A new index is written into its own version directory and only becomes
+active once ``CURRENT`` is atomically replaced, so a running server never
+sees a half-written index.  When nothing has been published yet the
+registry falls back to the legacy flat files
+(``data/embeddings/faiss_index.bin`` / ``metadata.pkl``).
+"""
+
+import os
+import re
+import shutil
+import time
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.retrieval.vector_store import FAISSVectorStore
+from src.retrieval.sentence_index import SentenceIndex, SENTENCES_FILENAME
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "faiss_index.bin"
+METADATA_FILENAME = "metadata.pkl"
+LEGACY_VERSION = "legacy"
+# Version names are single path components; a leading "." marks publish()'s scratch directories
+VERSION_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$"
+
+
+def validate_version(version: str) -> str:
+    if not isinstance(version, str) or not re.fullmatch(VERSION_PATTERN, version):
+        raise ValueError(f"Invalid index version name: {version!r}")
+    return version
+
+
+class IndexRegistry:
+    """Publish, list and resolve versioned FAISS indexes"""
+
+    def __init__(self, root: Path = None):
+        if root is None:
+            self.root = config.EMBEDDINGS_DIR
+            self.versions_dir = config.INDEX_VERSIONS_DIR
+            self.current_file = config.INDEX_CURRENT_FILE
+        else:
+            self.root = Path(root)
+            self.versions_dir = self.root / "versions"
+            self.current_file = self.root / "CURRENT"
+
+    def list_versions(self) -> List[str]:
+        if not self.versions_dir.exists():
+            return []
+        return sorted(
+            p.name for p in self.versions_dir.iterdir()
+            if p.is_dir() and (p / INDEX_FILENAME).exists()
+        )
+
+    def current_version(self) -> Optional[str]:
+        if not self.current_file.exists():
+            return None
+        version = self.current_file.read_text(encoding="utf-8").strip()
+        return version or None
+
+    def resolve(self, version: str = None) -> Tuple[Path, Path, str]:
+        """Return (index_path, metadata_path, version) for a version (default: CURRENT)"""
+        version = version or self.current_version()
+
+        if version is None or version == LEGACY_VERSION:
+            return self.root / INDEX_FILENAME, self.root / METADATA_FILENAME, LEGACY_VERSION
+
+        # `version` may come from /admin/reload; only published versions are ever loaded (and unpickled)
+        validate_version(version)
+        if version not in self.list_versions():
+            raise FileNotFoundError(f"Index version not found: {version}")
+        version_dir = self.versions_dir / version
+        if self.versions_dir.resolve() not in version_dir.resolve().parents:
+            raise ValueError(f"Index version {version!r} resolves outside {self.versions_dir}")
+
+        return version_dir / INDEX_FILENAME, version_dir / METADATA_FILENAME, version
+
+    def load(self, version: str = None) -> FAISSVectorStore:
+        index_path, metadata_path, version = self.resolve(version)
+        store = FAISSVectorStore.load(index_path, metadata_path)
+        store.version = version
+
+        sentences_path = index_path.parent / SENTENCES_FILENAME
+        if sentences_path.exists():
+            try:
+                store.sentence_index = SentenceIndex.load(sentences_path, store.documents)
+            except ValueError as e:
+                logger.warning(f"⚠️  Ignoring sentence table for {version}: {e}")
+        logger.info(f"Loaded index version: {version}")
+        return store
+
+    def publish(self, vector_store: FAISSVectorStore, version: str = None, activate: bool = True) -> str:
+        """Write a vector store as a new version and optionally make it CURRENT"""
+        version = validate_version(version or time.strftime("%Y%m%d-%H%M%S"))
+        final_dir = self.versions_dir / version
+        if final_dir.exists():
+            raise FileExistsError(f"Index version already exists: {final_dir}")
+
+        # Write into a scratch directory first so readers never see partial files
+        tmp_dir = self.versions_dir / f".{version}.tmp"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        vector_store.save(tmp_dir / INDEX_FILENAME, tmp_dir / METADATA_FILENAME)
+        if vector_store.sentence_index is not None:
+            vector_store.sentence_index.save(tmp_dir / SENTENCES_FILENAME)
+        os.replace(tmp_dir, final_dir)
+        vector_store.version = version
+        logger.info(f"✅ Published index version {version}")
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str):
+        """Atomically point CURRENT at an existing version"""
+        validate_version(version)
+        if version != LEGACY_VERSION and not (self.versions_dir / version / INDEX_FILENAME).exists():
+            raise FileNotFoundError(f"Index version not found: {version}")
+
+        tmp_file = self.current_file.with_name(self.current_file.name + ".tmp")
+        tmp_file.write_text(version + "\n", encoding="utf-8")
+        os.replace(tmp_file, self.current_file)
+        logger.info(f"✅ Active index version: {version}")
@@ -0,0 +1,149 @@
+"""
+Online recall monitoring for approximate (ivf / hnsw) indexes.
+
+The retriever hands every batch of query embeddings to `recall_monitor`,
+which keeps a random RECALL_MONITOR_SAMPLE_RATE fraction of them.  A
+background thread re-runs each sampled query twice: through the index with
+its serving parameters, and exactly over the same stored vectors.
+- For IVF-Flat, exact search probes every list.
+- For HNSW, exact search scans the flat storage.
+Neither needs a second copy of the vectors.
+
+The rolling mean recall@k over the last RECALL_MONITOR_WINDOW samples is
+exported as ``rag_ann_recall``.  A steady decline after new documents are
+added means the IVF centroids (or the HNSW graph) no longer fit the data,
+and the index should be rebuilt.
+
+The request path only pays for one random draw per query.  Samples are
+dropped, not queued without bound, when the monitor falls behind.
+"""
+
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Optional
+import queue
+import random
+import threading
+import logging
+
+import numpy as np
+
+from src.retrieval.autotune import recall_at_k
+from src.retrieval.vector_store import FAISSVectorStore, index_type_of
+from src.utils import metrics
+from src.config import config
+
+if TYPE_CHECKING:
+    import faiss
+else:
+    from src.utils.lazy import faiss
+
+logger = logging.getLogger(__name__)
+
+
+def exact_search(index: "faiss.Index", queries: np.ndarray, k: int):
+    """Exhaustive search over the vectors an ivf / hnsw index already holds"""
+    index_type = index_type_of(index)
+    if index_type == "ivf":
+        ivf = faiss.extract_index_ivf(index)
+        return index.search(queries, k, params=faiss.SearchParametersIVF(nprobe=ivf.nlist))
+    if index_type == "hnsw":
+        return faiss.downcast_index(index.storage).search(queries, k)
+    return index.search(queries, k)
+
+
+class RecallMonitor:
+    """Samples live queries and measures ANN recall@k against exact search off the request path"""
+
+    def __init__(self, sample_rate: float = None, top_k: int = None, window: int = None, max_queue: int = 64):
+        self.sample_rate = config.RECALL_MONITOR_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.top_k = top_k or config.RECALL_MONITOR_TOP_K
+        self.window = window or config.RECALL_MONITOR_WINDOW
+        self.running = False
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._recalls: deque = deque(maxlen=self.window)
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._version: Optional[str] = None
+        self._index_type: Optional[str] = None
+        self.samples = 0
+        self.dropped = 0
+
+    def start(self):
+        if self.running or self.sample_rate <= 0:
+            return
+        self.running = True
+        self._worker = threading.Thread(target=self._run, name="recall-monitor", daemon=True)
+        self._worker.start()
+        logger.info(f"✅ Recall monitor sampling {self.sample_rate:.1%} of queries (recall@{self.top_k})")
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self._queue.put(None)
+        self._worker.join(timeout=5)
+
+    def observe(self, vector_store: FAISSVectorStore, query_embeddings: np.ndarray):
+        """Called with every searched batch; enqueues a random sample of its rows"""
+        if not self.running or vector_store.index_type == "flat":
+            return
+        for row in query_embeddings.reshape(-1, query_embeddings.shape[-1]):
+            if random.random() >= self.sample_rate:
+                continue
+            try:
+                self._queue.put_nowait((vector_store, np.array(row, dtype=np.float32, ndmin=2)))
+            except queue.Full:
+                self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            vector_store, query = item
+            try:
+                self._measure(vector_store, query)
+            except Exception as e:
+                logger.warning(f"⚠️  Recall sample failed: {e}")
+
+    def _measure(self, vector_store: FAISSVectorStore, query: np.ndarray):
+        index = vector_store.index
+        k = min(self.top_k, index.ntotal)
+        if k == 0:
+            return
+        _, approximate = index.search(query, k)
+        _, exact = exact_search(index, query, k)
+        recall = recall_at_k(approximate, exact)
+
+        index_type = vector_store.index_type
+        with self._lock:
+            if vector_store.version != self._version:
+                # Hot-swapped index: start a fresh window
+                self._recalls.clear()
+                self._version = vector_store.version
+                if self._index_type not in (None, index_type):
+                    metrics.ANN_RECALL.remove(self._index_type)
+            self._index_type = index_type
+            self._recalls.append(recall)
+            self.samples += 1
+            mean = sum(self._recalls) / len(self._recalls)
+        metrics.ANN_RECALL.labels(index_type).set(mean)
+        metrics.ANN_RECALL_SAMPLE.labels(index_type).observe(recall)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            recalls = list(self._recalls)
+        return {
+            "running": self.running,
+            "sample_rate": self.sample_rate,
+            "top_k": self.top_k,
+            "index_version": self._version,
+            "samples": self.samples,
+            "dropped": self.dropped,
+            "window": len(recalls),
+            "recall": sum(recalls) / len(recalls) if recalls else None,
+            "min_recall": min(recalls) if recalls else None
+        }
+
+
+recall_monitor = RecallMonitor()
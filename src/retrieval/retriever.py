@@ -5,6 +5,10 @@ import logging
 
 from src.models.embedder import SBERTEmbedder
 from src.retrieval.vector_store import FAISSVectorStore
+from src.retrieval.index_registry import IndexRegistry
+from src.retrieval.recall_monitor import recall_monitor
+from src.retrieval.context_builder import ContextBuilder
+from src.utils import tracing
 from src.config import config
 
 logger = logging.getLogger(__name__)
@@ -12,13 +16,17 @@ logger = logging.getLogger(__name__)
 class DocumentRetriever:
     """Retriever for RAG system"""
     
-    def __init__(self, embedder: SBERTEmbedder = None, vector_store: FAISSVectorStore = None):
+    def __init__(
+        self,
+        embedder: SBERTEmbedder = None,
+        vector_store: FAISSVectorStore = None,
+        context_builder: ContextBuilder = None
+    ):
         self.embedder = embedder or SBERTEmbedder()
+        self.context_builder = context_builder or ContextBuilder()
         
         if vector_store is None:
-            index_path = config.EMBEDDINGS_DIR / "faiss_index.bin"
-            metadata_path = config.EMBEDDINGS_DIR / "metadata.pkl"
-            self.vector_store = FAISSVectorStore.load(index_path, metadata_path)
+            self.vector_store = IndexRegistry().load()
         else:
             self.vector_store = vector_store
     
@@ -28,42 +36,57 @@ class DocumentRetriever:
         top_k: int = None,
         similarity_threshold: float = None
     ) -> List[Tuple[Dict, float]]:
-        top_k = top_k or config.TOP_K
-        similarity_threshold = similarity_threshold or config.SIMILARITY_THRESHOLD
-        
         query_embedding = self.embedder.encode(query)
-        results = self.vector_store.search(query_embedding, top_k=top_k)
-        
-        filtered_results = [
-            (doc, score) for doc, score in results
-            if score >= similarity_threshold
-        ]
-        
+        return self.retrieve_by_embedding(query_embedding, top_k, similarity_threshold)
+    
+    def retrieve_by_embedding(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = None,
+        similarity_threshold: float = None
+    ) -> List[Tuple[Dict, float]]:
+        """Search with an already-encoded query"""
+        filtered_results = self.retrieve_batch_by_embedding(
+            query_embedding.reshape(1, -1), top_k, similarity_threshold
+        )[0]
         logger.info(f"Retrieved {len(filtered_results)} documents for query")
         return filtered_results
     
-    def get_context(self, query: str, top_k: int = None, max_length: int = None) -> str:
-        max_length = max_length or config.MAX_CONTEXT_LENGTH
-        
-        results = self.retrieve(query, top_k=top_k)
-        
-        context_parts = []
-        current_length = 0
-        
-        for doc, score in results:
-            chunk_text = doc['text']
-            chunk_length = len(chunk_text)
-            
-            if current_length + chunk_length > max_length:
-                remaining = max_length - current_length
-                if remaining > 100:
-                    context_parts.append(chunk_text[:remaining])
-                break
-            
-            context_parts.append(chunk_text)
-            current_length += chunk_length
+    def retrieve_batch_by_embedding(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int = None,
+        similarity_threshold: float = None
+    ) -> List[List[Tuple[Dict, float]]]:
+        """Search many encoded queries with a single FAISS call"""
+        top_k = top_k or config.TOP_K
+        similarity_threshold = similarity_threshold or config.SIMILARITY_THRESHOLD
         
-        context = "\n\n".join(context_parts)
-        logger.info(f"Built context with {len(context_parts)} chunks ({current_length} chars)")
+        with tracing.span("retriever.search", top_k=top_k, threshold=similarity_threshold) as span:
+            batch_results = self.vector_store.search_batch(query_embeddings, top_k=top_k)
+            recall_monitor.observe(self.vector_store, query_embeddings)
+            filtered = [
+                [(doc, score) for doc, score in results if score >= similarity_threshold]
+                for results in batch_results
+            ]
+            span.set_attribute("results", sum(len(results) for results in filtered))
+        return filtered
+    
+    def get_context(
+        self,
+        query: str,
+        top_k: int = None,
+        max_tokens: int = None,
+        results: List[Tuple[Dict, float]] = None
+    ) -> str:
+        """
+        Pack retrieved chunks into a context string of at most `max_tokens`
+        (default config.MAX_CONTEXT_TOKENS).  Pass `results` to skip a second search.
+        """
+        if results is None:
+            results = self.retrieve(query, top_k=top_k)
         
-        return context
\ No newline at end of file
+        with tracing.span("retriever.get_context", chunks=len(results)) as span:
+            context = self.context_builder.build(results, max_tokens=max_tokens)
+            span.set_attribute("context_chars", len(context))
+        return context
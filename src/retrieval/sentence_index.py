@@ -0,0 +1,153 @@
+"""
+Sentence-level embedding table, built at index time.
+
+Every chunk's sentences are embedded once and stored next to the FAISS
+index as a compact CSR-style table:
+
+    embeddings  float16 (num_sentences, dim)   unit vectors
+    offsets     int64   (num_chunks + 1,)      chunk i owns rows offsets[i]:offsets[i+1]
+    spans       int32   (num_sentences, 2)     [start, end) character span in the chunk text
+
+At query time the retrieved chunks' rows are gathered and scored against
+the query embedding in one matrix product, so sentence ranking (extractive
+fallback, citation highlights, compression) needs no re-encoding.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+import re
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SENTENCES_FILENAME = "sentences.npz"
+
+# Sentence ends at . ! ? followed by whitespace; clause numbers like "3.1" don't match
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\"'])")
+MIN_SENTENCE_CHARS = 20
+
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """[start, end) character spans of the sentences in `text`, skipping fragments"""
+    spans = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        spans.append((start, match.start()))
+        start = match.end()
+    spans.append((start, len(text)))
+
+    result = []
+    for s, e in spans:
+        # Trim surrounding whitespace so spans match the visible sentence
+        while s < e and text[s].isspace():
+            s += 1
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if e - s >= MIN_SENTENCE_CHARS:
+            result.append((s, e))
+    return result
+
+
+def split_sentences(text: str) -> List[str]:
+    return [text[s:e] for s, e in sentence_spans(text)]
+
+
+@dataclass
+class SentenceHit:
+    """One scored sentence of a retrieved chunk"""
+    result: int  # position in the retrieval results
+    start: int
+    end: int
+    text: str
+    score: float
+
+
+class SentenceIndex:
+    """Precomputed sentence embeddings for the chunks of one FAISS index"""
+
+    def __init__(self, embeddings: np.ndarray, offsets: np.ndarray, spans: np.ndarray, documents: List[Dict]):
+        if len(offsets) != len(documents) + 1:
+            raise ValueError(f"Sentence table covers {len(offsets) - 1} chunks, index has {len(documents)}")
+        self.embeddings = embeddings
+        self.offsets = offsets
+        self.spans = spans
+        self._positions = {
+            (doc['source_file'], doc['chunk_id']): i for i, doc in enumerate(documents)
+        }
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    @classmethod
+    def build(cls, documents: List[Dict], embedder, batch_size: int = 64) -> "SentenceIndex":
+        offsets = [0]
+        spans = []
+        texts = []
+        for doc in documents:
+            for start, end in sentence_spans(doc['text']):
+                spans.append((start, end))
+                texts.append(doc['text'][start:end])
+            offsets.append(len(spans))
+
+        dim = embedder.get_embedding_dim()
+        if texts:
+            embeddings = embedder.encode(texts, batch_size=batch_size).astype(np.float16)
+        else:
+            embeddings = np.zeros((0, dim), dtype=np.float16)
+
+        logger.info(f"✅ Embedded {len(texts)} sentences from {len(documents)} chunks "
+                    f"({embeddings.nbytes / 1e6:.1f} MB)")
+        return cls(
+            embeddings,
+            np.asarray(offsets, dtype=np.int64),
+            np.asarray(spans, dtype=np.int32).reshape(-1, 2),
+            documents
+        )
+
+    def save(self, path: Path):
+        np.savez(path, embeddings=self.embeddings, offsets=self.offsets, spans=self.spans)
+        logger.info(f"Saved {len(self)} sentence embeddings to {path}")
+
+    @classmethod
+    def load(cls, path: Path, documents: List[Dict]) -> "SentenceIndex":
+        with np.load(path) as data:
+            index = cls(data["embeddings"], data["offsets"], data["spans"], documents)
+        logger.info(f"Loaded {len(index)} sentence embeddings")
+        return index
+
+    def rank(self, query_embedding: np.ndarray, results: List[Tuple[Dict, float]]) -> List[SentenceHit]:
+        """All sentences of the retrieved chunks, best match first"""
+        rows = []
+        owners = []
+        for r, (doc, _) in enumerate(results):
+            position = self._positions.get((doc['source_file'], doc['chunk_id']))
+            if position is None:
+                continue
+            start, end = self.offsets[position], self.offsets[position + 1]
+            rows.append(np.arange(start, end))
+            owners.append(np.full(end - start, r))
+        if not rows:
+            return []
+
+        rows = np.concatenate(rows)
+        owners = np.concatenate(owners)
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        scores = self.embeddings[rows].astype(np.float32) @ query
+
+        hits = []
+        for i in np.argsort(-scores):
+            start, end = self.spans[rows[i]]
+            text = results[owners[i]][0]['text']
+            hits.append(SentenceHit(int(owners[i]), int(start), int(end), text[start:end], float(scores[i])))
+        return hits
+
+    @staticmethod
+    def best_per_result(hits: List[SentenceHit]) -> Dict[int, SentenceHit]:
+        """Top sentence of each retrieved chunk (hits must be ranked)"""
+        best = {}
+        for hit in hits:
+            best.setdefault(hit.result, hit)
+        return best
@@ -1,19 +1,113 @@
-import faiss
 import numpy as np
+import json
+import os
 import pickle
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import TYPE_CHECKING, List, Tuple, Dict, Optional
+import math
 import logging
 
+from src.utils import tracing
+from src.config import config
+
+if TYPE_CHECKING:
+    import faiss
+else:
+    from src.utils.lazy import faiss
+
 logger = logging.getLogger(__name__)
 
+# faiss (src.utils.lazy) loads on first use: importing this module (and the
+# retriever / pipeline on top of it) stays cheap for tools that never search.
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+SEARCH_PARAMS_FILENAME = "search_params.json"
+
+
+def search_params_path(index_path: Path) -> Path:
+    """Sidecar next to the index file holding its tuned nprobe / efSearch"""
+    return Path(index_path).with_name(SEARCH_PARAMS_FILENAME)
+
+
+def auto_nlist(num_vectors: int) -> int:
+    """IVF list count: ~4*sqrt(N), but at least 39 training points per list"""
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // 39))
+
+
+def create_index(
+    index_type: str,
+    embedding_dim: int,
+    num_vectors: int = None,
+    nlist: int = None,
+    hnsw_m: int = None,
+    ef_construction: int = None
+) -> "faiss.Index":
+    """Empty inner-product index of the given type (IVF needs `num_vectors` or `nlist`)"""
+    if index_type == "flat":
+        return faiss.IndexFlatIP(embedding_dim)
+    if index_type == "ivf":
+        nlist = nlist or config.IVF_NLIST or auto_nlist(num_vectors or 0)
+        quantizer = faiss.IndexFlatIP(embedding_dim)
+        return faiss.IndexIVFFlat(quantizer, embedding_dim, nlist, faiss.METRIC_INNER_PRODUCT)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(embedding_dim, hnsw_m or config.HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = ef_construction or config.HNSW_EF_CONSTRUCTION
+        return index
+    raise ValueError(f"Unknown index type '{index_type}' (expected one of {', '.join(INDEX_TYPES)})")
+
+
+def index_type_of(index: "faiss.Index") -> str:
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    try:
+        faiss.extract_index_ivf(index)
+        return "ivf"
+    except RuntimeError:
+        return "flat"
+
+
 class FAISSVectorStore:
     """FAISS-based vector store for similarity search"""
     
-    def __init__(self, embedding_dim: int):
+    def __init__(self, embedding_dim: int, index_type: str = None, **index_params):
+        """
+        Args:
+            embedding_dim: vector dimension
+            index_type: "flat" (exact), "ivf" or "hnsw" (defaults to config.INDEX_TYPE)
+            index_params: nlist / hnsw_m / ef_construction for create_index, and
+                          nprobe / ef_search search-time settings
+        """
         self.embedding_dim = embedding_dim
-        self.index = faiss.IndexFlatIP(embedding_dim)
+        self.index_type = index_type or config.INDEX_TYPE
+        self.nprobe = index_params.pop("nprobe", None)
+        self.ef_search = index_params.pop("ef_search", None)
+        self._index_params = index_params
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{self.index_type}' (expected one of {', '.join(INDEX_TYPES)})")
+        # IVF list count depends on corpus size, so that index is created on the first add
+        self.index = faiss.IndexFlatIP(embedding_dim) if self.index_type == "ivf" else \
+            create_index(self.index_type, embedding_dim, **index_params)
+        if self.index_type == "hnsw":
+            self.set_search_params()
         self.documents = []
+        self.version = None
+        self.sentence_index = None  # optional SentenceIndex, attached by IndexRegistry
+        self.tuning: Optional[Dict] = None  # how the search params were chosen (scripts/tune_index.py)
+    
+    def set_search_params(self, nprobe: int = None, ef_search: int = None):
+        """Recall / speed knobs of approximate indexes (no-op for flat)"""
+        self.nprobe = nprobe or self.nprobe or config.IVF_NPROBE
+        self.ef_search = ef_search or self.ef_search or config.HNSW_EF_SEARCH
+        index_type = index_type_of(self.index)
+        if index_type == "ivf":
+            ivf = faiss.extract_index_ivf(self.index)
+            ivf.nprobe = min(self.nprobe, ivf.nlist)
+        elif index_type == "hnsw":
+            self.index.hnsw.efSearch = self.ef_search
+    
+    def index_bytes(self) -> int:
+        """Serialized size of the FAISS index (vectors + structure)"""
+        return int(faiss.serialize_index(self.index).nbytes)
     
     def add_embeddings(self, embeddings: np.ndarray, documents: List[Dict]):
         """Add embeddings and corresponding documents to index"""
@@ -56,6 +150,13 @@ class FAISSVectorStore:
         # Add to FAISS index
         logger.info(f"Adding {len(embeddings)} embeddings to index...")
         try:
+            if self.index_type == "ivf" and self.index.ntotal == 0 and index_type_of(self.index) != "ivf":
+                self.index = create_index("ivf", self.embedding_dim, num_vectors=len(embeddings),
+                                          **self._index_params)
+            if not self.index.is_trained:
+                logger.info(f"Training {self.index_type} index on {len(embeddings)} vectors...")
+                self.index.train(embeddings)
+                self.set_search_params()
             self.index.add(embeddings)
             logger.info(f"✅ Successfully added to index. Total vectors: {self.index.ntotal}")
         except Exception as e:
@@ -71,28 +172,44 @@ class FAISSVectorStore:
     
     def search(self, query_embedding: np.ndarray, top_k: int = 5) -> List[Tuple[Dict, float]]:
         """Search for similar documents"""
+        if query_embedding.ndim == 1:
+            query_embedding = query_embedding.reshape(1, -1)
+        return self.search_batch(query_embedding[:1], top_k=top_k)[0]
+    
+    def search_batch(self, query_embeddings: np.ndarray, top_k: int = 5) -> List[List[Tuple[Dict, float]]]:
+        """Search several queries with one FAISS call; one result list per query row"""
+        
+        if query_embeddings.ndim == 1:
+            query_embeddings = query_embeddings.reshape(1, -1)
         
         if self.index.ntotal == 0:
             logger.warning("⚠️  Index is empty, no results to return")
-            return []
+            return [[] for _ in range(len(query_embeddings))]
         
-        if query_embedding.ndim == 1:
-            query_embedding = query_embedding.reshape(1, -1)
+        scores, indices = self.search_ids(query_embeddings, top_k)
         
-        # Ensure float32
-        if query_embedding.dtype != np.float32:
-            query_embedding = query_embedding.astype('float32')
+        # Get documents
+        batch_results = []
+        for row_scores, row_indices in zip(scores, indices):
+            results = []
+            for score, idx in zip(row_scores, row_indices):
+                if idx >= 0 and idx < len(self.documents):
+                    results.append((self.documents[idx], float(score)))
+            batch_results.append(results)
         
-        # Search
-        scores, indices = self.index.search(query_embedding, top_k)
+        return batch_results
+    
+    def search_ids(self, query_embeddings: np.ndarray, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Raw FAISS output: (scores, row ids), each (num_queries, top_k); id -1 pads missing hits"""
+        if query_embeddings.ndim == 1:
+            query_embeddings = query_embeddings.reshape(1, -1)
         
-        # Get documents
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx >= 0 and idx < len(self.documents):
-                results.append((self.documents[idx], float(score)))
+        # Ensure float32
+        if query_embeddings.dtype != np.float32:
+            query_embeddings = query_embeddings.astype('float32')
         
-        return results
+        with tracing.span("faiss.search", queries=len(query_embeddings), top_k=top_k, index_size=self.index.ntotal):
+            return self.index.search(np.ascontiguousarray(query_embeddings), top_k)
     
     def save(self, index_path: Path, metadata_path: Path):
         """Save index and metadata"""
@@ -105,14 +222,30 @@ class FAISSVectorStore:
         with open(metadata_path, 'wb') as f:
             pickle.dump(self.documents, f)
         
+        if self.index_type != "flat":
+            self.save_search_params(index_path)
+        
         logger.info(f"Saved index to {index_path}")
         logger.info(f"  Vectors in index: {self.index.ntotal}")
         logger.info(f"  Documents saved: {len(self.documents)}")
     
+    def save_search_params(self, index_path: Path):
+        """Write nprobe / efSearch (and any tuning record) next to the index file"""
+        params = {
+            "index_type": self.index_type,
+            "nprobe": self.nprobe if self.index_type == "ivf" else None,
+            "ef_search": self.ef_search if self.index_type == "hnsw" else None,
+            "tuning": self.tuning
+        }
+        path = search_params_path(index_path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(params, indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+        logger.info(f"Saved search params to {path}")
+    
     @classmethod
     def load(cls, index_path: Path, metadata_path: Path):
         """Load index and metadata"""
-        
         if not index_path.exists():
             raise FileNotFoundError(f"Index file not found: {index_path}")
         
@@ -127,11 +260,23 @@ class FAISSVectorStore:
             documents = pickle.load(f)
         
         # Create instance
-        store = cls(embedding_dim=index.d)
+        store = cls(embedding_dim=index.d, index_type=index_type_of(index))
         store.index = index
         store.documents = documents
         
-        logger.info(f"Loaded index with {index.ntotal} embeddings")
+        # Tuned search params persisted with the index win over the config defaults
+        params_path = search_params_path(index_path)
+        if store.index_type != "flat" and params_path.exists():
+            params = json.loads(params_path.read_text(encoding="utf-8"))
+            store.nprobe = params.get("nprobe")
+            store.ef_search = params.get("ef_search")
+            store.tuning = params.get("tuning")
+        store.set_search_params()
+        
+        logger.info(f"Loaded {store.index_type} index with {index.ntotal} embeddings")
         logger.info(f"Loaded {len(documents)} document metadata entries")
+        if store.tuning:
+            logger.info(f"Using tuned {store.tuning.get('param')}={store.tuning.get('value')} "
+                        f"(recall@{store.tuning.get('top_k')} {store.tuning.get('recall', 0):.3f})")
         
         return store
\ No newline at end of file
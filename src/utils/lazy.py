@@ -0,0 +1,43 @@
+"""
+Heavy dependencies imported on first use instead of at module import.
+
+    if TYPE_CHECKING:
+        import faiss
+    else:
+        from src.utils.lazy import faiss
+
+`faiss.IndexFlatIP(...)` then works as usual; the real import happens on
+the first attribute access.  scripts/check_import_time.py keeps the entry
+points honest.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        module = self._module or self._load()
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+faiss = LazyModule("faiss")
@@ -0,0 +1,111 @@
+"""
+Prometheus metrics for the RAG service.
+
+Everything lives in a dedicated registry that `/metrics` renders, so
+importing prometheus_client elsewhere doesn't leak default process
+collectors into the output.  Pipeline code records stage latencies with
+`time_stage` / `observe_stage`; the API updates the gauges on each scrape.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+REGISTRY = CollectorRegistry()
+
+# Sub-millisecond FAISS search up to multi-second LLM calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STAGE_LATENCY = Histogram(
+    "rag_stage_duration_seconds",
+    "Latency of one pipeline stage for one query",
+    ["stage"],  # embedding, search, sentence_rank, context, generation
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY
+)
+REQUEST_LATENCY = Histogram(
+    "rag_request_duration_seconds",
+    "HTTP request latency, by route",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY
+)
+REQUESTS = Counter(
+    "rag_requests_total",
+    "HTTP requests, by route and status code",
+    ["endpoint", "status"],
+    registry=REGISTRY
+)
+ERRORS = Counter(
+    "rag_errors_total",
+    "Failed queries, by endpoint and kind (busy, disconnected, internal, item)",
+    ["endpoint", "kind"],
+    registry=REGISTRY
+)
+CACHE_LOOKUPS = Counter(
+    "rag_cache_lookups_total",
+    "Answer / response cache lookups",
+    ["cache", "result"],
+    registry=REGISTRY
+)
+LLM_FALLBACKS = Counter(
+    "rag_llm_fallbacks_total",
+    "Answers served by the extractive mock instead of the LLM",
+    ["reason"],  # no_backend, llm_error
+    registry=REGISTRY
+)
+IN_FLIGHT = Gauge("rag_in_flight_queries", "Queries holding a pipeline slot", registry=REGISTRY)
+QUEUED = Gauge("rag_queued_queries", "Queries waiting for a pipeline slot", registry=REGISTRY)
+INDEX_SIZE = Gauge("rag_index_documents", "Chunks in the serving FAISS index", registry=REGISTRY)
+INDEX_VERSION = Gauge(
+    "rag_index_version_info", "Serving index version (value is always 1)", ["version"], registry=REGISTRY
+)
+READY = Gauge("rag_ready", "1 once the pipeline is loaded and warmed, else 0", registry=REGISTRY)
+STARTUP_SECONDS = Gauge(
+    "rag_startup_seconds", "Duration of each startup step (model, index, pipeline, warmup, total)", ["step"],
+    registry=REGISTRY
+)
+ANN_RECALL = Gauge(
+    "rag_ann_recall",
+    "Rolling mean recall@k of the serving ANN index against exact search, over sampled live queries",
+    ["index_type"],
+    registry=REGISTRY
+)
+ANN_RECALL_SAMPLE = Histogram(
+    "rag_ann_recall_sample",
+    "Recall@k of individual sampled queries",
+    ["index_type"],
+    buckets=(0.5, 0.7, 0.8, 0.9, 0.95, 0.99, 1.0),
+    registry=REGISTRY
+)
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_LATENCY.labels(stage).observe(seconds)
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage).observe(time.perf_counter() - start)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def set_index(size: int, version: Optional[str]):
+    INDEX_SIZE.set(size)
+    # Only the serving version is exported; drop the one we swapped away from
+    INDEX_VERSION.clear()
+    INDEX_VERSION.labels(version or "legacy").set(1)
+
+
+def render() -> Tuple[bytes, str]:
+    """Exposition-format payload and its content type"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,257 @@
+"""
+On-demand profiling of live queries.
+
+An admin starts a profiling session (`/admin/profiler/start`); from then
+on a fraction of queries is marked as sampled.  The pipeline wraps each
+blocking stage in `profiler.stage(name)`, and for sampled queries that
+stage is profiled in one of two ways:
+
+- ``stack``: a background thread reads the stage thread's Python stack
+  every PROFILER_INTERVAL_MS.  Results are collapsed stacks
+  (``stage;outer;...;inner count``), which flamegraph.pl or speedscope can
+  render directly.
+- ``cprofile``: the stage runs under cProfile, and the per-stage
+  pstats.Stats are merged.  Results load in snakeviz or `python -m pstats`.
+
+Sessions end after `duration` seconds even if nobody stops them.
+Queries that aren't sampled only pay for one contextvar lookup per stage.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+import cProfile
+import io
+import os
+import pstats
+import random
+import sys
+import tempfile
+import threading
+import time
+import logging
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+MODES = ("stack", "cprofile")
+
+# Set by the API for queries picked for profiling; copied into worker threads with the context
+_sampled: ContextVar[bool] = ContextVar("rag_profile_sampled", default=False)
+
+
+class ProfilerStateError(Exception):
+    """Raised when an export is requested that the current session can't provide"""
+
+
+class _StackSampler(threading.Thread):
+    """Samples the Python stacks of threads currently inside a profiled stage"""
+
+    def __init__(self, profiler: "QueryProfiler", interval: float):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.profiler = profiler
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            with self.profiler._lock:
+                targets = list(self.profiler._threads.items())
+            if not targets:
+                continue
+            frames = sys._current_frames()
+            samples = []
+            for thread_id, stage in targets:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(stage)
+                samples.append(";".join(reversed(stack)))
+            with self.profiler._lock:
+                self.profiler._stacks.update(samples)
+
+
+class QueryProfiler:
+    """One profiling session at a time; start() resets the previous results"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = False
+        self.mode: Optional[str] = None
+        self.sample_rate = 0.0
+        self.interval = 0.0
+        self.started_at: Optional[float] = None
+        self.expires_at: Optional[float] = None
+        self.sampled_requests = 0
+        self._sampler: Optional[_StackSampler] = None
+        self._threads: Dict[int, str] = {}       # thread id -> stage being sampled
+        self._stacks: Counter = Counter()         # collapsed stack -> samples
+        self._pstats: Dict[str, pstats.Stats] = {}
+        self._stage_calls: Counter = Counter()
+        self._stage_time: Counter = Counter()
+
+    def start(self, mode: str = "stack", sample_rate: float = None, duration: float = None,
+              interval_ms: float = None) -> Dict:
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}' (expected one of {', '.join(MODES)})")
+        self.stop()
+        duration = min(duration or config.PROFILER_MAX_DURATION, config.PROFILER_MAX_DURATION)
+        with self._lock:
+            self.mode = mode
+            self.sample_rate = config.PROFILER_SAMPLE_RATE if sample_rate is None else sample_rate
+            self.interval = (interval_ms or config.PROFILER_INTERVAL_MS) / 1000
+            self.started_at = time.time()
+            self.expires_at = self.started_at + duration
+            self.sampled_requests = 0
+            self._threads.clear()
+            self._stacks.clear()
+            self._pstats.clear()
+            self._stage_calls.clear()
+            self._stage_time.clear()
+            self.active = True
+        if mode == "stack":
+            self._sampler = _StackSampler(self, self.interval)
+            self._sampler.start()
+        logger.info(f"✅ Profiler started: {mode}, {self.sample_rate:.0%} of queries, up to {duration:.0f}s")
+        return self.status()
+
+    def stop(self) -> Dict:
+        with self._lock:
+            was_active = self.active
+            self.active = False
+            sampler, self._sampler = self._sampler, None
+        if sampler is not None:
+            sampler.stopped.set()
+            sampler.join(timeout=1)
+        if was_active:
+            logger.info(f"Profiler stopped after {self.sampled_requests} sampled queries")
+        return self.status()
+
+    def _expired(self) -> bool:
+        if self.active and time.time() >= self.expires_at:
+            self.stop()
+        return not self.active
+
+    def sample_request(self) -> bool:
+        """Decide whether the current request is profiled; call once per request"""
+        if not self.active or self._expired():
+            return False
+        if random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            self.sampled_requests += 1
+        _sampled.set(True)
+        return True
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Profile the enclosed blocking work if the current request was sampled"""
+        if not _sampled.get() or not self.active:
+            yield
+            return
+
+        start = time.perf_counter()
+        if self.mode == "cprofile":
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler already owns this thread (nested stage); measure only
+                profile = None
+            try:
+                yield
+            finally:
+                if profile is not None:
+                    profile.disable()
+                    self._record(name, start, profile)
+                else:
+                    self._record(name, start)
+        else:
+            thread_id = threading.get_ident()
+            with self._lock:
+                previous = self._threads.get(thread_id)
+                self._threads[thread_id] = name
+            try:
+                yield
+            finally:
+                with self._lock:
+                    if previous is None:
+                        self._threads.pop(thread_id, None)
+                    else:
+                        self._threads[thread_id] = previous
+                self._record(name, start)
+
+    def _record(self, name: str, start: float, profile: cProfile.Profile = None):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stage_calls[name] += 1
+            self._stage_time[name] += elapsed
+            if profile is not None:
+                if name in self._pstats:
+                    self._pstats[name].add(profile)
+                else:
+                    self._pstats[name] = pstats.Stats(profile)
+
+    def status(self) -> Dict:
+        with self._lock:
+            stages = {
+                name: {
+                    "calls": self._stage_calls[name],
+                    "total_time": self._stage_time[name],
+                    "avg_time_ms": self._stage_time[name] / self._stage_calls[name] * 1000
+                }
+                for name in self._stage_calls
+            }
+            return {
+                "active": self.active,
+                "mode": self.mode,
+                "sample_rate": self.sample_rate,
+                "interval_ms": self.interval * 1000 if self.mode == "stack" else None,
+                "started_at": self.started_at,
+                "expires_at": self.expires_at,
+                "sampled_requests": self.sampled_requests,
+                "stack_samples": sum(self._stacks.values()),
+                "stages": stages
+            }
+
+    def collapsed_stacks(self, stage: str = None) -> str:
+        """Brendan Gregg's collapsed format: one `frame;frame;... count` line per stack"""
+        if self.mode != "stack":
+            raise ProfilerStateError("Collapsed stacks need a 'stack' profiling session")
+        with self._lock:
+            stacks = list(self._stacks.items())
+        lines = [
+            f"{stack} {count}" for stack, count in sorted(stacks)
+            if stage is None or stack.split(";", 1)[0] == stage
+        ]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def pstats_dump(self, stage: str = None) -> bytes:
+        """marshal-format pstats file (as written by Stats.dump_stats) for one stage or all"""
+        if self.mode != "cprofile":
+            raise ProfilerStateError("pstats output needs a 'cprofile' profiling session")
+        with self._lock:
+            selected = [s for name, s in self._pstats.items() if stage is None or name == stage]
+            if not selected:
+                raise ProfilerStateError(f"No profiles recorded{f' for stage {stage}' if stage else ''}")
+            combined = pstats.Stats(stream=io.StringIO())
+            combined.add(*selected)
+
+        fd, path = tempfile.mkstemp(suffix=".pstats")
+        os.close(fd)
+        try:
+            combined.dump_stats(path)
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.unlink(path)
+
+
+profiler = QueryProfiler()
@@ -0,0 +1,339 @@
+"""
+Lightweight request tracing for the RAG pipeline.
+
+    with tracing.span("faiss.search", top_k=5) as span:
+        ...
+        span.set_attribute("results", len(results))
+
+Spans nest through a contextvar, so a span opened inside another becomes
+its child, including across `asyncio` tasks and (with `copy_context`) the
+pipeline's worker threads.  The outermost span of a request is the trace
+root and carries the request id.  When the root ends, the whole trace is
+queued for export to a JSONL file, the log, or an OTLP/HTTP collector
+(JSON encoding, no OpenTelemetry SDK needed).
+
+With TRACING_ENABLED=false `span()` returns a shared no-op object, so
+instrumented code costs one attribute check per span.
+"""
+
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import json
+import os
+import queue
+import random
+import threading
+import time
+import logging
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+# Set per HTTP request by the API; trace roots pick it up
+request_id_var: ContextVar[Optional[str]] = ContextVar("rag_request_id", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("rag_current_span", default=None)
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off or the trace wasn't sampled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledSpan(_NoopSpan):
+    """Active root of an unsampled trace: its children are no-ops too"""
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _reset(self._token, None)
+        return False
+
+
+def _reset(token, parent):
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # Generator finalised in another context (e.g. closed by GC)
+        _current_span.set(parent)
+
+
+class _Trace:
+    def __init__(self, request_id: Optional[str]):
+        self.trace_id = os.urandom(16).hex()
+        self.request_id = request_id
+        self.spans: List["Span"] = []
+        self.lock = threading.Lock()
+
+
+class Span:
+    """One timed operation; use as a context manager via `span()`"""
+
+    __slots__ = ("name", "trace", "span_id", "parent", "attributes", "start_time", "end_time",
+                 "error", "_start", "_token", "_tracer")
+
+    def __init__(self, tracer: "Tracer", name: str, trace: _Trace, parent: Optional["Span"], attributes: Dict):
+        self._tracer = tracer
+        self.name = name
+        self.trace = trace
+        self.parent = parent
+        self.span_id = os.urandom(8).hex()
+        self.attributes = attributes
+        self.start_time = 0.0
+        self.end_time = 0.0
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self) -> float:
+        return self.end_time - self.start_time
+
+    def __enter__(self):
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_time = self.start_time + (time.perf_counter() - self._start)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _reset(self._token, self.parent)
+        self._tracer._finish(self)
+        return False
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent is not None else None,
+            "start_time": self.start_time,
+            "duration_ms": self.duration * 1000,
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+# --------------------------------------------------------------------------- exporters
+
+class JSONFileExporter:
+    """One JSON object per trace, appended to a JSONL file"""
+
+    def __init__(self, path: str = None):
+        self.path = Path(path or config.TRACING_JSON_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, trace: _Trace, spans: List[Span]):
+        record = {
+            "trace_id": trace.trace_id,
+            "request_id": trace.request_id,
+            "spans": [s.to_dict() for s in spans]
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+class LogExporter:
+    """Indented span tree in the application log, for local debugging"""
+
+    def export(self, trace: _Trace, spans: List[Span]):
+        children: Dict[Optional[str], List[Span]] = {}
+        for s in spans:
+            children.setdefault(s.parent.span_id if s.parent is not None else None, []).append(s)
+
+        lines = [f"Trace {trace.trace_id} (request {trace.request_id})"]
+
+        def walk(parent_id: Optional[str], depth: int):
+            for s in sorted(children.get(parent_id, []), key=lambda s: s.start_time):
+                attributes = " ".join(f"{k}={v}" for k, v in s.attributes.items())
+                error = f" ERROR {s.error}" if s.error else ""
+                lines.append(f"{'  ' * depth}{s.name} {s.duration * 1000:.1f}ms {attributes}{error}")
+                walk(s.span_id, depth + 1)
+
+        walk(None, 1)
+        logger.info("\n".join(lines))
+
+
+class OTLPExporter:
+    """OTLP/HTTP with JSON encoding, e.g. to an OpenTelemetry Collector or Jaeger on :4318"""
+
+    def __init__(self, endpoint: str = None, service_name: str = None, timeout: float = 5.0):
+        import requests  # only needed when traces are exported
+
+        self.endpoint = endpoint or config.TRACING_OTLP_ENDPOINT
+        self.service_name = service_name or config.TRACING_SERVICE_NAME
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    @staticmethod
+    def _value(value: Any) -> Dict:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def _span(self, trace: _Trace, s: Span) -> Dict:
+        span = {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 2 if s.parent is None else 1,  # SERVER for the root, INTERNAL below it
+            "startTimeUnixNano": str(int(s.start_time * 1e9)),
+            "endTimeUnixNano": str(int(s.end_time * 1e9)),
+            "attributes": [{"key": k, "value": self._value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1}
+        }
+        if s.parent is not None:
+            span["parentSpanId"] = s.parent.span_id
+        return span
+
+    def export(self, trace: _Trace, spans: List[Span]):
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service_name}}
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "legal-rag"},
+                    "spans": [self._span(trace, s) for s in spans]
+                }]
+            }]
+        }
+        response = self.session.post(self.endpoint, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+
+EXPORTERS = {
+    "json": JSONFileExporter,
+    "log": LogExporter,
+    "otlp": OTLPExporter
+}
+
+
+# --------------------------------------------------------------------------- tracer
+
+class Tracer:
+    """
+    Creates spans and hands finished traces to an exporter on a background
+    thread, so exporting never adds latency to the request.
+    """
+
+    def __init__(self, enabled: bool = None, exporter=None, sample_rate: float = None, max_queue: int = 1000):
+        self.enabled = config.TRACING_ENABLED if enabled is None else enabled
+        self.sample_rate = config.TRACING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.exporter = exporter
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+        self.export_errors = 0
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if isinstance(parent, _NoopSpan):
+            return NOOP_SPAN
+        if parent is None:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return _UnsampledSpan()
+            trace = _Trace(request_id_var.get())
+            if trace.request_id:
+                attributes["request_id"] = trace.request_id
+        else:
+            trace = parent.trace
+        return Span(self, name, trace, parent, attributes)
+
+    def _finish(self, span: Span):
+        trace = span.trace
+        with trace.lock:
+            trace.spans.append(span)
+            if span.parent is not None:
+                return
+            spans = list(trace.spans)
+        try:
+            self._queue.put_nowait((trace, spans))
+        except queue.Full:
+            self.dropped += 1
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                if self.exporter is None:
+                    self.exporter = EXPORTERS[config.TRACING_EXPORTER]()
+                self._worker = threading.Thread(target=self._export_loop, name="trace-exporter", daemon=True)
+                self._worker.start()
+
+    def _export_loop(self):
+        while True:
+            trace, spans = self._queue.get()
+            try:
+                self.exporter.export(trace, spans)
+                self.exported += 1
+            except Exception as e:
+                self.export_errors += 1
+                logger.warning(f"⚠️  Trace export failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0):
+        """Wait (up to `timeout`) for queued traces to be exported"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "exporter": type(self.exporter).__name__ if self.exporter else config.TRACING_EXPORTER,
+            "sample_rate": self.sample_rate,
+            "exported_traces": self.exported,
+            "dropped_traces": self.dropped,
+            "export_errors": self.export_errors
+        }
+
+
+tracer = Tracer()
+
+
+def span(name: str, **attributes):
+    """Context manager for a span under the current one (or a new trace root)"""
+    return tracer.span(name, **attributes)
+
+
+def current_span():
+    """The active span, or a no-op stand-in, for adding attributes from nested code"""
+    active = _current_span.get()
+    return active if active is not None else NOOP_SPAN
+